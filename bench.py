@@ -0,0 +1,214 @@
+"""
+TBH Labs Myanmar — Pipeline Benchmarks
+======================================
+Headless timings for the dashboard's data pipeline on synthetic catalogs.
+No Streamlit server is started; the same functions the dashboard calls are
+timed directly.
+
+The generator matches the CSV schema and samples category, weekday and
+upload-hour from the real CSV's empirical distributions; views are
+log-normal with per-category multipliers, so the heavy right tail survives.
+
+Run: python bench.py                       # 1K, 100K, 10M rows
+     python bench.py --rows 1000 100000 --json bench.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from tbh_analytics import aggregates as agg
+from tbh_analytics import cohorts
+from tbh_analytics.cube import build_cube, cube_aggregates, cube_series
+from tbh_analytics.engine import FilterSpec, view_percentiles
+from tbh_analytics.ingest import CSV_PATH, DAY_ORDER, append_updates, build_cache, load_frame
+from tbh_analytics.percentiles import ViewIndex
+from tbh_analytics.slots import SlotGrid
+from tbh_analytics.store import VideoStore
+
+DEFAULT_SIZES = (1_000, 100_000, 10_000_000)
+CHUNK_ROWS = 1_000_000
+REFRESH_ROWS = 200
+
+
+# ── Synthetic data ───────────────────────────────────────────────────────────
+def _empirical(column, fallback):
+    if os.path.exists(CSV_PATH):
+        freq = pd.read_csv(CSV_PATH, usecols=[column])[column].value_counts(normalize=True)
+        return freq.index.to_numpy(), freq.to_numpy()
+    return np.asarray(fallback), np.full(len(fallback), 1 / len(fallback))
+
+
+def synthetic_videos(n, seed=0, start_index=0):
+    """`n` rows in the TBH_Labs_Myanmar_Videos.csv schema."""
+    rng = np.random.default_rng(seed)
+    cats, cat_p = _empirical("category", ["Knowledge", "Review", "Showcases", "Shorts"])
+    hours, hour_p = _empirical("upload_hour", ["12:30", "13:30", "14:00"])
+    titles = (pd.read_csv(CSV_PATH, usecols=["title"])["title"].to_numpy()
+              if os.path.exists(CSV_PATH) else np.array(["synthetic title"]))
+
+    category = rng.choice(cats, n, p=cat_p)
+    # Per-category reach multiplier keeps category rankings stable across sizes.
+    lift = {c: 0.4 + 1.2 * (i / max(len(cats) - 1, 1)) for i, c in enumerate(rng.permutation(cats))}
+    views = (rng.lognormal(np.log(55_000), 1.0, n) * pd.Series(category).map(lift).to_numpy()).astype("int64")
+    likes = (views * rng.beta(4, 90, n)).astype("int64")
+    comments = (views * rng.beta(2, 600, n)).astype("int64")
+    seconds = np.clip(rng.lognormal(np.log(600), 0.6, n), 20, 4 * 3600).astype("int64")
+
+    # Skew dates toward recent years, as the channel's upload rate grows.
+    span = (pd.Timestamp("2026-02-28") - pd.Timestamp("2015-01-01")).days
+    days = (span * rng.power(2.5, n)).astype("int64")
+    dates = pd.Timestamp("2015-01-01") + pd.to_timedelta(days, unit="D")
+
+    return pd.DataFrame({
+        "video_id": [f"syn{start_index + i:010d}" for i in range(n)],
+        "title": rng.choice(titles, n),
+        "view_count": views,
+        "like_count": likes,
+        "comment_count": comments,
+        "duration": [f"{s // 60}:{s % 60:02d}" for s in seconds],
+        "duration_seconds": seconds,
+        "upload_date": dates.strftime("%Y-%m-%d"),
+        "upload_hour": rng.choice(hours, n, p=hour_p),
+        "day_of_week": dates.day_name(),
+        "category": category,
+    })
+
+
+def write_synthetic_csv(path, n, seed=0):
+    """Written in chunks so 10M-row catalogs don't need the whole raw frame at once."""
+    for i, start in enumerate(range(0, n, CHUNK_ROWS)):
+        chunk = synthetic_videos(min(CHUNK_ROWS, n - start), seed=seed + i, start_index=start)
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+# ── Timing ───────────────────────────────────────────────────────────────────
+def measure(fn, *args, repeat=1, **kwargs):
+    """(result, best wall seconds over `repeat` runs, peak traced MB of one more run).
+
+    tracemalloc hooks every allocation and slows the code it watches, so the
+    timed runs are untraced and the peak comes from a separate traced run.
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def bench_size(n, workdir, repeat=3):
+    csv_path = os.path.join(workdir, f"videos_{n}.csv")
+    write_synthetic_csv(csv_path, n)
+    rows = []
+
+    def record(stage, fn, *args, times=repeat, **kwargs):
+        result, secs, peak = measure(fn, *args, repeat=times, **kwargs)
+        rows.append({"rows": n, "stage": stage, "ms": secs * 1000, "peak_mb": peak})
+        return result
+
+    record("load_data (cold: parse + cache)", build_cache, csv_path, times=1)
+    frame = record("load_data (warm: mmap cache)", load_frame, csv_path)
+    df = frame[frame["year"] >= 2021]
+    years = sorted(df["year"].unique())
+    cats = sorted(df["category"].unique())
+
+    spec = FilterSpec.of(years[-2:], cats[: max(len(cats) // 2, 1)])
+    record("fdf filter", spec.apply, df)  # an all-inclusive spec returns the frame itself
+    fdf = FilterSpec.of(years, cats).apply(df)
+    record("percentiles (quantile)", view_percentiles, df, spec=spec)
+    index = record("view index build", ViewIndex, df, times=1)
+    record("percentiles (sorted index)", view_percentiles, df, spec=spec, index=index)
+    record("monthly (rows)", agg.time_series, fdf, "M")
+    record("eng_q (rows)", agg.quarterly_engagement, fdf)
+    record("duration buckets", agg.duration_buckets, fdf)
+    record("day_df (rows)", agg.weekday_stats, fdf, DAY_ORDER)
+    record("hour_df (rows)", agg.hour_stats, fdf)
+    record("cat_stats (rows)", agg.category_stats, fdf)
+    record("cat_year (rows)", agg.category_share_by_year, fdf)
+    record("cohort scores", cohorts.scores, df)
+    grid = record("slot grid build", SlotGrid, df, times=1)
+    record("slot table (sliced)", grid.table, spec)
+
+    cube = record("cube build", build_cube, frame, times=1)
+    record("monthly (cube)", cube_series, cube, years, cats, "M")
+    record("section tables (cube)", cube_aggregates, cube, years, cats, DAY_ORDER)
+
+    # Each refresh appends and applies a fresh REFRESH_ROWS-row delta. Count
+    # updates copy only the three count columns (shared frames are never
+    # written); new videos add one copy of every column (pandas cannot grow a
+    # frame in place). Dropped count indexes rebuild on next use, not here.
+    store = VideoStore(csv_path)
+    store.since(2021), store.keyword_index(2021)
+    counts = write_updates(workdir, frame["video_id"], repeat + 3, start_index=n)
+    record("refresh (first delta: id map)", refresher(store, csv_path, counts[:2]), times=1)
+    record(f"refresh ({REFRESH_ROWS} count updates)", refresher(store, csv_path, counts[2:]))
+    appends = write_updates(workdir, frame["video_id"], repeat + 1, new=REFRESH_ROWS // 2, start_index=2 * n)
+    record(f"refresh (+{REFRESH_ROWS // 2} new videos)", refresher(store, csv_path, appends))
+    return rows
+
+
+def write_updates(workdir, video_ids, count, rows=REFRESH_ROWS, new=0, start_index=0):
+    """`count` update CSVs: new counts for `rows - new` known videos plus `new` unseen ones each."""
+    rng = np.random.default_rng(start_index)
+    paths = []
+    for i in range(count):
+        first = start_index + i * rows
+        updates = synthetic_videos(rows, seed=first, start_index=first)
+        updates.loc[: rows - new - 1, "video_id"] = video_ids.iloc[rng.integers(0, len(video_ids), rows - new)].to_numpy()
+        paths.append(os.path.join(workdir, f"updates_{first}.csv"))
+        updates.to_csv(paths[-1], index=False)
+    return paths
+
+
+def refresher(store, csv_path, paths):
+    """A stage that appends the next update file in `paths` and refreshes `store`."""
+    paths = iter(paths)
+
+    def refresh():
+        append_updates(next(paths), csv_path)
+        store.refresh()
+    return refresh
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard data pipeline on synthetic data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3, help="best-of-N for warm stages")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="tbh-bench-")
+    try:
+        results = []
+        for n in args.rows:
+            results.extend(bench_size(n, workdir, repeat=args.repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    table = pd.DataFrame(results).pivot(index="stage", columns="rows", values=["ms", "peak_mb"])
+    table = table.reindex(pd.unique(pd.DataFrame(results)["stage"]))
+    with pd.option_context("display.width", 160, "display.float_format", "{:,.1f}".format):
+        print(table)
+    print(f"\nProcess max RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
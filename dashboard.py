@@ -4,11 +4,26 @@ TBH Labs Myanmar — Interactive Performance Dashboard
 Run: streamlit run dashboard.py
 """
 
+import html
+import logging
+import os
+import time
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from tbh_analytics import aggregates as agg
+from tbh_analytics import cohorts, engine, export, insights, leaderboard, slots, snapshots
+from tbh_analytics import figures as figs
+from tbh_analytics.aggregates import SERIES_FREQS
+from tbh_analytics.dataset import DATASET_DIR, channel_categories, channel_years, read_manifest
+from tbh_analytics.engine import FilterSpec
+from tbh_analytics.figures import ACCENT_1, ACCENT_2, ACCENT_3, ACCENT_5, BG, BORDER, CARD_BG, FG, PRIMARY, TEXT_MUTED
+from tbh_analytics.ingest import CSV_PATH
+from tbh_analytics.memo import LRUCache, content_hash
+from tbh_analytics.profiling import Checkpoints, import_profile
+from tbh_analytics.serving import SharedResults
+from tbh_analytics.store import PartitionStore, VideoStore
 
 # ── Page Config ──────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -18,22 +33,11 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# ── Flash UI Palette ──────────────────────────────────────────────────────────
-BG        = "#f8fafc"  # Very light blue-grey
-CARD_BG   = "#ffffff"
-FG        = "#0f172a"  # Slate 900
-TEXT_MUTED= "#64748b"  # Slate 500
-BORDER    = "#e2e8f0"  # Slate 200
-
-# Vibrant Tech Gradients/Accents (Flash UI)
-PRIMARY   = "#3b82f6"  # Blue
-ACCENT_1  = "#8b5cf6"  # Violet
-ACCENT_2  = "#ec4899"  # Pink
-ACCENT_3  = "#10b981"  # Emerald
-ACCENT_4  = "#f59e0b"  # Amber
-ACCENT_5  = "#06b6d4"  # Cyan
-
-COLORS = [PRIMARY, ACCENT_1, ACCENT_2, ACCENT_3, ACCENT_4, ACCENT_5, "#f43f5e", "#8b5cf6", "#14b8a6", "#3b82f6", "#ec4899"]
+# ── Startup profile ──────────────────────────────────────────────────────────
+# ?profile=1 (or TBH_PROFILE=1) opens every section and adds a sidebar panel
+# with per-stage wall time, time-to-first-KPI, and cold import cost per module.
+PROFILE = os.environ.get("TBH_PROFILE") == "1" or st.query_params.get("profile") == "1"
+mark = Checkpoints()
 
 # ── Custom CSS ───────────────────────────────────────────────────────────────
 st.markdown(f"""
@@ -207,6 +211,7 @@ st.markdown(f"""
     
     .rec-card h4 {{ margin: 0; font-size: 1.05rem; font-weight: 700; }}
     .rec-card p {{ color: {TEXT_MUTED}; margin: 0; font-size: 0.9rem; line-height: 1.5; }}
+    .confidence {{ display: block; margin-top: 0.5rem; color: {TEXT_MUTED}; font-size: 0.75rem; font-weight: 500; }}
 
     /* DataFrame styling */
     [data-testid="stDataFrame"] {{
@@ -229,54 +234,231 @@ st.markdown(f"""
 
 
 # ── Load Data ────────────────────────────────────────────────────────────────
-@st.cache_data
-def load_data():
-    df = pd.read_csv("TBH_Labs_Myanmar_Videos.csv")
-    df["upload_date"] = pd.to_datetime(df["upload_date"])
-    df["year"] = df["upload_date"].dt.year
-    df["month"] = df["upload_date"].dt.to_period("M").astype(str)
-    df["quarter"] = df["upload_date"].dt.to_period("Q").astype(str)
-    df["month_num"] = df["upload_date"].dt.month
-    df["duration_min"] = df["duration_seconds"] / 60
-    return df
-
-df_all = load_data()
-df = df_all[df_all["year"] >= 2021].copy()
-
-# ── Plot theme ───────────────────────────────────────────────────────────────
-# Flash UI uses clean white plots with prominent data and subtle grid lines
-PLOT_LAYOUT = dict(
-    template="plotly_white",
-    paper_bgcolor="rgba(255,255,255,0)",
-    plot_bgcolor="rgba(255,255,255,0)",
-    font=dict(family="Inter", color=TEXT_MUTED, size=13),
-    margin=dict(l=40, r=20, t=60, b=40),
-    hoverlabel=dict(
-        bgcolor=CARD_BG, 
-        font_size=13, 
-        font_family="Inter",
-        bordercolor=BORDER,
-        font_color=FG
-    ),
-    title_font=dict(size=16, color=FG, family="Inter", weight="bold"),
-)
+# All computation lives in the headless tbh_analytics package; this file only
+# renders. The store memory-maps the Arrow cache once per process and builds the
+# aggregate cube. Each rerun picks up any deltas appended by
+# `python -m tbh_analytics.ingest --append` without a full reload.
+#
+# If a partitioned multi-channel dataset exists (python -m tbh_analytics.dataset
+# add ...), a channel selector replaces the single CSV. The channel, year and
+# category selectors are then filled from the manifest, and the selection is
+# pushed into the partition scan: only the matching partitions from SINCE_YEAR
+# on are read, and only the selected verticals' rows are kept.
+SINCE_YEAR = 2021
+DATASET_ROOT = os.environ.get("TBH_DATASET", DATASET_DIR)
+PARTITION_STORES = 8
+
+@st.cache_resource
+def load_store():
+    return VideoStore(CSV_PATH)
+
+@st.cache_resource(max_entries=PARTITION_STORES)
+def load_partition_store(channels, years, categories):
+    return PartitionStore(DATASET_ROOT, channels, years, categories, since=SINCE_YEAR)
+
+def narrowed(selected, options):
+    """The scan term for a selector: None when every option is selected."""
+    return None if set(selected) == set(options) else tuple(sorted(selected))
+
+manifest = read_manifest(DATASET_ROOT)
+partitioned = bool(manifest and manifest["channels"])
+if partitioned:
+    with st.sidebar:
+        channels = sorted(manifest["channels"])
+        sel_channels = st.multiselect("Channels", channels, default=channels[:1])
+    if not sel_channels:
+        st.warning("Select at least one channel.")
+        st.stop()
+    years = [y for y in channel_years(manifest, sel_channels) if y >= SINCE_YEAR]
+    categories = channel_categories(manifest, sel_channels)
+else:
+    store = load_store()
+    store.refresh()
+    years = sorted(store.since(SINCE_YEAR)["year"].unique())
+    categories = sorted(store.since(SINCE_YEAR)["category"].unique())
+
+with st.sidebar:
+    st.markdown("### 🎛️ Control Panel")
+    st.markdown("<br>", unsafe_allow_html=True)
+    sel_years = st.multiselect("Timeline Selection", years, default=years)
+    sel_cats = st.multiselect("Content Verticals", categories, default=categories)
+
+if partitioned:
+    if not sel_years or not sel_cats:
+        st.warning("Select at least one year and one vertical.")
+        st.stop()
+    store = load_partition_store(tuple(sorted(sel_channels)), narrowed(sel_years, years),
+                                 narrowed(sel_cats, categories))
+    store.refresh()
+df_all = store.frame
+df = store.since(SINCE_YEAR)
+mark("Load data")
+
+# Per-refresh count snapshots (python -m tbh_analytics.snapshots record), if any,
+# give views at equal age; velocity tables are keyed on the snapshot generation.
+SNAPSHOT_ROOT = os.environ.get("TBH_SNAPSHOTS", snapshots.SNAPSHOT_DIR)
+snapshot_manifest = read_manifest(SNAPSHOT_ROOT)
+
+# Sidebar reruns re-execute the whole script; the section groupbys, series,
+# percentiles and insights are memoized on the canonical filter key so
+# revisiting a filter combo is a lookup. The store version is part of every
+# key, so appended data invalidates them. Results (and filtered frames) live
+# once per process and are shared by reference across sessions, so a session
+# costs its filter key rather than its own copy of every table; st.cache_data
+# would unpickle a fresh copy for every caller.
+AGG_CACHE_ENTRIES = 256
+FRAME_CACHE_ENTRIES = 16
+
+# Duration vs Reach map: never ship more than SCATTER_MAX_POINTS (WebGL and
+# hover-title cutoffs live with the builder in tbh_analytics.figures). Density
+# mode bins server-side into DENSITY_BINS (x, y).
+SCATTER_MAX_POINTS = 10_000
+DENSITY_BINS = (60, 40)
+COHORT_OUTLIERS = 15
+SLOT_METRICS = {"median_views": "Median views", "avg_views": "Average views", "videos": "Videos"}
+ALL_VERTICALS = "All verticals"
+
+
+@st.cache_resource
+def shared_results():
+    return SharedResults(AGG_CACHE_ENTRIES)
+
+
+@st.cache_resource
+def shared_frames():
+    return SharedResults(FRAME_CACHE_ENTRIES)
+
+
+def cached_aggregates(spec, version):
+    return shared_results().get(("aggregates", spec, version), lambda: engine.section_tables(df, spec, store.cube))
+
+
+def cached_series(spec, freq, version):
+    return shared_results().get(("series", spec, freq, version), lambda: engine.series(df, spec, freq, store.cube))
+
+
+def cached_insights(spec, version):
+    return shared_results().get(("insights", spec, version),
+                                lambda: insights.generate({**cached_aggregates(spec, version),
+                                                           "slot_df": cached_slots(spec, "MMT", None, version)}))
+
+
+def cached_velocity(generation):
+    return shared_results().get(("velocity", SNAPSHOT_ROOT, generation), lambda: snapshots.velocity(SNAPSHOT_ROOT))
+
 
-def update_axes(fig):
-    fig.update_xaxes(
-        gridcolor="#f1f5f9", 
-        zerolinecolor="#e2e8f0", 
-        tickfont=dict(color=TEXT_MUTED),
-        title_font=dict(size=13, color=TEXT_MUTED, weight=500)
-    )
-    fig.update_yaxes(
-        gridcolor="#f1f5f9", 
-        zerolinecolor="#e2e8f0", 
-        tickfont=dict(color=TEXT_MUTED),
-        title_font=dict(size=13, color=TEXT_MUTED, weight=500)
-    )
+# Percentiles select from view_count pre-sorted once per data version, so a
+# new filter costs a masked gather rather than a sort of the filtered rows.
+def cached_percentiles(spec, version):
+    return shared_results().get(("percentiles", spec, version),
+                                lambda: engine.view_percentiles(df, spec=spec, index=store.view_index(SINCE_YEAR)))
+
+
+# Cohort scores are per video against the whole catalog (once per data version);
+# the filters only choose which videos are listed.
+def cached_cohorts(spec, version):
+    return shared_results().get(("cohorts", spec, version), lambda: cohorts.cohort_table(filtered_rows(spec, version)))
+
+
+def cached_outliers(spec, under, version):
+    return shared_results().get(("outliers", spec, under, version),
+                                lambda: cohorts.outliers(filtered_rows(spec, version), store.cohort_scores(SINCE_YEAR),
+                                                         COHORT_OUTLIERS, under))
+
+
+def cached_age_curves(spec, generation, version):
+    return shared_results().get(("age_curves", spec, generation, version),
+                                lambda: cohorts.age_curves(filtered_rows(spec, version),
+                                                           cached_velocity(generation) if generation else None))
+
+
+# Weekday × hour cells are sliced from the store's slot grid (binned once per
+# data version); only the cell medians touch rows, and never re-sort them.
+def cached_slots(spec, clock, category, version):
+    return shared_results().get(("slots", spec, clock, category, version),
+                                lambda: store.slot_grid(SINCE_YEAR, clock).table(spec, category))
+
+
+def filtered_rows(spec, version):
+    return shared_frames().get(("rows", spec, version), lambda: spec.apply(df))
+
+# ── Figure cache ─────────────────────────────────────────────────────────────
+# Built figures are shared across reruns/sessions, keyed on a content hash of
+# the aggregate they draw, so an unchanged section skips the Plotly build.
+# Each lookup is recorded in FIGURE_STATS for the sidebar telemetry panel.
+FIGURE_CACHE_ENTRIES = 256
+FIGURE_STATS = []
+log = logging.getLogger("tbh.dashboard")
+
+
+@st.cache_resource
+def figure_cache():
+    return LRUCache(FIGURE_CACHE_ENTRIES)
+
+
+def figure(name, builder, *data, **options):
+    start = time.perf_counter()
+    key = (name, content_hash(*data, sorted(options.items())))
+    entry = figure_cache().get(key)
+    hit = entry is not None
+    if not hit:
+        fig = builder(*data, **options)
+        build_ms = (time.perf_counter() - start) * 1000
+        entry = (fig, build_ms, len(fig.to_json()))
+        figure_cache().put(key, entry)
+        log.info("figure %s built in %.1f ms, %.1f KB JSON", name, build_ms, entry[2] / 1024)
+    fig, build_ms, nbytes = entry
+    FIGURE_STATS.append({
+        "Figure": name,
+        "Cache": "hit" if hit else "miss",
+        "Build ms": round(build_ms, 1),
+        "Rerun ms": round((time.perf_counter() - start) * 1000, 1),
+        "JSON KB": round(nbytes / 1024, 1),
+    })
     return fig
 
 
+# ── Lazy sections ────────────────────────────────────────────────────────────
+# Below-the-fold sections build only once opened (the choice sticks for the
+# session), so first paint doesn't wait on charts nobody has scrolled to yet.
+def section_open(key, label):
+    return st.toggle(f"Show {label}", key=f"open_{key}", value=PROFILE)
+
+
+# ── Insight rendering ────────────────────────────────────────────────────────
+# Claims come from tbh_analytics.insights (derived from the cached section
+# tables); every one shows its sample size and confidence.
+TONE_STYLE = {"good": ("green", "✓"), "bad": ("red", "✕"), "info": ("blue", "↗")}
+
+
+def sample_note(item):
+    if item.confidence == "insufficient":
+        return f"Fewer than {insights.MIN_SAMPLE} videos per group"
+    return f"n = {item.n} · {item.confidence} confidence"
+
+
+def insight_box(item):
+    st.markdown(f"""
+<div class="insight-box">
+    <strong>💡 {html.escape(item.title)}:</strong> <strong>{html.escape(item.headline)}</strong> {html.escape(item.detail)}
+    <span class="confidence">{sample_note(item)}</span>
+</div>
+""", unsafe_allow_html=True)
+
+
+def rec_card(item):
+    tone, icon = TONE_STYLE[item.tone]
+    return f"""
+<div class="rec-card {tone}">
+    <div class="rec-card-header">
+        <div class="rec-icon">{icon}</div>
+        <h4>{html.escape(item.title)}</h4>
+    </div>
+    <p><b>{html.escape(item.headline)}</b> {html.escape(item.detail)}</p>
+    <span class="confidence">{sample_note(item)}</span>
+</div>"""
+
+
 # ═══════════════════ HEADER ═══════════════════════════════════════════════════
 st.markdown(f"""
 <div class="dashboard-header">
@@ -287,12 +469,13 @@ st.markdown(f"""
 
 
 # ═══════════════════ KPI ROW ══════════════════════════════════════════════════
-total_views = df["view_count"].sum()
-avg_views = df["view_count"].mean()
-med_views = df["view_count"].median()
-total_videos = len(df)
-like_rate = df["like_count"].sum() / df["view_count"].sum() * 100
-avg_dur = df["duration_seconds"].mean()
+kpis = engine.overview_stats(df, store.view_index(SINCE_YEAR))
+total_views = kpis["total_views"]
+avg_views = kpis["avg_views"]
+med_views = kpis["med_views"]
+total_videos = kpis["videos"]
+like_rate = kpis["like_rate"]
+avg_dur = kpis["avg_duration_s"]
 
 st.markdown(f"""
 <div class="kpi-container">
@@ -322,21 +505,20 @@ st.markdown(f"""
     </div>
 </div>
 """, unsafe_allow_html=True)
+mark("KPI row")
 
 
 # ═══════════════════ SIDEBAR ══════════════════════════════════════════════════
 with st.sidebar:
-    st.markdown("### 🎛️ Control Panel")
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    years = sorted(df["year"].unique())
-    sel_years = st.multiselect("Timeline Selection", years, default=years)
-
-    categories = sorted(df["category"].unique())
-    sel_cats = st.multiselect("Content Verticals", categories, default=categories)
-
     min_views = st.slider("View Threshold", 0, int(df["view_count"].max()), 0, step=1000)
 
+    # Served from the title index (built once per data version); every section
+    # re-aggregates on the matching videos.
+    keywords = st.text_input("Title Keywords", key="keywords", placeholder="e.g. AI, သတိ, brain rot")
+    keyword_ids = store.keyword_index(SINCE_YEAR).lookup(keywords) if keywords.strip() else None
+    if keyword_ids is not None:
+        st.caption(f"{len(keyword_ids):,} videos match")
+
     st.markdown("<br><hr>", unsafe_allow_html=True)
     st.markdown("### 📌 Navigation")
     st.markdown("""
@@ -345,10 +527,44 @@ with st.sidebar:
     - [Duration Sweet Spot](#duration-sweet-spot)
     - [Upload Telemetry](#upload-telemetry)
     - [Category Matrices](#category-matrices)
+    - [Cohort Performance](#cohort-performance)
     - [Actionable Intel](#actionable-intel)
     """)
 
-fdf = df[(df["year"].isin(sel_years)) & (df["category"].isin(sel_cats)) & (df["view_count"] >= min_views)]
+    st.markdown("<br>", unsafe_allow_html=True)
+    if st.button("Clear aggregate cache", use_container_width=True):
+        shared_results().clear()
+        shared_frames().clear()
+        figure_cache().clear()
+    show_figure_stats = st.toggle("Figure telemetry", value=False)
+
+spec = FilterSpec.of(sel_years, sel_cats, min_views, keyword_ids)
+fdf = filtered_rows(spec, store.version)
+if fdf.empty:
+    st.warning("No videos match the current filters.")
+    st.stop()
+
+# Exports are encoded for the current filter state only when a button is
+# clicked; Streamlit holds each download in memory as one bytes object. The
+# section table is computed then too, not on every rerun.
+deferred = export.deferred_payload
+
+
+def section_table_parts(frame, cube, spec, name, fmt):
+    return export.stream_table(engine.section_tables(frame, spec, cube)[name], fmt)
+
+with st.sidebar:
+    st.markdown("### 📤 Export")
+    export_fmt = st.selectbox("Format", list(export.FORMATS), key="export_format")
+    st.download_button(f"Filtered rows ({len(fdf):,})", deferred(export.stream_rows, df, spec, export_fmt),
+                       file_name=f"tbh_videos.{export_fmt}", mime=export.FORMATS[export_fmt],
+                       on_click="ignore", use_container_width=True)
+    export_table = st.selectbox("Section table", engine.SECTION_TABLES, key="export_table")
+    st.download_button("Download table",
+                       deferred(section_table_parts, df, store.cube, spec, export_table, export_fmt),
+                       file_name=f"tbh_{export_table}.{export_fmt}", mime=export.FORMATS[export_fmt],
+                       on_click="ignore", use_container_width=True)
+mark("Sidebar")
 
 
 # ═══════════════════ SECTION 1: OVERVIEW ══════════════════════════════════════
@@ -357,173 +573,119 @@ st.markdown('<div class="section-header"><h2>📈 Overview</h2></div>', unsafe_a
 col1, col2 = st.columns(2)
 
 with col1:
-    fig = px.histogram(fdf, x="view_count", nbins=50,
-                       title="Audience Reach Distribution",
-                       color_discrete_sequence=[PRIMARY])
-    fig.update_layout(**PLOT_LAYOUT)
-    fig = update_axes(fig)
-    fig.update_xaxes(title="Total Views")
-    fig.update_yaxes(title="Video Count")
-    fig.update_traces(marker=dict(line=dict(width=1, color="white")))
-    st.plotly_chart(fig, use_container_width=True, theme=None)
+    hist = agg.value_histogram(fdf["view_count"], bins=50)
+    st.plotly_chart(figure("reach_histogram", figs.reach_histogram, hist), use_container_width=True, theme=None)
 
 with col2:
-    pcts = [10, 25, 50, 75, 90]
-    fig2 = go.Figure(data=[go.Bar(
-        x=[f"p{p}" for p in pcts],
-        y=[fdf["view_count"].quantile(p/100) for p in pcts],
-        marker_color=["#cbd5e1", "#cbd5e1", ACCENT_1, "#cbd5e1", "#cbd5e1"],
-        text=[f"{int(fdf['view_count'].quantile(p/100)):,}" for p in pcts],
-        textposition="outside",
-        textfont=dict(color=FG, size=13, weight="bold"),
-        marker=dict(line=dict(width=0))
-    )])
-    fig2.update_layout(title="Performance Percentiles", **PLOT_LAYOUT)
-    fig2 = update_axes(fig2)
-    fig2.update_xaxes(title="Percentile Rank")
-    fig2.update_yaxes(title="Total Views", range=[0, fdf["view_count"].quantile(0.9)*1.3])
-    st.plotly_chart(fig2, use_container_width=True, theme=None)
-
-# Top 10 videos
-st.markdown("#### ⭐ High Impact Content (Top 10)")
-top10 = fdf.nlargest(10, "view_count")[["title", "view_count", "like_count", "comment_count", "duration", "upload_date", "category"]]
-top10 = top10.reset_index(drop=True)
-top10.index = top10.index + 1
-top10.columns = ["Content Title", "Reach", "Likes", "Engagement", "Duration", "Air Date", "Vertical"]
-st.dataframe(top10, use_container_width=True)
+    pct_views = cached_percentiles(spec, store.version)
+    st.plotly_chart(figure("percentiles", figs.percentiles, pct_views), use_container_width=True, theme=None)
+
+# Leaderboard: ranked through per-metric sort indexes built once per data
+# version; only the visible page is sliced out and sent to the browser.
+st.markdown("#### ⭐ High Impact Content")
+board = store.leaderboard(SINCE_YEAR)
+col1, col2, col3 = st.columns([2, 3, 1])
+with col1:
+    rank_by = st.selectbox("Rank by", list(leaderboard.METRICS), format_func=leaderboard.METRICS.get,
+                           key="board_metric")
+with col2:
+    title_query = st.text_input("Search titles", key="board_search", placeholder="Burmese or English title text")
+with col3:
+    page_size = st.selectbox("Rows", [10, 25, 50, 100], key="board_size")
+ranked = board.rank(rank_by, spec, title_query)
+total = len(ranked)
+pages = leaderboard.page_count(total, page_size)
+if st.session_state.get("board_page", 1) > pages:
+    st.session_state["board_page"] = pages  # a narrower filter/search can drop the current page
+page = st.number_input(f"Page (of {pages})", 1, pages, 1, key="board_page") if pages > 1 else 1
+rows = board.rows(ranked, page, page_size)
+rows.columns = ["#", "Content Title", "Reach", "Likes", "Comments", "Like Rate %", "Comments / 1K",
+                "Duration", "Air Date", "Vertical"]
+st.dataframe(rows, use_container_width=True, hide_index=True,
+             column_config={"Like Rate %": st.column_config.NumberColumn(format="%.2f"),
+                            "Comments / 1K": st.column_config.NumberColumn(format="%.2f")})
+first = (page - 1) * page_size
+st.caption(f"{first + 1 if total else 0}–{first + len(rows)} of {total:,} videos")
+mark("Overview")
 
 
 # ═══════════════════ SECTION 2: TIME SERIES ═══════════════════════════════════
 st.markdown('<div class="section-header"><h2>📅 Time Series Trends</h2></div>', unsafe_allow_html=True)
 
-monthly = fdf.groupby("month").agg(
-    count=("view_count", "size"),
-    avg_views=("view_count", "mean"),
-    total_views=("view_count", "sum"),
-    avg_likes=("like_count", "mean"),
-    like_rate=("like_count", lambda x: x.sum()),
-    view_sum=("view_count", lambda x: x.sum()),
-).reset_index()
-monthly["like_rate_pct"] = monthly["like_rate"] / monthly["view_sum"] * 100
-monthly["roll_3m"] = monthly["avg_views"].rolling(3, min_periods=1).mean()
+freq = st.radio("Granularity", list(SERIES_FREQS), index=1, horizontal=True,
+                format_func=SERIES_FREQS.get, label_visibility="collapsed")
+period_name = SERIES_FREQS[freq]
+series = cached_series(spec, freq, store.version)
+# Sections 2–4 are always drawn; their tables come from one cube roll-up,
+# computed here (after the Overview) and shared by the lazy sections below.
+aggs = cached_aggregates(spec, store.version)
+baseline = insights.baseline_views(aggs["cat_stats"])
 
 col1, col2 = st.columns(2)
 
 with col1:
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=monthly["month"], y=monthly["avg_views"],
-                             mode="lines", name="Monthly Avg",
-                             line=dict(color="#cbd5e1", width=2),
-                             fill="tozeroy", fillcolor="rgba(203, 213, 225, 0.2)"))
-    fig.add_trace(go.Scatter(x=monthly["month"], y=monthly["roll_3m"],
-                             mode="lines", name="3M Momentum",
-                             line=dict(color=PRIMARY, width=4)))
-    fig.update_layout(title="View Volume Momentum", **PLOT_LAYOUT,
-                      legend=dict(x=0.02, y=0.98, bgcolor="rgba(255,255,255,0.9)", bordercolor=BORDER, borderwidth=1))
-    fig = update_axes(fig)
-    st.plotly_chart(fig, use_container_width=True, theme=None)
+    st.plotly_chart(figure("momentum", figs.momentum, series, freq=freq), use_container_width=True, theme=None)
 
 with col2:
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=monthly["month"], y=monthly["count"],
-                         marker_color=ACCENT_5, name="Uploads", 
-                         marker=dict(line=dict(width=0))))
-    fig.update_layout(title="Production Velocity (Uploads/Month)", **PLOT_LAYOUT)
-    fig = update_axes(fig)
-    fig.update_yaxes(title="Volume")
-    st.plotly_chart(fig, use_container_width=True, theme=None)
+    st.plotly_chart(figure("uploads", figs.uploads, series, freq=freq), use_container_width=True, theme=None)
 
 st.markdown("#### 💬 Engagement Multipliers")
-eng_q = fdf.groupby("quarter").agg(
-    like_sum=("like_count", "sum"),
-    view_sum=("view_count", "sum"),
-    avg_comments=("comment_count", "mean"),
-).reset_index()
-eng_q["like_rate"] = eng_q["like_sum"] / eng_q["view_sum"] * 100
-
-fig = make_subplots(rows=1, cols=2, shared_xaxes=False,
-                    subplot_titles=("Audience Like Rate (%)", "Conversation Depth (Avg Comments)"))
-
-fig.add_trace(go.Scatter(x=eng_q["quarter"], y=eng_q["like_rate"],
-                         mode="lines+markers", line=dict(color=ACCENT_3, width=3),
-                         fill="tozeroy", fillcolor="rgba(16, 185, 129, 0.1)",
-                         marker=dict(size=8, color=ACCENT_3, line=dict(color="white", width=2))), row=1, col=1)
-
-fig.add_trace(go.Bar(x=eng_q["quarter"], y=eng_q["avg_comments"],
-                     marker_color=ACCENT_2, opacity=0.85,
-                     marker=dict(line=dict(width=0))), row=1, col=2)
-
-fig.update_layout(
-    height=380, showlegend=False,
-    **{k: v for k, v in PLOT_LAYOUT.items() if k not in ["margin", "height"]}
-)
-fig.update_annotations(font_color=FG, font_size=16, font_family="Inter", font_weight="bold")
-fig = update_axes(fig)
-st.plotly_chart(fig, use_container_width=True, theme=None)
-
-st.markdown(f"""
-<div class="insight-box">
-    <strong>💡 The Engagement Surge:</strong> The audience is deeper into the funnel than ever. Like rate skyrocketed from 3.3% (2021) to <strong>5.35% (2026 Q1)</strong>,
-    while average comments <strong>10x'd</strong> (25 → 269). Less passive viewing, more active community participation.
-</div>
-""", unsafe_allow_html=True)
+eng_q = aggs["eng_q"]
+st.plotly_chart(figure("engagement", figs.engagement, eng_q), use_container_width=True, theme=None)
+
+insight_box(insights.like_rate_trend(eng_q))
+
+# Lifetime totals favour old uploads; views at a fixed age compare like with like.
+st.markdown("#### 🚀 Views at Equal Age")
+if snapshot_manifest:
+    milestone = st.radio("Age", list(snapshots.MILESTONES), index=1, horizontal=True, key="velocity_age",
+                         label_visibility="collapsed")
+    profile = snapshots.equal_age(fdf, cached_velocity(snapshot_manifest["generation"]), milestone)
+    if profile.empty:
+        st.caption(f"No video in the current filters has been tracked across its first {milestone} yet.")
+    else:
+        st.plotly_chart(figure("equal_age", figs.equal_age, profile, milestone=milestone),
+                        use_container_width=True, theme=None)
+        st.caption(f"{int(profile['videos'].sum())} videos with a {milestone} reading · "
+                   f"{snapshot_manifest['snapshots']} snapshots since tracking began")
+else:
+    st.caption("No view snapshots yet. Record one per refresh (`python -m tbh_analytics.ingest --append "
+               "updates.csv --snapshot`) to compare videos at equal age instead of by lifetime totals.")
+mark("Time Series")
 
 
 # ═══════════════════ SECTION 3: DURATION ══════════════════════════════════════
 st.markdown('<div class="section-header"><h2>⏱️ Duration Sweet Spot</h2></div>', unsafe_allow_html=True)
 
-buckets = [(0, 3), (3, 5), (5, 8), (8, 10), (10, 15), (15, 20), (20, 30), (30, 999)]
-bucket_labels = ["0–3m", "3–5m", "5–8m", "8–10m", "10–15m", "15–20m", "20–30m", "30+m"]
-
-dur_data = []
-for (lo, hi), label in zip(buckets, bucket_labels):
-    mask = (fdf["duration_min"] >= lo) & (fdf["duration_min"] < hi)
-    group = fdf[mask]
-    if len(group) > 0:
-        dur_data.append({
-            "Bucket": label,
-            "Count": len(group),
-            "Avg Views": group["view_count"].mean(),
-            "Med Views": group["view_count"].median(),
-        })
-
-dur_df = pd.DataFrame(dur_data)
+dur_df = aggs["dur_df"]
 
 col1, col2 = st.columns(2)
 
 with col1:
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=dur_df["Bucket"], y=dur_df["Avg Views"],
-                         name="Average Reach",
-                         marker_color=["#cbd5e1" if v < dur_df["Avg Views"].max() else ACCENT_1 for v in dur_df["Avg Views"]],
-                         marker=dict(line=dict(width=0))))
-    fig.add_trace(go.Scatter(x=dur_df["Bucket"], y=dur_df["Med Views"],
-                             name="Median Reach", mode="lines+markers",
-                             line=dict(color=FG, width=3),
-                             marker=dict(size=8, color=CARD_BG, line=dict(color=FG, width=2))))
-    fig.update_layout(title="Reach Density by Format Length", **PLOT_LAYOUT,
-                      legend=dict(x=0.02, y=0.98, bgcolor="rgba(255,255,255,0.9)", bordercolor=BORDER, borderwidth=1))
-    fig = update_axes(fig)
-    st.plotly_chart(fig, use_container_width=True, theme=None)
+    st.plotly_chart(figure("duration", figs.duration, dur_df), use_container_width=True, theme=None)
 
 with col2:
-    fig = px.scatter(fdf[fdf["duration_min"] <= 60], x="duration_min", y="view_count",
-                     color="category", title="Duration vs Reach Map",
-                     color_discrete_sequence=COLORS, opacity=0.7,
-                     hover_data=["title"])
-    fig.update_layout(**PLOT_LAYOUT, showlegend=False)
-    fig.update_traces(marker=dict(line=dict(width=1, color="white")))
-    fig = update_axes(fig)
-    fig.update_xaxes(title="Runtime (minutes)")
-    fig.update_yaxes(title="Total Views")
-    st.plotly_chart(fig, use_container_width=True, theme=None)
+    reach_df = fdf[fdf["duration_min"] <= 60]
+    map_mode = st.radio("Map mode", ["Points", "Density"], horizontal=True,
+                        key="reach_map_mode", label_visibility="collapsed")
 
-st.markdown(f"""
-<div class="insight-box">
-    <strong>💡 Optimal Format 15–20m:</strong> This runtime delivers <strong>2.5× the channel average</strong> (148K avg views)
-    with a proven sample size of 89 videos. 30+ minutes performs technically higher on average (due to massive hits), but mid-longform is much safer.
-</div>
-""", unsafe_allow_html=True)
+    if map_mode == "Density":
+        grid = agg.density_grid(reach_df, "duration_min", "view_count", DENSITY_BINS, x_range=(0, 60))
+        fig = figure("reach_density", figs.reach_density, *grid)
+    else:
+        points = agg.sample_points(reach_df, SCATTER_MAX_POINTS)
+        fig = figure("reach_map", figs.reach_map, points, cat_order=tuple(map(str, reach_df["category"].unique())))
+
+    event = st.plotly_chart(fig, use_container_width=True, theme=None, key="reach_map",
+                            on_select="rerun", selection_mode=("points", "box", "lasso"))
+
+    if map_mode == "Points" and event.selection.points:
+        picked = points.iloc[[p["point_index"] for p in event.selection.points]]
+        st.dataframe(engine.with_duration_labels(picked)[["title", "view_count", "duration", "category"]]
+                     .sort_values("view_count", ascending=False), use_container_width=True, hide_index=True)
+
+insight_box(insights.best_duration(dur_df, baseline))
+mark("Duration")
 
 
 # ═══════════════════ SECTION 4: UPLOAD TIMING ═════════════════════════════════
@@ -532,155 +694,102 @@ st.markdown('<div class="section-header"><h2>🕐 Upload Telemetry</h2></div>',
 col1, col2 = st.columns(2)
 
 with col1:
-    day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    day_df = fdf.groupby("day_of_week")["view_count"].mean().reindex(day_order).reset_index()
-    day_df.columns = ["Day", "Avg Views"]
-
-    fig = go.Figure(go.Bar(
-        x=day_df["Day"], y=day_df["Avg Views"],
-        marker_color=[PRIMARY if d == "Tuesday" else "#cbd5e1" for d in day_df["Day"]],
-        text=[f"{v/1000:.0f}K" for v in day_df["Avg Views"]],
-        textposition="outside", textfont=dict(color=FG, weight="bold"),
-        marker=dict(line=dict(width=0))
-    ))
-    fig.update_layout(title="Velocity by Weekday", **PLOT_LAYOUT)
-    fig = update_axes(fig)
-    fig.update_yaxes(range=[0, day_df["Avg Views"].max() * 1.2])
-    st.plotly_chart(fig, use_container_width=True, theme=None)
+    best_day = insights.best_slot(cached_slots(spec, "MMT", None, store.version), baseline).subject
+    st.plotly_chart(figure("weekday", figs.weekday, aggs["day_df"], highlight=best_day),
+                    use_container_width=True, theme=None)
 
 with col2:
-    fdf_hour = fdf.copy()
-    fdf_hour["hour"] = fdf_hour["upload_hour"].str.split(":").str[0].astype(int)
-    hour_df = fdf_hour.groupby("hour")["view_count"].mean().reset_index()
-    hour_df.columns = ["Hour", "Avg Views"]
-
-    fig = go.Figure(go.Bar(
-        x=[f"{h:02d}:00" for h in hour_df["Hour"]],
-        y=hour_df["Avg Views"],
-        marker_color=ACCENT_5,
-        marker=dict(line=dict(width=0))
-    ))
-    fig.update_layout(title="Velocity by Hour (UTC)", **PLOT_LAYOUT)
-    fig = update_axes(fig)
-    st.plotly_chart(fig, use_container_width=True, theme=None)
+    clock = st.radio("Clock", ["MMT", "UTC"], horizontal=True, key="hour_clock", label_visibility="collapsed")
+    hour_df = aggs["hour_df_mmt"] if clock == "MMT" else aggs["hour_df"]
+    st.plotly_chart(figure("hour", figs.hour, hour_df, clock=clock), use_container_width=True, theme=None)
 
+st.markdown("#### 🗓️ Flagship Slots")
+col1, col2 = st.columns([1, 4])
 
-# ═══════════════════ SECTION 5: CATEGORIES ════════════════════════════════════
-st.markdown('<div class="section-header"><h2>🏷️ Category Matrices</h2></div>', unsafe_allow_html=True)
+with col1:
+    slot_metric = st.radio("Metric", list(SLOT_METRICS), format_func=SLOT_METRICS.get, key="slot_metric")
+    slot_vertical = st.selectbox("Vertical", [ALL_VERTICALS, *categories], key="slot_vertical")
 
-cat_stats = fdf.groupby("category").agg(
-    count=("view_count", "size"),
-    avg_views=("view_count", "mean"),
-    med_views=("view_count", "median"),
-    total_views=("view_count", "sum"),
-).reset_index().sort_values("avg_views", ascending=False)
+with col2:
+    slot_df = cached_slots(spec, clock, None if slot_vertical == ALL_VERTICALS else slot_vertical, store.version)
+    st.plotly_chart(figure("slot_heatmap", figs.slot_heatmap, slot_df, metric=slot_metric,
+                           label=SLOT_METRICS[slot_metric], clock=clock),
+                    use_container_width=True, theme=None)
+    # Same rule as the Flagship Slot card, so on the MMT clock over all verticals they agree.
+    best = slots.best_slot(slot_df)
+    note = f"Faded cells have fewer than {insights.MIN_SAMPLE} videos."
+    if best is not None:
+        note = (f"Highest-average {clock} slot with {insights.MIN_SAMPLE}+ videos: "
+                f"**{best['day']} {best['hour']:02d}:00** ({best['avg_views']:,.0f} average · "
+                f"{best['median_views']:,.0f} median views, {best['videos']} videos). " + note)
+    st.caption(note)
+mark("Upload Timing")
 
-col1, col2 = st.columns(2)
 
-with col1:
-    fig = go.Figure(go.Bar(
-        y=cat_stats["category"],
-        x=cat_stats["avg_views"],
-        orientation="h",
-        marker_color=COLORS[:len(cat_stats)],
-        text=[f"{v/1000:.0f}K" for v in cat_stats["avg_views"]],
-        textposition="outside", textfont=dict(color=FG, size=12, weight=600),
-        marker=dict(line=dict(width=0))
-    ))
-    fig.update_layout(title="Average Reach by Vertical", height=500, **PLOT_LAYOUT)
-    fig.update_yaxes(autorange="reversed")
-    fig = update_axes(fig)
-    st.plotly_chart(fig, use_container_width=True, theme=None)
+# ═══════════════════ SECTION 5: CATEGORIES ════════════════════════════════════
+st.markdown('<div class="section-header"><h2>🏷️ Category Matrices</h2></div>', unsafe_allow_html=True)
 
-with col2:
-    # Stacked bar area
-    cat_year = fdf.groupby(["year", "category"]).size().reset_index(name="count")
-    year_totals = fdf.groupby("year").size().reset_index(name="total")
-    cat_year = cat_year.merge(year_totals, on="year")
-    cat_year["pct"] = cat_year["count"] / cat_year["total"] * 100
-
-    key_cats = ["Knowledge", "Review", "Showcases", "Battery Drain Test",
-                "First Impressions", "Wassup", "Shorts", "uncategorized"]
-    cat_year_key = cat_year[cat_year["category"].isin(key_cats)].copy()
-
-    fig = go.Figure()
-    for i, cat in enumerate(key_cats):
-        cat_data = cat_year_key[cat_year_key["category"] == cat].sort_values("year")
-        fig.add_trace(go.Bar(
-            x=cat_data["year"],
-            y=cat_data["pct"],
-            name=cat,
-            marker_color=COLORS[i % len(COLORS)],
-            marker=dict(line=dict(color=CARD_BG, width=1))
-        ))
-
-    fig.update_layout(
-        title="Vertical Strategy Evolution (% of timeline)",
-        barmode="stack",
-        height=500,
-        **PLOT_LAYOUT,
-        legend=dict(x=0, y=-0.25, orientation="h", font=dict(size=11)),
-    )
-    fig = update_axes(fig)
-    fig.update_xaxes(title="Year", dtick=1)
-    fig.update_yaxes(title="% of Output")
-    st.plotly_chart(fig, use_container_width=True, theme=None)
-
-
-# ═══════════════════ SECTION 6: RECOMMENDATIONS ══════════════════════════════
+if section_open("categories", "category matrices"):
+    cat_stats = aggs["cat_stats"]
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.plotly_chart(figure("category_reach", figs.category_reach, cat_stats), use_container_width=True, theme=None)
+
+    with col2:
+        st.plotly_chart(figure("category_mix", figs.category_mix, aggs["cat_year"], key_cats=figs.KEY_CATEGORIES),
+                        use_container_width=True, theme=None)
+mark("Categories")
+
+
+# ═══════════════════ SECTION 6: COHORTS ═══════════════════════════════════════
+st.markdown('<div class="section-header"><h2>🧬 Cohort Performance</h2></div>', unsafe_allow_html=True)
+
+if section_open("cohorts", "cohort analysis"):
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.plotly_chart(figure("cohort_heatmap", figs.cohort_heatmap, cached_cohorts(spec, store.version)),
+                        use_container_width=True, theme=None)
+
+    with col2:
+        generation = snapshot_manifest["generation"] if snapshot_manifest else 0
+        st.plotly_chart(figure("age_curves", figs.age_curves, cached_age_curves(spec, generation, store.version)),
+                        use_container_width=True, theme=None)
+        if not snapshot_manifest:
+            st.caption("Only lifetime views until snapshots are recorded; 24h / 7d / 30d points fill in as videos age.")
+
+    # Each video against the median of its upload month × vertical cohort.
+    st.markdown("#### 🎯 Cohort Outliers")
+    direction = st.radio("Outliers", ["Over-performers", "Under-performers"], horizontal=True,
+                         key="cohort_direction", label_visibility="collapsed")
+    outliers = cached_outliers(spec, direction == "Under-performers", store.version)
+    if outliers.empty:
+        st.caption(f"No video in the current filters sits in a cohort of {cohorts.MIN_COHORT}+ videos.")
+    else:
+        table = outliers.drop(columns="outlier_score").rename(columns={
+            "title": "Content Title", "month": "Cohort", "category": "Vertical", "view_count": "Reach",
+            "cohort_size": "Cohort Size", "cohort_median": "Cohort Median", "perf_index": "× Median",
+            "cohort_pct": "Cohort Percentile"})
+        st.dataframe(table, use_container_width=True, hide_index=True,
+                     column_config={"Cohort Median": st.column_config.NumberColumn(format="%.0f"),
+                                    "× Median": st.column_config.NumberColumn(format="%.2f×"),
+                                    "Cohort Percentile": st.column_config.ProgressColumn(min_value=0, max_value=1)})
+mark("Cohorts")
+
+
+# ═══════════════════ SECTION 7: RECOMMENDATIONS ══════════════════════════════
 st.markdown('<div class="section-header"><h2>🎯 Actionable Intel</h2></div>', unsafe_allow_html=True)
 
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown(f"""
-    <div class="rec-card green">
-        <div class="rec-card-header">
-            <div class="rec-icon">✓</div>
-            <h4>Scale the Engine</h4>
-        </div>
-        <p><b>Knowledge is king.</b> 128K avg views, 4.9% like rate. It claimed 67.6% of output in 2026 for a reason. Stabilize at 50–60% of total schedule at steady state.</p>
-    </div>
-    <div class="rec-card green">
-        <div class="rec-card-header">
-            <div class="rec-icon">✓</div>
-            <h4>Adopt the 15M Standard</h4>
-        </div>
-        <p>15-20 min features pull <b>2.5× higher volume.</b> This is the algorithmic sweet spot matching production capability to viewer retention.</p>
-    </div>
-    <div class="rec-card blue">
-        <div class="rec-card-header">
-            <div class="rec-icon">↗</div>
-            <h4>Leverage Q4 Momentum</h4>
-        </div>
-        <p>September through December is a massive growth window (iPhone + holiday cycle). Plan major tentpole content well in advance of Q4.</p>
-    </div>
-    """, unsafe_allow_html=True)
+if section_open("intel", "recommendations"):
+    intel = cached_insights(spec, store.version)
+    col1, col2 = st.columns(2)
+    for col, keys in ((col1, ("leader", "duration", "engagement")), (col2, ("weak", "slot", "gems"))):
+        cards = "".join(rec_card(intel[k]) for k in keys if k in intel)
+        col.markdown(cards, unsafe_allow_html=True)
+mark("Recommendations")
 
-with col2:
-    st.markdown(f"""
-    <div class="rec-card red">
-        <div class="rec-card-header">
-            <div class="rec-icon">✕</div>
-            <h4>Sever the Weak Links</h4>
-        </div>
-        <p><b>Cut Showcases format by half AND completely halt Shorts.</b> Showcases average 39% beneath channel baseline. Shorts are dead weight (7.5K avg) on deep-tech channels.</p>
-    </div>
-    <div class="rec-card blue">
-        <div class="rec-card-header">
-            <div class="rec-icon">↗</div>
-            <h4>Establish 'Flagship Slots'</h4>
-        </div>
-        <p><b>Tuesday at 8:30 PM MMT</b> peaks at 171.6K views on average. Treat this window as sacred ground for highest-value productions to hack early-momentum.</p>
-    </div>
-    <div class="rec-card blue">
-        <div class="rec-card-header">
-            <div class="rec-icon">↗</div>
-            <h4>Scale Hidden Gems</h4>
-        </div>
-        <p><b>Comparisons (158K) & Unboxings (151K).</b> These are significantly underproduced relative to their high, consistent return profiles.</p>
-    </div>
-    """, unsafe_allow_html=True)
 
 # ═══════════════════ FOOTER ═══════════════════════════════════════════════════
 st.markdown("<br><hr>", unsafe_allow_html=True)
@@ -690,3 +799,28 @@ st.markdown(f"""
     Data sourced live via YouTube Data API v3 &nbsp;•&nbsp; Generated February 28, 2026
 </div>
 """, unsafe_allow_html=True)
+
+if show_figure_stats:
+    with st.sidebar:
+        st.markdown("### 🧪 Figure Telemetry")
+        stats = pd.DataFrame(FIGURE_STATS)
+        st.caption(f"{stats['JSON KB'].sum():,.0f} KB across {len(stats)} figures · "
+                   f"{(stats['Cache'] == 'hit').sum()} cache hits")
+        st.dataframe(stats.sort_values("JSON KB", ascending=False), use_container_width=True, hide_index=True)
+        shared = shared_results().stats()
+        st.caption(f"Shared results: {shared['entries']} entries · {shared['hits']} hits · "
+                   f"{shared['misses']} misses (process-wide)")
+
+if PROFILE:
+    @st.cache_resource(show_spinner="Profiling cold imports…")
+    def cold_imports():
+        return import_profile()
+
+    with st.sidebar:
+        st.markdown("### ⏱️ Startup Profile")
+        stages = mark.frame()
+        kpi_ms = stages.loc[stages["stage"] == "KPI row", "at_ms"].iloc[0]
+        st.caption(f"First KPI at {kpi_ms:,.0f} ms · full run {stages['at_ms'].iloc[-1]:,.0f} ms")
+        st.dataframe(stages.round(1), use_container_width=True, hide_index=True)
+        st.caption("Cold imports (fresh interpreter, ms)")
+        st.dataframe(cold_imports().round(1), use_container_width=True, hide_index=True)
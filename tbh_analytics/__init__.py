@@ -0,0 +1,39 @@
+"""
+TBH Labs Myanmar — Headless Analytics
+=====================================
+Data loading, aggregation and the analytics engine behind dashboard.py,
+importable without Streamlit or Plotly.
+
+    from tbh_analytics import FilterSpec, VideoStore, analyze
+    store = VideoStore()
+    tables = analyze(store.frame, FilterSpec.of(years=[2025, 2026]), store.cube)
+
+CLI: python -m tbh_analytics --help
+"""
+
+import importlib
+
+# Public name → submodule. Loaded on first access rather than here, so that
+# `python -m tbh_analytics.<module>` does not find its module already
+# imported by the package (runpy's "found in sys.modules" warning).
+_EXPORTS = {
+    "FilterSpec": "engine", "analyze": "engine", "overview_stats": "engine", "section_tables": "engine",
+    "series": "engine", "top_videos": "engine", "view_percentiles": "engine",
+    "load_partitions": "dataset",
+    "CSV_PATH": "ingest", "DAY_ORDER": "ingest", "load_frame": "ingest",
+    "PartitionStore": "store", "VideoStore": "store",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_EXPORTS])
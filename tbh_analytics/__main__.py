@@ -0,0 +1,70 @@
+"""
+Compute the dashboard's numbers headlessly.
+
+Run: python -m tbh_analytics --years 2025 2026 --categories Knowledge Review
+     python -m tbh_analytics --json tables.json
+     python -m tbh_analytics --dataset data --channels tbh-labs --years 2025
+     python -m tbh_analytics --search "AI"
+"""
+
+import argparse
+import json
+
+import pandas as pd
+
+from .engine import FilterSpec, analyze
+from .ingest import CSV_PATH
+from .store import PartitionStore, VideoStore
+
+
+def _jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="records", date_format="iso"))
+    if isinstance(value, pd.Series):
+        return {str(k): v for k, v in value.items()}
+    if isinstance(value, dict):
+        return {k: v._asdict() if hasattr(v, "_asdict") else v for k, v in value.items()}
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m tbh_analytics", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--dataset", help="read this partitioned dataset instead of --csv")
+    parser.add_argument("--channels", nargs="+", help="dataset channels to read (default: all)")
+    parser.add_argument("--years", type=int, nargs="+")
+    parser.add_argument("--categories", nargs="+")
+    parser.add_argument("--min-views", type=int, default=0)
+    parser.add_argument("--search", help="keep videos whose titles match these keywords")
+    parser.add_argument("--since", type=int, default=2021, help="drop years before this, as the dashboard does")
+    parser.add_argument("--freq", choices=["W", "M", "Q"], default="M")
+    parser.add_argument("--json", help="write every table to this file instead of printing")
+    args = parser.parse_args()
+
+    spec = FilterSpec.of(args.years, args.categories, args.min_views)
+    if args.dataset:
+        # Every filter but the view threshold and keywords is pushed down to the partition scan.
+        store = PartitionStore(args.dataset, args.channels, spec.years, spec.categories, args.since)
+    else:
+        store = VideoStore(args.csv)
+    frame = store.since(args.since)
+    if args.search:
+        spec = spec._replace(video_ids=store.keyword_index(args.since).lookup(args.search))
+    tables = analyze(frame, spec, store.cube, args.freq, store.slot_grid(args.since))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({name: _jsonable(t) for name, t in tables.items()}, fh, ensure_ascii=False, indent=2, default=str)
+        print(f"Wrote {len(tables)} tables → {args.json}")
+        return
+    with pd.option_context("display.width", 160, "display.max_columns", 20):
+        for name, table in tables.items():
+            print(f"\n── {name} " + "─" * (60 - len(name)))
+            if name == "insights":
+                table = "\n".join(f"{i.title}: {i.headline} {i.detail} (n={i.n}, {i.confidence})"
+                                   for i in table.values())
+            print(table)
+
+
+if __name__ == "__main__":
+    main()
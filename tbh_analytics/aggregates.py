@@ -0,0 +1,190 @@
+"""
+TBH Labs Myanmar — Aggregations
+===============================
+Section-level aggregations behind the dashboard charts. Every function takes a
+(filtered) video frame and returns a small summary frame; nothing here touches
+Streamlit or Plotly.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Right-open minute edges; the last bucket is unbounded.
+DURATION_EDGES = (0, 3, 5, 8, 10, 15, 20, 30, np.inf)
+
+# Time-series granularities (pandas period aliases) and the momentum window.
+SERIES_FREQS = {"W": "Week", "M": "Month", "Q": "Quarter"}
+MOMENTUM_WINDOW = 3
+
+
+def bucket_labels(edges):
+    """"0–3m", "3–5m", …, "30+m" for the given minute edges."""
+    labels = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        labels.append(f"{lo:g}+m" if np.isinf(hi) else f"{lo:g}–{hi:g}m")
+    return labels
+
+
+def duration_buckets(frame, edges=DURATION_EDGES, labels=None):
+    """Count / mean / median views per runtime bucket in a single binning pass.
+
+    Empty buckets are dropped, matching the chart's previous behaviour.
+    """
+    labels = list(labels) if labels is not None else bucket_labels(edges)
+    bins = pd.cut(frame["duration_min"], bins=list(edges), labels=labels, right=False)
+    stats = frame["view_count"].groupby(bins, observed=True).agg(["size", "mean", "median"])
+    stats = stats.reset_index()
+    stats.columns = ["Bucket", "Count", "Avg Views", "Med Views"]
+    stats["Bucket"] = stats["Bucket"].astype(str)
+    return stats
+
+
+# ── Section aggregates ───────────────────────────────────────────────────────
+def series_from_sums(sums, window=MOMENTUM_WINDOW):
+    """Means, like-rate and rolling momentum from per-period n/views/likes sums.
+
+    Shared by the row path below and the cube roll-up, so both produce the same table.
+    """
+    series = pd.DataFrame({
+        "period": sums["period"],
+        "count": sums["n"],
+        "total_views": sums["views"],
+        "total_likes": sums["likes"],
+    })
+    series["avg_views"] = series["total_views"] / series["count"]
+    series["avg_likes"] = series["total_likes"] / series["count"]
+    series["like_rate_pct"] = series["total_likes"] / series["total_views"] * 100
+    series["momentum"] = series["avg_views"].rolling(window, min_periods=1).mean()
+    return series
+
+
+def period_labels(periods, freq):
+    """Weeks are labelled by their start date; months/quarters by pandas' period string."""
+    if freq == "W":
+        return periods.dt.start_time.dt.strftime("%Y-%m-%d")
+    return periods.astype(str)
+
+
+def time_series(frame, freq="M", window=MOMENTUM_WINDOW):
+    """Upload count, reach and like-rate per week/month/quarter using native reducers only."""
+    if freq not in SERIES_FREQS:
+        raise ValueError(f"freq must be one of {sorted(SERIES_FREQS)}, got {freq!r}")
+    periods = frame["upload_date"].dt.to_period(freq).rename("period")
+    sums = frame.groupby(periods).agg(
+        n=("view_count", "size"),
+        views=("view_count", "sum"),
+        likes=("like_count", "sum"),
+    ).reset_index()
+    sums["period"] = period_labels(sums["period"], freq)
+    return series_from_sums(sums, window)
+
+
+def quarterly_engagement(frame):
+    eng_q = frame.groupby("quarter", observed=True).agg(
+        videos=("view_count", "size"),
+        like_sum=("like_count", "sum"),
+        view_sum=("view_count", "sum"),
+        avg_comments=("comment_count", "mean"),
+    ).reset_index()
+    eng_q["like_rate"] = eng_q["like_sum"] / eng_q["view_sum"] * 100
+    return eng_q
+
+
+def day_codes(days, day_order):
+    """0-based position of each weekday in `day_order` (-1 if missing)."""
+    if isinstance(days.dtype, pd.CategoricalDtype) and list(days.cat.categories) == list(day_order):
+        return days.cat.codes.to_numpy("int64")
+    return pd.Categorical(days, categories=day_order).codes.astype("int64")
+
+
+def slot_sums(frame, day_order, day_column="day_of_week", hour_column="upload_hour_int"):
+    """(videos, views) per weekday × hour as dense (7, 24) arrays, from one bincount pass."""
+    slot = day_codes(frame[day_column], day_order) * 24 + frame[hour_column].to_numpy("int64")
+    size = len(day_order) * 24
+    videos = np.bincount(slot, minlength=size).reshape(len(day_order), 24)
+    views = np.bincount(slot, weights=frame["view_count"].to_numpy("float64"), minlength=size)
+    return videos, views.reshape(len(day_order), 24)
+
+
+def weekday_stats(frame, day_order, sums=None):
+    """Average views per weekday; `sums` is slot_sums() output, if already computed."""
+    videos, views = sums if sums is not None else slot_sums(frame, day_order)
+    count = videos.sum(axis=1)
+    with np.errstate(invalid="ignore"):
+        avg = views.sum(axis=1) / count
+    return pd.DataFrame({"Day": list(day_order), "Avg Views": avg, "Count": count.astype("int64")})
+
+
+def hour_stats(frame, column="upload_hour_int", sums=None):
+    """Average views per upload hour; pass column="upload_hour_mmt" (and MMT sums) for Myanmar Time."""
+    if sums is None:
+        hours = frame[column].to_numpy("int64")
+        count = np.bincount(hours, minlength=24)
+        views = np.bincount(hours, weights=frame["view_count"].to_numpy("float64"), minlength=24)
+    else:
+        count, views = sums[0].sum(axis=0), sums[1].sum(axis=0)
+    seen = np.flatnonzero(count)
+    return pd.DataFrame({"Hour": seen, "Avg Views": views[seen] / count[seen], "Count": count[seen].astype("int64")})
+
+
+def category_stats(frame):
+    cat_stats = frame.groupby("category", observed=True).agg(
+        count=("view_count", "size"),
+        avg_views=("view_count", "mean"),
+        med_views=("view_count", "median"),
+        total_views=("view_count", "sum"),
+        total_likes=("like_count", "sum"),
+    ).reset_index()
+    cat_stats["like_rate"] = cat_stats.pop("total_likes") / cat_stats["total_views"] * 100
+    return cat_stats.sort_values("avg_views", ascending=False)
+
+
+def category_share_by_year(frame):
+    cat_year = frame.groupby(["year", "category"], observed=True).size().reset_index(name="count")
+    year_totals = frame.groupby("year").size().reset_index(name="total")
+    cat_year = cat_year.merge(year_totals, on="year")
+    cat_year["pct"] = cat_year["count"] / cat_year["total"] * 100
+    return cat_year
+
+
+def section_aggregates(frame, day_order, duration_edges=DURATION_EDGES):
+    """Every per-section table the dashboard draws, computed from one filtered frame."""
+    utc = slot_sums(frame, day_order)
+    mmt = slot_sums(frame, day_order, "day_of_week_mmt", "upload_hour_mmt")
+    return {
+        "eng_q": quarterly_engagement(frame),
+        "dur_df": duration_buckets(frame, duration_edges),
+        "day_df": weekday_stats(frame, day_order, utc),
+        "hour_df": hour_stats(frame, sums=utc),
+        "hour_df_mmt": hour_stats(frame, "upload_hour_mmt", sums=mmt),
+        "cat_stats": category_stats(frame),
+        "cat_year": category_share_by_year(frame),
+    }
+
+
+# ── Scatter payload reduction ────────────────────────────────────────────────
+def sample_points(frame, max_points, keep_top=200, by="view_count"):
+    """Bounded, deterministic subset for point charts: the `keep_top` largest
+    values of `by` (so breakout hits always render) plus a seeded random sample."""
+    if len(frame) <= max_points:
+        return frame
+    top = frame.nlargest(keep_top, by)
+    rest = frame.drop(top.index).sample(max_points - len(top), random_state=0)
+    return pd.concat([top, rest])
+
+
+def density_grid(frame, x, y, bins=(60, 40), x_range=None):
+    """2-D histogram of two columns, binned server-side so only the grid ships.
+
+    Returns (x_centers, y_centers, counts) with counts shaped (len(y), len(x)).
+    """
+    x_range = x_range or (0, float(frame[x].max()) if len(frame) else 1.0)
+    y_range = (0, float(frame[y].max()) if len(frame) else 1.0)
+    counts, x_edges, y_edges = np.histogram2d(frame[x], frame[y], bins=bins, range=[x_range, y_range])
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, counts.T
+
+
+def value_histogram(values, bins=50):
+    """Equal-width histogram computed server-side; one row per bin."""
+    counts, edges = np.histogram(np.asarray(values, dtype="float64"), bins=bins)
+    return pd.DataFrame({"left": edges[:-1], "right": edges[1:], "count": counts})
@@ -0,0 +1,240 @@
+"""
+TBH Labs Myanmar — YouTube Collector
+====================================
+Regenerates TBH_Labs_Myanmar_Videos.csv from the YouTube Data API v3.
+
+Video IDs are batched 50 per `videos.list` call and the batches are fetched
+concurrently over a bounded pool of keep-alive connections. Quota/rate-limit
+and transient server errors are retried with exponential backoff. The HTTP
+layer is a pluggable transport, so `--base-url` (or a custom transport
+object) can point the collector at a local stub server instead of Google.
+
+Run: YOUTUBE_API_KEY=... python -m tbh_analytics.collector --channel UCxxxxxxxx
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import queue
+import random
+import re
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from .ingest import CSV_PATH
+
+API_BASE = "https://www.googleapis.com/youtube/v3"
+BATCH_SIZE = 50  # videos.list / playlistItems.list maximum
+CSV_COLUMNS = ["video_id", "title", "view_count", "like_count", "comment_count", "duration",
+               "duration_seconds", "upload_date", "upload_hour", "day_of_week", "category"]
+DEFAULT_CATEGORY = "uncategorized"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# The last two are the transport's own: a dropped connection or a body that
+# is not JSON (e.g. a proxy's HTML error page).
+RETRY_REASONS = {"quotaExceeded", "rateLimitExceeded", "userRateLimitExceeded", "backendError",
+                 "connectionError", "invalidResponse"}
+
+_ISO_DURATION = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+class ApiError(Exception):
+    def __init__(self, status, reason, message=""):
+        super().__init__(f"HTTP {status} ({reason}): {message}")
+        self.status = status
+        self.reason = reason
+
+    @property
+    def retryable(self):
+        return self.status in RETRY_STATUSES or self.reason in RETRY_REASONS
+
+
+# ── Transport ────────────────────────────────────────────────────────────────
+class HttpTransport:
+    """Default transport: blocking http.client calls over a bounded pool of
+    keep-alive connections, run on a thread pool of the same size.
+
+    Any object with `async get(url, params) -> dict` (raising ApiError on
+    failure) and `close()` can replace it.
+    """
+
+    def __init__(self, max_connections=8, timeout=30):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_connections)
+        self._idle = queue.LifoQueue()
+
+    def _connection(self, parts):
+        try:
+            conn = self._idle.get_nowait()
+            if (conn.host, conn.port) == (parts.hostname, parts.port or conn.default_port):
+                return conn
+            conn.close()
+        except queue.Empty:
+            pass
+        cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        return cls(parts.hostname, parts.port, timeout=self.timeout)
+
+    def _get(self, url, params):
+        parts = urllib.parse.urlsplit(url)
+        target = f"{parts.path}?{urllib.parse.urlencode(params)}"
+        conn = self._connection(parts)
+        try:
+            conn.request("GET", target, headers={"Accept": "application/json"})
+            resp = conn.getresponse()
+            body = resp.read()
+        except (OSError, http.client.HTTPException) as exc:  # incl. timeouts and RemoteDisconnected
+            conn.close()
+            raise ApiError(0, "connectionError", f"{type(exc).__name__}: {exc}") from exc
+        self._idle.put(conn)
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            payload = None
+        if resp.status >= 400:
+            error = payload.get("error", {}) if isinstance(payload, dict) else {}
+            reason = (error.get("errors") or [{}])[0].get("reason", "")
+            raise ApiError(resp.status, reason, error.get("message", "") or body[:200].decode("utf-8", "replace"))
+        if not isinstance(payload, dict):
+            raise ApiError(resp.status, "invalidResponse", body[:200].decode("utf-8", "replace"))
+        return payload
+
+    async def get(self, url, params):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._get, url, params)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+# ── Row mapping ──────────────────────────────────────────────────────────────
+def parse_iso_duration(value):
+    match = _ISO_DURATION.match(value or "")
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def video_row(item, category=DEFAULT_CATEGORY):
+    """One `videos.list` item → one CSV row (timestamps in UTC, duration as total MM:SS)."""
+    stats = item.get("statistics", {})
+    seconds = parse_iso_duration(item.get("contentDetails", {}).get("duration"))
+    published = datetime.fromisoformat(item["snippet"]["publishedAt"].replace("Z", "+00:00"))
+    return {
+        "video_id": item["id"],
+        "title": item["snippet"]["title"],
+        "view_count": int(stats.get("viewCount", 0)),
+        "like_count": int(stats.get("likeCount", 0)),
+        "comment_count": int(stats.get("commentCount", 0)),
+        "duration": f"{seconds // 60}:{seconds % 60:02d}",
+        "duration_seconds": seconds,
+        "upload_date": published.strftime("%Y-%m-%d"),
+        "upload_hour": published.strftime("%H:%M"),
+        "day_of_week": published.strftime("%A"),
+        "category": category,
+    }
+
+
+# ── Collector ────────────────────────────────────────────────────────────────
+class YouTubeCollector:
+    def __init__(self, api_key, transport=None, base_url=API_BASE, concurrency=8,
+                 max_retries=6, backoff=1.0, max_backoff=60.0):
+        self.api_key = api_key
+        self.transport = transport or HttpTransport(max_connections=concurrency)
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def call(self, endpoint, **params):
+        params["key"] = self.api_key
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._slots:
+                    return await self.transport.get(f"{self.base_url}/{endpoint}", params)
+            except ApiError as exc:
+                if not exc.retryable or attempt == self.max_retries:
+                    raise
+            # Full-jitter exponential backoff, outside the semaphore so other batches proceed.
+            await asyncio.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    async def upload_ids(self, channel_id):
+        """Every video ID in the channel's uploads playlist (paged, so inherently serial)."""
+        channel = await self.call("channels", part="contentDetails", id=channel_id)
+        playlist = channel["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+        ids, token = [], None
+        while True:
+            page = await self.call("playlistItems", part="contentDetails", playlistId=playlist,
+                                   maxResults=BATCH_SIZE, **({"pageToken": token} if token else {}))
+            ids.extend(item["contentDetails"]["videoId"] for item in page.get("items", []))
+            token = page.get("nextPageToken")
+            if not token:
+                return ids
+
+    async def videos(self, video_ids):
+        """`videos.list` items for all IDs: 50 per request, batches in flight concurrently."""
+        batches = [video_ids[i:i + BATCH_SIZE] for i in range(0, len(video_ids), BATCH_SIZE)]
+        pages = await asyncio.gather(*(
+            self.call("videos", part="snippet,contentDetails,statistics", id=",".join(batch), maxResults=BATCH_SIZE)
+            for batch in batches
+        ))
+        return [item for page in pages for item in page.get("items", [])]
+
+    async def collect(self, channel_id=None, video_ids=None, categories=None):
+        """Frame in the dashboard CSV schema. `categories` maps video_id → category."""
+        if video_ids is None:
+            video_ids = await self.upload_ids(channel_id)
+        categories = categories or {}
+        rows = [video_row(item, categories.get(item["id"], DEFAULT_CATEGORY))
+                for item in await self.videos(list(video_ids))]
+        return pd.DataFrame(rows, columns=CSV_COLUMNS).sort_values("upload_date", ascending=False, kind="stable")
+
+    def close(self):
+        self.transport.close()
+
+
+def existing_categories(csv_path):
+    """Keep curated categories from a previous CSV; the API has no notion of them."""
+    if not os.path.exists(csv_path):
+        return {}
+    prev = pd.read_csv(csv_path, usecols=["video_id", "category"], dtype=str)
+    return dict(zip(prev["video_id"], prev["category"]))
+
+
+async def _main(args):
+    collector = YouTubeCollector(args.api_key, base_url=args.base_url, concurrency=args.concurrency)
+    try:
+        ids = None
+        if args.ids:
+            with open(args.ids, encoding="utf-8") as fh:
+                ids = [line.strip() for line in fh if line.strip()]
+        frame = await collector.collect(args.channel, ids, existing_categories(args.categories))
+    finally:
+        collector.close()
+    frame.to_csv(args.out, index=False)
+    print(f"Wrote {len(frame)} videos → {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the video CSV from the YouTube Data API v3.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--channel", help="channel ID whose uploads playlist to crawl")
+    source.add_argument("--ids", help="file with one video ID per line")
+    parser.add_argument("--out", default=CSV_PATH)
+    parser.add_argument("--categories", default=CSV_PATH, help="CSV whose category column is carried over")
+    parser.add_argument("--api-key", default=os.environ.get("YOUTUBE_API_KEY"))
+    parser.add_argument("--base-url", default=API_BASE, help="API root; point at a local stub server for tests")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("an API key is required (--api-key or YOUTUBE_API_KEY)")
+    asyncio.run(_main(args))
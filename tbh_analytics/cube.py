@@ -0,0 +1,173 @@
+"""
+TBH Labs Myanmar — Aggregate Cubes
+==================================
+Pre-aggregates the video frame once at load time into one small cube per
+dashboard section: year × category × {month | quarter | weekday | hour
+(UTC and MMT)}. Each section's table is rolled up from its own cube, so its
+cost depends on a few thousand cells at most, not on row count. (A single
+cube over every dimension at once is nearly one cell per row and gains
+nothing over the rows themselves.)
+
+Medians cannot be summed, so category medians come from a ViewIndex over
+the cube's frame (view_count sorted once) and are exact, matching the row
+path.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import MOMENTUM_WINDOW, series_from_sums
+
+KEYS = ["year", "category"]
+# Section name → the third dimension of its cube.
+SECTIONS = {"month": "month", "quarter": "quarter", "weekday": "day_of_week",
+            "hour": "upload_hour_int", "hour_mmt": "upload_hour_mmt"}
+# Measure → the column it sums (None: a row count).
+MEASURES = {"n": None, "views": "view_count", "likes": "like_count", "comments": "comment_count"}
+
+
+def _cells(frame, dim, sign=1):
+    """Measures per (year, category, dim) cell of `frame`; categorical levels as plain strings.
+
+    `sign` (a scalar or one ±1 per row) weights each row, so one pass can
+    subtract old row versions and add new ones.
+    """
+    sign = np.broadcast_to(np.asarray(sign, dtype="int64"), len(frame))
+    values = pd.DataFrame({**{k: frame[k] for k in KEYS + [dim]},
+                           **{m: sign if col is None else frame[col].to_numpy("int64") * sign
+                              for m, col in MEASURES.items()}})
+    cells = values.groupby(KEYS + [dim], observed=True).sum()
+    levels = [level.astype(str) if isinstance(level, pd.CategoricalIndex) else level
+              for level in cells.index.levels]
+    cells.index = cells.index.set_levels(levels)
+    return cells
+
+
+# ── Build ────────────────────────────────────────────────────────────────────
+class Cube:
+    """One (year, category, dim)-indexed table of MEASURES per section, over `frame`."""
+
+    def __init__(self, sections, frame):
+        self.sections = sections
+        self.frame = frame
+        self._index = None
+
+    @property
+    def view_index(self):
+        """ViewIndex over `frame` for exact medians, sorted on first use."""
+        if self._index is None:
+            from .percentiles import ViewIndex
+
+            self._index = ViewIndex(self.frame)
+        return self._index
+
+    def rollup(self, section, by, years, categories):
+        """Section cells in `years` × `categories`, summed per `by` level(s).
+
+        A bincount over the MultiIndex codes; a pandas groupby costs more in
+        overhead than these few thousand cells take to sum.
+        """
+        cells = self.sections[section]
+        by = [by] if isinstance(by, str) else list(by)
+        codes = dict(zip(cells.index.names, cells.index.codes))
+        levels = dict(zip(cells.index.names, cells.index.levels))
+        keep = (levels["year"].isin(years)[codes["year"]]
+                & levels["category"].isin(categories)[codes["category"]])
+        shape = [len(levels[b]) for b in by]
+        group = np.ravel_multi_index([codes[b][keep] for b in by], shape)
+        size = int(np.prod(shape))
+        sums = {m: np.bincount(group, weights=cells[m].to_numpy()[keep], minlength=size).astype("int64")
+                for m in MEASURES}
+        seen = np.flatnonzero(sums["n"])
+        labels = np.unravel_index(seen, shape)
+        table = pd.DataFrame({**{b: levels[b][label] for b, label in zip(by, labels)},
+                              **{m: values[seen] for m, values in sums.items()}})
+        return table.sort_values(by, ignore_index=True)
+
+    def medians(self, years, categories):
+        """Exact median view_count per category within `years`."""
+        return self.view_index.category_quantiles(0.5, years, categories).rename("med_views").rename_axis("category")
+
+    def update(self, removed, added, frame):
+        """Patch the cube for rows that changed: subtract the old versions, add the new.
+
+        Only the cells those rows fall in are touched; cost scales with the
+        changed rows and the (small) section cubes, not the catalog. `frame`
+        is the updated frame; its ViewIndex is rebuilt (a full sort) on the
+        next median.
+        """
+        changed = added if removed.empty else pd.concat([removed, added])
+        sign = np.repeat([-1, 1], [len(removed), len(added)])
+        return Cube({name: _patch(cells, _cells(changed, SECTIONS[name], sign))
+                     for name, cells in self.sections.items()}, frame)
+
+
+def _patch(cells, delta):
+    delta = delta[(delta != 0).any(axis=1)]
+    if delta.empty:
+        return cells
+    pos = cells.index.get_indexer(delta.index)
+    hit = pos >= 0
+    values = cells.to_numpy(copy=True)
+    values[pos[hit]] += delta.to_numpy()[hit]
+    patched = pd.DataFrame(values, index=cells.index, columns=cells.columns)
+    if not hit.all():
+        patched = pd.concat([patched, delta[~hit]]).sort_index()
+    return patched[patched["n"] > 0]
+
+
+def build_cube(frame):
+    return Cube({name: _cells(frame, dim) for name, dim in SECTIONS.items()}, frame)
+
+
+# ── Section roll-ups ─────────────────────────────────────────────────────────
+# Period granularities the cube can answer (weeks are not a cube dimension).
+CUBE_FREQS = {"M": "month", "Q": "quarter"}
+
+
+def cube_series(cube, years, categories, freq="M", window=MOMENTUM_WINDOW):
+    """aggregates.time_series for monthly/quarterly periods, rolled up from the period's cube."""
+    dim = CUBE_FREQS[freq]
+    sums = cube.rollup(dim, dim, years, categories).rename(columns={dim: "period"})
+    return series_from_sums(sums, window)
+
+
+def cube_aggregates(cube, years, categories, day_order):
+    """The cube-backed equivalents of aggregates.section_aggregates (minus duration)."""
+    eng_q = cube.rollup("quarter", "quarter", years, categories)
+    eng_q = pd.DataFrame({
+        "quarter": eng_q["quarter"],
+        "videos": eng_q["n"],
+        "like_sum": eng_q["likes"],
+        "view_sum": eng_q["views"],
+        "avg_comments": eng_q["comments"] / eng_q["n"],
+    })
+    eng_q["like_rate"] = eng_q["like_sum"] / eng_q["view_sum"] * 100
+
+    day = cube.rollup("weekday", "day_of_week", years, categories).set_index("day_of_week")
+    day_df = pd.DataFrame({"Avg Views": day["views"] / day["n"], "Count": day["n"]}).reindex(day_order)
+    day_df = day_df.fillna({"Count": 0}).astype({"Count": "int64"}).rename_axis("Day").reset_index()
+
+    hour_tables = {}
+    for key, section in (("hour_df", "hour"), ("hour_df_mmt", "hour_mmt")):
+        dim = SECTIONS[section]
+        hour = cube.rollup(section, dim, years, categories)
+        hour_tables[key] = pd.DataFrame({"Hour": hour[dim], "Avg Views": hour["views"] / hour["n"], "Count": hour["n"]})
+
+    # Year × category totals roll up from the smallest cube.
+    cat_year = cube.rollup("quarter", KEYS, years, categories)
+    cat = cat_year.groupby("category")[list(MEASURES)].sum()
+    cat_stats = pd.DataFrame({
+        "count": cat["n"],
+        "avg_views": cat["views"] / cat["n"],
+        "med_views": cube.medians(years, cat.index),
+        "total_views": cat["views"],
+        "like_rate": cat["likes"] / cat["views"] * 100,
+    }).reset_index().sort_values("avg_views", ascending=False)
+
+    cat_year = cat_year[["year", "category", "n"]].rename(columns={"n": "count"})
+    cat_year["total"] = cat_year.groupby("year")["count"].transform("sum")
+    cat_year["pct"] = cat_year["count"] / cat_year["total"] * 100
+
+    return {"eng_q": eng_q, "day_df": day_df, **hour_tables,
+            "cat_stats": cat_stats, "cat_year": cat_year}
@@ -0,0 +1,142 @@
+"""
+TBH Labs Myanmar — Partitioned Dataset
+======================================
+Multi-channel archive laid out as Hive-style Arrow partitions:
+
+    data/channel=<name>/year=<yyyy>/part-0.arrow
+    data/manifest.json
+
+Each channel is imported from a CSV in the video schema, typed once by
+ingest.parse_csv. Loads prune whole partitions on channel and year from the
+directory names, and push the category filter into the Arrow scan, so memory
+and load time follow the selection rather than the archive. The manifest
+lists channels, years, categories and row counts, so selectors can be
+populated without reading any data.
+
+Run: python -m tbh_analytics.dataset add TBH_Labs_Myanmar_Videos.csv --channel tbh-labs
+     python -m tbh_analytics.dataset list
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .ingest import CATEGORICAL_COLUMNS, DAY_ORDER, STRING_DTYPE, _write_json_atomic, parse_csv
+
+DATASET_DIR = "data"
+PARTITIONING = ds.partitioning(pa.schema([("channel", pa.string()), ("year", pa.int16())]), flavor="hive")
+
+
+# ── Manifest ─────────────────────────────────────────────────────────────────
+def manifest_path(root=DATASET_DIR):
+    return os.path.join(root, "manifest.json")
+
+
+def read_manifest(root=DATASET_DIR):
+    try:
+        with open(manifest_path(root), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def channel_years(manifest, channels=None):
+    """Sorted years present for `channels` (all channels if None)."""
+    entries = manifest["channels"]
+    names = entries if channels is None else [c for c in channels if c in entries]
+    return sorted({int(y) for name in names for y in entries[name]["years"]})
+
+
+def channel_categories(manifest, channels=None):
+    """Sorted categories present for `channels` (all channels if None)."""
+    entries = manifest["channels"]
+    names = entries if channels is None else [c for c in channels if c in entries]
+    return sorted({c for name in names for c in entries[name]["categories"]})
+
+
+# ── Write ────────────────────────────────────────────────────────────────────
+def add_channel(csv_path, channel, root=DATASET_DIR):
+    """Parse `csv_path` and (re)write it as `channel`'s year partitions."""
+    frame = parse_csv(csv_path)
+    channel_dir = os.path.join(root, f"channel={channel}")
+    shutil.rmtree(channel_dir, ignore_errors=True)
+    os.makedirs(root, exist_ok=True)
+
+    table = pa.Table.from_pandas(frame.assign(channel=channel), preserve_index=False)
+    ds.write_dataset(table, root, format="ipc", partitioning=PARTITIONING,
+                     basename_template="part-{i}.arrow", existing_data_behavior="overwrite_or_ignore")
+
+    manifest = read_manifest(root) or {"generation": 0, "channels": {}}
+    manifest["channels"][channel] = {
+        "source": os.path.abspath(csv_path),
+        "rows": len(frame),
+        "years": {str(y): int(n) for y, n in frame["year"].value_counts().sort_index().items()},
+        "categories": sorted(map(str, frame["category"].unique())),
+    }
+    manifest["generation"] += 1
+    _write_json_atomic(manifest_path(root), manifest)
+    return frame
+
+
+# ── Read ─────────────────────────────────────────────────────────────────────
+def _predicate(channels, years, categories, since):
+    terms = []
+    if channels is not None:
+        terms.append(pc.field("channel").isin(list(channels)))
+    if years is not None:
+        terms.append(pc.field("year").isin([int(y) for y in years]))
+    if since is not None:
+        terms.append(pc.field("year") >= since)
+    if categories is not None:
+        terms.append(pc.field("category").isin(list(categories)))
+    if not terms:
+        return None
+    predicate = terms[0]
+    for term in terms[1:]:
+        predicate &= term
+    return predicate
+
+
+def load_partitions(root=DATASET_DIR, channels=None, years=None, categories=None, since=None):
+    """Typed frame for the selection; None leaves a dimension unfiltered.
+
+    Channel/year terms prune partition directories before any file is opened;
+    the category term is evaluated inside the scan.
+    """
+    dataset = ds.dataset(root, format="ipc", partitioning=PARTITIONING, exclude_invalid_files=True)
+    table = dataset.to_table(filter=_predicate(channels, years, categories, since)).unify_dictionaries()
+    strings = {pa.string(): STRING_DTYPE, pa.large_string(): STRING_DTYPE}
+    frame = table.to_pandas(split_blocks=True, types_mapper=strings.get)
+
+    # Partitions carry their own dictionaries; restore sorted (period) order.
+    for col in CATEGORICAL_COLUMNS:
+        frame[col] = frame[col].cat.reorder_categories(sorted(frame[col].cat.categories))
+    for col in ("day_of_week", "day_of_week_mmt"):
+        frame[col] = frame[col].cat.set_categories(DAY_ORDER, ordered=True)
+    frame["channel"] = frame["channel"].astype("category")
+    return frame
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the partitioned multi-channel dataset.")
+    parser.add_argument("--root", default=DATASET_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="import (or replace) a channel from a CSV in the video schema")
+    add.add_argument("csv")
+    add.add_argument("--channel", required=True)
+    commands.add_parser("list", help="show channels, years and row counts")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        frame = add_channel(args.csv, args.channel, args.root)
+        print(f"Wrote {len(frame)} rows for {args.channel} → {args.root}")
+    else:
+        manifest = read_manifest(args.root) or {"channels": {}}
+        for name, entry in sorted(manifest["channels"].items()):
+            years = ", ".join(f"{y}: {n}" for y, n in entry["years"].items())
+            print(f"{name}: {entry['rows']} rows ({years})")
@@ -0,0 +1,172 @@
+"""
+TBH Labs Myanmar — Analytics Engine
+===================================
+Pure functions from (video frame, filter spec) to every number the dashboard
+shows. Nothing here imports Streamlit or Plotly, so batch jobs and the CLI
+compute the same tables as the UI at a fraction of the import cost.
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import aggregates as agg
+from . import insights
+from .aggregates import DURATION_EDGES
+from .cube import CUBE_FREQS, cube_aggregates, cube_series
+from .ingest import DAY_ORDER, format_duration
+from .slots import SlotGrid
+
+OVERVIEW_PERCENTILES = (10, 25, 50, 75, 90)
+TOP_COLUMNS = ["title", "view_count", "like_count", "comment_count", "duration", "upload_date", "category"]
+# The tables section_tables() returns, in the row path's order.
+SECTION_TABLES = ("eng_q", "dur_df", "day_df", "hour_df", "hour_df_mmt", "cat_stats", "cat_year")
+
+
+class FilterSpec(NamedTuple):
+    """Sidebar filter state. A None field leaves that dimension unfiltered.
+
+    Being a tuple, a spec is hashable and usable directly as a cache key.
+    """
+
+    years: Optional[tuple] = None
+    categories: Optional[tuple] = None
+    min_views: int = 0
+    video_ids: Optional[tuple] = None  # e.g. keyword matches from search.KeywordIndex.lookup
+
+    @classmethod
+    def of(cls, years=None, categories=None, min_views=0, video_ids=None):
+        """Canonical (sorted, plain-typed) spec, so equal selections hash equal."""
+        return cls(
+            None if years is None else tuple(sorted(int(y) for y in years)),
+            None if categories is None else tuple(sorted(str(c) for c in categories)),
+            int(min_views),
+            None if video_ids is None else tuple(sorted(map(str, video_ids))),
+        )
+
+    @property
+    def cuts_cells(self):
+        """True if the spec filters inside (year, category) cells, so cube roll-ups can't serve it."""
+        return self.min_views > 0 or self.video_ids is not None
+
+    def mask(self, frame):
+        mask = frame["view_count"] >= self.min_views
+        if self.years is not None:
+            mask &= _isin(frame["year"], self.years)
+        if self.categories is not None:
+            mask &= _isin(frame["category"], self.categories)
+        if self.video_ids is not None:
+            mask &= frame["video_id"].isin(self.video_ids)
+        return mask
+
+    def apply(self, frame):
+        """Rows `frame` keeps; `frame` itself (not a copy) when the spec keeps every row."""
+        mask = self.mask(frame)
+        return frame if mask.all() else frame[mask]
+
+    def resolve(self, frame):
+        """Replace None years/categories with every value present in `frame`."""
+        return self._replace(
+            years=self.years if self.years is not None else tuple(sorted(int(y) for y in frame["year"].unique())),
+            categories=(self.categories if self.categories is not None
+                        else tuple(sorted(map(str, frame["category"].unique())))),
+        )
+
+
+def _isin(column, values):
+    """Series.isin via a lookup table on category codes / small int ranges (no hashing)."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        table = np.append(column.cat.categories.isin(values), False)  # code -1 (NaN) → False
+        return pd.Series(table[codes], index=column.index)
+    if column.dtype.kind in "iu" and len(column):
+        lo, hi = int(column.min()), int(column.max())
+        if hi - lo < 1 << 16:
+            table = np.isin(np.arange(lo, hi + 1), values)
+            return pd.Series(table[column.to_numpy() - lo], index=column.index)
+    return column.isin(values)
+
+
+# ── Overview ─────────────────────────────────────────────────────────────────
+def overview_stats(frame, index=None):
+    """KPI row: reach, volume, like-rate and runtime.
+
+    With a ViewIndex over `frame` the median is a lookup, not a sort.
+    """
+    views = frame["view_count"]
+    return {
+        "total_views": int(views.sum()),
+        "avg_views": float(views.mean()),
+        "med_views": float(views.median() if index is None else index.quantiles([0.5]).iloc[0]),
+        "videos": len(frame),
+        "like_rate": float(frame["like_count"].sum() / views.sum() * 100),
+        "avg_duration_s": float(frame["duration_seconds"].mean()),
+    }
+
+
+def view_percentiles(frame, pcts=OVERVIEW_PERCENTILES, spec=None, index=None):
+    """All requested view-count percentiles in one call, indexed by pct.
+
+    `frame` is the filtered frame, or with `index` (a ViewIndex over `frame`)
+    the unfiltered one plus the `spec` to select from the pre-sorted values.
+    The index knows only years, categories and views, so a video_ids
+    restriction (a small subset) takes the row path.
+    """
+    qs = [p / 100 for p in pcts]
+    if index is None or (spec is not None and spec.video_ids is not None):
+        frame = frame if spec is None else spec.apply(frame)
+        return frame["view_count"].quantile(qs).set_axis(list(pcts))
+    return index.quantiles(qs, spec).set_axis(list(pcts))
+
+
+def with_duration_labels(frame):
+    """`frame` plus an "M:SS" duration column formatted from duration_seconds."""
+    return frame.assign(duration=[format_duration(int(s)) for s in frame["duration_seconds"]])
+
+
+def top_videos(frame, n=10):
+    return with_duration_labels(frame.nlargest(n, "view_count"))[TOP_COLUMNS]
+
+
+# ── Sections ─────────────────────────────────────────────────────────────────
+def section_tables(frame, spec, cube=None, duration_edges=DURATION_EDGES):
+    """eng_q, dur_df, day_df, hour_df, cat_stats and cat_year for `spec`.
+
+    With a cube built over `frame`, everything but the duration buckets rolls
+    up from cube cells; a view threshold or a video_ids restriction cuts
+    through cells, so either forces the row path.
+    """
+    fdf = spec.apply(frame)
+    if cube is None or spec.cuts_cells:
+        return agg.section_aggregates(fdf, DAY_ORDER, duration_edges)
+    spec = spec.resolve(frame)
+    tables = cube_aggregates(cube, spec.years, spec.categories, DAY_ORDER)
+    tables["dur_df"] = agg.duration_buckets(fdf, duration_edges)
+    return tables
+
+
+def series(frame, spec, freq="M", cube=None):
+    """Upload count / reach / like-rate / momentum per week, month or quarter."""
+    if cube is not None and not spec.cuts_cells and freq in CUBE_FREQS:
+        spec = spec.resolve(frame)
+        return cube_series(cube, spec.years, spec.categories, freq)
+    return agg.time_series(spec.apply(frame), freq)
+
+
+def analyze(frame, spec, cube=None, freq="M", slot_grid=None):
+    """Every table the dashboard draws for one filter state.
+
+    `slot_grid` is a SlotGrid over `frame` on the MMT clock (built here if None).
+    """
+    fdf = spec.apply(frame)
+    tables = section_tables(frame, spec, cube)
+    tables["slot_df"] = (slot_grid or SlotGrid(frame, "MMT")).table(spec)
+    return {
+        "overview": overview_stats(fdf),
+        "percentiles": view_percentiles(fdf),
+        "top": top_videos(fdf),
+        "series": series(frame, spec, freq, cube),
+        **tables,
+        "insights": insights.generate(tables),
+    }
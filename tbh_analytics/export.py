@@ -0,0 +1,231 @@
+"""
+TBH Labs Myanmar — Streaming Export
+===================================
+Filtered rows and section tables as CSV, Parquet or JSON-lines, produced by
+a generator pipeline: the filter mask is computed once, the frame is walked
+in CHUNK_ROWS slices, and each slice is encoded and yielded as bytes. Written
+to a file, peak memory is one encoded chunk, never a filtered copy of the
+whole frame. (Dashboard downloads are joined into one bytes object, since
+Streamlit buffers them anyway.)
+
+Run: python -m tbh_analytics.export rows.parquet --years 2025 2026
+     python -m tbh_analytics.export rows.csv.gz --categories Knowledge --min-views 50000
+     python -m tbh_analytics.export --tables exports/ --format jsonl
+"""
+
+import argparse
+import gzip
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .ingest import format_clock, format_duration
+
+CHUNK_ROWS = 100_000
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet", "jsonl": "application/x-ndjson"}
+# The CSV's own schema (so an export reads back through parse_csv or --append)
+# plus the typed time fields; other derived helper columns stay internal.
+ROW_COLUMNS = ["video_id", "title", "view_count", "like_count", "comment_count", "duration", "duration_seconds",
+               "upload_date", "upload_hour", "day_of_week", "category",
+               "uploaded_at", "upload_hour_mmt", "day_of_week_mmt"]
+# The CSV's label columns, which parse_csv parses into integers and drops: rebuilt per chunk.
+LABEL_COLUMNS = {"duration": ("duration_seconds", format_duration),
+                 "upload_hour": ("upload_minute_of_day", format_clock)}
+
+
+def _labels(values, fmt):
+    # Format once per distinct value instead of per row (the inverse of ingest._parse_labels).
+    codes, uniques = pd.factorize(values)
+    return np.array([fmt(int(u)) for u in uniques], dtype=object)[codes]
+
+
+# ── Row chunks ───────────────────────────────────────────────────────────────
+def row_chunks(frame, spec=None, columns=ROW_COLUMNS, chunk_rows=CHUNK_ROWS):
+    """Yield the rows `spec` keeps, CHUNK_ROWS source rows at a time.
+
+    If no row is kept, one empty chunk is yielded, so encoders still write
+    the CSV header or the Parquet schema.
+    """
+    columns = ([c for c in columns if c in frame.columns or LABEL_COLUMNS.get(c, ("",))[0] in frame.columns]
+               + (["channel"] if "channel" in frame.columns else []))
+    mask = None if spec is None else spec.mask(frame).to_numpy()
+    empty = True
+    for start in range(0, len(frame), chunk_rows):
+        chunk = frame.iloc[start:start + chunk_rows]
+        if mask is not None:
+            chunk = chunk[mask[start:start + chunk_rows]]
+        if len(chunk):
+            empty = False
+            yield _with_labels(chunk, columns)
+    if empty:
+        yield _with_labels(frame.iloc[:0], columns)
+
+
+def _with_labels(chunk, columns):
+    labels = {c: _labels(chunk[source].to_numpy(), fmt)
+              for c, (source, fmt) in LABEL_COLUMNS.items() if c in columns and c not in chunk.columns}
+    return chunk.assign(**labels)[columns] if labels else chunk[columns]
+
+
+# ── Encoders ─────────────────────────────────────────────────────────────────
+def encode_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+def encode_jsonl(chunks):
+    for chunk in chunks:
+        if len(chunk):  # an empty JSON-lines file is zero bytes, not a blank line
+            yield chunk.to_json(orient="records", lines=True, date_format="iso", force_ascii=False).encode("utf-8")
+
+
+class _Spool(io.RawIOBase):
+    """Write-only sink whose contents are handed out and dropped on drain()."""
+
+    def __init__(self):
+        self.parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def encode_parquet(chunks):
+    """One row group per chunk; bytes are yielded as each group is flushed."""
+    spool, writer = _Spool(), None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(pa.PythonFile(spool, mode="w"), table.schema)
+        writer.write_table(table.cast(writer.schema))
+        yield spool.drain()
+    if writer is not None:
+        writer.close()
+        yield spool.drain()
+
+
+ENCODERS = {"csv": encode_csv, "parquet": encode_parquet, "jsonl": encode_jsonl}
+EXTENSIONS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def stream(chunks, fmt):
+    """Encoded bytes for an iterable of frames, in `fmt`."""
+    return ENCODERS[fmt](chunks)
+
+
+def stream_rows(frame, spec=None, fmt="csv", chunk_rows=CHUNK_ROWS):
+    return stream(row_chunks(frame, spec, chunk_rows=chunk_rows), fmt)
+
+
+def as_table(value):
+    """DataFrame form of an analyze() result: tables as-is, Series/KPI dicts/insights as rows."""
+    if isinstance(value, pd.DataFrame):
+        return value.reset_index(drop=True)
+    if isinstance(value, pd.Series):
+        return value.rename_axis("key").reset_index(name="value")
+    if isinstance(value, dict) and all(hasattr(v, "_asdict") for v in value.values()):
+        return pd.DataFrame([{"key": k, **v._asdict()} for k, v in value.items()])
+    return pd.DataFrame([value])
+
+
+def stream_table(table, fmt="csv"):
+    """A section table (already small) through the same encoders."""
+    return stream([as_table(table)], fmt)
+
+
+def deferred_payload(parts, *args):
+    """A zero-argument callable for st.download_button's `data`: encodes on click.
+
+    Streamlit reads whatever the callable returns into one bytes object
+    before serving it, so in-app downloads are built fully in memory; only
+    the file export path (export_rows / export_tables) streams chunk by
+    chunk.
+    """
+    return lambda: b"".join(parts(*args))
+
+
+# ── Files ────────────────────────────────────────────────────────────────────
+def format_of(path):
+    """(format, gzip?) from an export path such as rows.csv.gz."""
+    compress = path.endswith(".gz")
+    ext = os.path.splitext(path[:-3] if compress else path)[1].lower()
+    if ext not in EXTENSIONS:
+        raise ValueError(f"unsupported export extension {ext!r}; expected one of {sorted(EXTENSIONS)}")
+    return EXTENSIONS[ext], compress
+
+
+def write_stream(parts, path, compress=False):
+    """Write a byte generator to `path` (atomically); returns bytes written."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp, written = path + ".tmp", 0
+    with (gzip.open(tmp, "wb") if compress else open(tmp, "wb")) as fh:
+        for part in parts:
+            fh.write(part)
+            written += len(part)
+    os.replace(tmp, path)
+    return written
+
+
+def export_rows(frame, spec, path, chunk_rows=CHUNK_ROWS):
+    fmt, compress = format_of(path)
+    return write_stream(stream_rows(frame, spec, fmt, chunk_rows), path, compress)
+
+
+def export_tables(tables, directory, fmt="csv"):
+    """Every analyze() result in `tables` as <directory>/<name>.<fmt>; returns the paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, table in tables.items():
+        path = os.path.join(directory, f"{name}.{fmt}")
+        write_stream(stream_table(table, fmt), path)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    from .engine import FilterSpec, analyze
+    from .ingest import CSV_PATH
+    from .store import PartitionStore, VideoStore
+
+    parser = argparse.ArgumentParser(description="Export filtered rows or section tables without a full in-memory copy.")
+    parser.add_argument("out", nargs="?", help="row export path: .csv, .parquet or .jsonl (optionally .gz)")
+    parser.add_argument("--tables", metavar="DIR", help="also write every section table into DIR")
+    parser.add_argument("--format", choices=sorted(ENCODERS), default="csv", help="format for --tables")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--dataset", help="read this partitioned dataset instead of --csv")
+    parser.add_argument("--channels", nargs="+")
+    parser.add_argument("--years", type=int, nargs="+")
+    parser.add_argument("--categories", nargs="+")
+    parser.add_argument("--min-views", type=int, default=0)
+    parser.add_argument("--since", type=int, default=2021)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    if not args.out and not args.tables:
+        parser.error("give an output path, --tables DIR, or both")
+
+    spec = FilterSpec.of(args.years, args.categories, args.min_views)
+    if args.dataset:
+        store = PartitionStore(args.dataset, args.channels, spec.years, spec.categories, args.since)
+    else:
+        store = VideoStore(args.csv)
+    frame = store.since(args.since)
+    if args.out:
+        size = export_rows(frame, spec, args.out, args.chunk_rows)
+        print(f"Wrote {size / 1024:,.0f} KB → {args.out}")
+    if args.tables:
+        tables = analyze(frame, spec, store.cube, slot_grid=store.slot_grid(args.since))
+        paths = export_tables(tables, args.tables, args.format)
+        print(f"Wrote {len(paths)} tables → {args.tables}")
@@ -0,0 +1,346 @@
+"""
+TBH Labs Myanmar — Figures
+==========================
+The dashboard's Plotly theme and chart builders, usable without Streamlit,
+so the live app and the static report build draw identical figures. Every
+builder takes the aggregate it draws and returns a go.Figure.
+
+Needs Plotly; the rest of tbh_analytics does not import this module.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from .aggregates import MOMENTUM_WINDOW, SERIES_FREQS
+from .insights import MIN_SAMPLE
+
+# ── Flash UI Palette ──────────────────────────────────────────────────────────
+BG        = "#f8fafc"  # Very light blue-grey
+CARD_BG   = "#ffffff"
+FG        = "#0f172a"  # Slate 900
+TEXT_MUTED= "#64748b"  # Slate 500
+BORDER    = "#e2e8f0"  # Slate 200
+
+# Vibrant Tech Gradients/Accents (Flash UI)
+PRIMARY   = "#3b82f6"  # Blue
+ACCENT_1  = "#8b5cf6"  # Violet
+ACCENT_2  = "#ec4899"  # Pink
+ACCENT_3  = "#10b981"  # Emerald
+ACCENT_4  = "#f59e0b"  # Amber
+ACCENT_5  = "#06b6d4"  # Cyan
+
+COLORS = [PRIMARY, ACCENT_1, ACCENT_2, ACCENT_3, ACCENT_4, ACCENT_5, "#f43f5e", "#8b5cf6", "#14b8a6", "#3b82f6", "#ec4899"]
+
+# Duration vs Reach map: switch to WebGL above SCATTER_GL_THRESHOLD points and
+# embed hover titles only up to TITLE_HOVER_MAX.
+SCATTER_GL_THRESHOLD = 2_000
+TITLE_HOVER_MAX = 2_000
+
+KEY_CATEGORIES = ("Knowledge", "Review", "Showcases", "Battery Drain Test",
+                  "First Impressions", "Wassup", "Shorts", "uncategorized")
+
+# ── Plot theme ───────────────────────────────────────────────────────────────
+# Flash UI uses clean white plots with prominent data and subtle grid lines
+PLOT_LAYOUT = dict(
+    template="plotly_white",
+    paper_bgcolor="rgba(255,255,255,0)",
+    plot_bgcolor="rgba(255,255,255,0)",
+    font=dict(family="Inter", color=TEXT_MUTED, size=13),
+    margin=dict(l=40, r=20, t=60, b=40),
+    hoverlabel=dict(
+        bgcolor=CARD_BG,
+        font_size=13,
+        font_family="Inter",
+        bordercolor=BORDER,
+        font_color=FG
+    ),
+    title_font=dict(size=16, color=FG, family="Inter", weight="bold"),
+)
+
+def update_axes(fig):
+    fig.update_xaxes(
+        gridcolor="#f1f5f9",
+        zerolinecolor="#e2e8f0",
+        tickfont=dict(color=TEXT_MUTED),
+        title_font=dict(size=13, color=TEXT_MUTED, weight=500)
+    )
+    fig.update_yaxes(
+        gridcolor="#f1f5f9",
+        zerolinecolor="#e2e8f0",
+        tickfont=dict(color=TEXT_MUTED),
+        title_font=dict(size=13, color=TEXT_MUTED, weight=500)
+    )
+    return fig
+
+
+# ── Overview ─────────────────────────────────────────────────────────────────
+def reach_histogram(hist):
+    fig = go.Figure(go.Bar(
+        x=(hist["left"] + hist["right"]) / 2, y=hist["count"],
+        width=hist["right"] - hist["left"],
+        marker_color=PRIMARY, marker=dict(line=dict(width=1, color="white")),
+    ))
+    fig.update_layout(title="Audience Reach Distribution", bargap=0, **PLOT_LAYOUT)
+    fig = update_axes(fig)
+    fig.update_xaxes(title="Total Views")
+    fig.update_yaxes(title="Video Count")
+    return fig
+
+
+def percentiles(pct_views):
+    fig = go.Figure(data=[go.Bar(
+        x=[f"p{p}" for p in pct_views.index],
+        y=pct_views.to_numpy(),
+        marker_color=["#cbd5e1", "#cbd5e1", ACCENT_1, "#cbd5e1", "#cbd5e1"],
+        text=[f"{int(v):,}" for v in pct_views],
+        textposition="outside",
+        textfont=dict(color=FG, size=13, weight="bold"),
+        marker=dict(line=dict(width=0))
+    )])
+    fig.update_layout(title="Performance Percentiles", **PLOT_LAYOUT)
+    fig = update_axes(fig)
+    fig.update_xaxes(title="Percentile Rank")
+    fig.update_yaxes(title="Total Views", range=[0, pct_views.iloc[-1] * 1.3])
+    return fig
+
+
+# ── Time series ──────────────────────────────────────────────────────────────
+def momentum(series, freq):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=series["period"], y=series["avg_views"],
+                             mode="lines", name=f"{SERIES_FREQS[freq]}ly Avg",
+                             line=dict(color="#cbd5e1", width=2),
+                             fill="tozeroy", fillcolor="rgba(203, 213, 225, 0.2)"))
+    fig.add_trace(go.Scatter(x=series["period"], y=series["momentum"],
+                             mode="lines", name=f"{MOMENTUM_WINDOW}{freq} Momentum",
+                             line=dict(color=PRIMARY, width=4)))
+    fig.update_layout(title="View Volume Momentum", **PLOT_LAYOUT,
+                      legend=dict(x=0.02, y=0.98, bgcolor="rgba(255,255,255,0.9)", bordercolor=BORDER, borderwidth=1))
+    return update_axes(fig)
+
+
+def uploads(series, freq):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=series["period"], y=series["count"],
+                         marker_color=ACCENT_5, name="Uploads",
+                         marker=dict(line=dict(width=0))))
+    fig.update_layout(title=f"Production Velocity (Uploads/{SERIES_FREQS[freq]})", **PLOT_LAYOUT)
+    fig = update_axes(fig)
+    fig.update_yaxes(title="Volume")
+    return fig
+
+
+def engagement(eng_q):
+    fig = make_subplots(rows=1, cols=2, shared_xaxes=False,
+                        subplot_titles=("Audience Like Rate (%)", "Conversation Depth (Avg Comments)"))
+
+    fig.add_trace(go.Scatter(x=eng_q["quarter"], y=eng_q["like_rate"],
+                             mode="lines+markers", line=dict(color=ACCENT_3, width=3),
+                             fill="tozeroy", fillcolor="rgba(16, 185, 129, 0.1)",
+                             marker=dict(size=8, color=ACCENT_3, line=dict(color="white", width=2))), row=1, col=1)
+
+    fig.add_trace(go.Bar(x=eng_q["quarter"], y=eng_q["avg_comments"],
+                         marker_color=ACCENT_2, opacity=0.85,
+                         marker=dict(line=dict(width=0))), row=1, col=2)
+
+    fig.update_layout(
+        height=380, showlegend=False,
+        **{k: v for k, v in PLOT_LAYOUT.items() if k not in ["margin", "height"]}
+    )
+    fig.update_annotations(font_color=FG, font_size=16, font_family="Inter", font_weight="bold")
+    return update_axes(fig)
+
+
+def equal_age(profile, milestone):
+    fig = go.Figure(go.Bar(x=profile["month"], y=profile["median"], marker_color=ACCENT_1,
+                           customdata=profile[["videos", "mean"]],
+                           hovertemplate="%{x}<br>median %{y:,.0f} views<br>mean %{customdata[1]:,.0f} "
+                                         "· %{customdata[0]} videos<extra></extra>",
+                           marker=dict(line=dict(width=0))))
+    fig.update_layout(title=f"Median Views in First {milestone} by Upload Month", **PLOT_LAYOUT)
+    fig = update_axes(fig)
+    fig.update_yaxes(title=f"Views at {milestone}")
+    return fig
+
+
+# ── Duration ─────────────────────────────────────────────────────────────────
+def duration(dur_df):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=dur_df["Bucket"], y=dur_df["Avg Views"],
+                         name="Average Reach",
+                         marker_color=["#cbd5e1" if v < dur_df["Avg Views"].max() else ACCENT_1 for v in dur_df["Avg Views"]],
+                         marker=dict(line=dict(width=0))))
+    fig.add_trace(go.Scatter(x=dur_df["Bucket"], y=dur_df["Med Views"],
+                             name="Median Reach", mode="lines+markers",
+                             line=dict(color=FG, width=3),
+                             marker=dict(size=8, color=CARD_BG, line=dict(color=FG, width=2))))
+    fig.update_layout(title="Reach Density by Format Length", **PLOT_LAYOUT,
+                      legend=dict(x=0.02, y=0.98, bgcolor="rgba(255,255,255,0.9)", bordercolor=BORDER, borderwidth=1))
+    return update_axes(fig)
+
+
+def reach_density(x_c, y_c, counts):
+    fig = go.Figure(go.Heatmap(
+        x=x_c, y=y_c, z=np.where(counts > 0, counts, np.nan),
+        colorscale=[[0, "#dbeafe"], [0.5, ACCENT_1], [1, ACCENT_2]],
+        colorbar=dict(title="Videos", thickness=12),
+        hovertemplate="%{x:.0f} min · %{y:,.0f} views<br>%{z:.0f} videos<extra></extra>",
+    ))
+    fig.update_layout(title="Duration vs Reach Density", **PLOT_LAYOUT)
+    fig = update_axes(fig)
+    fig.update_xaxes(title="Runtime (minutes)")
+    fig.update_yaxes(title="Total Views")
+    return fig
+
+
+def reach_map(points, cat_order):
+    # Titles ride along only for small frames; otherwise they are looked
+    # up server-side for the selected points.
+    embed_titles = len(points) <= TITLE_HOVER_MAX
+    trace = go.Scattergl if len(points) > SCATTER_GL_THRESHOLD else go.Scatter
+    cat_colors = {c: COLORS[i % len(COLORS)] for i, c in enumerate(cat_order)}
+    fig = go.Figure(trace(
+        x=points["duration_min"], y=points["view_count"], mode="markers",
+        marker=dict(color=points["category"].map(cat_colors).astype(str).tolist(),
+                    opacity=0.7, line=dict(width=1, color="white")),
+        text=points["title"] if embed_titles else None,
+        hovertemplate=("%{text}<br>" if embed_titles else "")
+                      + "%{x:.1f} min · %{y:,} views<extra></extra>",
+    ))
+    fig.update_layout(title="Duration vs Reach Map", **PLOT_LAYOUT, showlegend=False)
+    fig = update_axes(fig)
+    fig.update_xaxes(title="Runtime (minutes)")
+    fig.update_yaxes(title="Total Views")
+    return fig
+
+
+# ── Upload timing ────────────────────────────────────────────────────────────
+def weekday(day_df, highlight):
+    fig = go.Figure(go.Bar(
+        x=day_df["Day"], y=day_df["Avg Views"],
+        marker_color=[PRIMARY if d == highlight else "#cbd5e1" for d in day_df["Day"]],
+        text=[f"{v/1000:.0f}K" for v in day_df["Avg Views"]],
+        textposition="outside", textfont=dict(color=FG, weight="bold"),
+        marker=dict(line=dict(width=0))
+    ))
+    fig.update_layout(title="Velocity by Weekday", **PLOT_LAYOUT)
+    fig = update_axes(fig)
+    fig.update_yaxes(range=[0, day_df["Avg Views"].max() * 1.2])
+    return fig
+
+
+def hour(hour_df, clock="UTC"):
+    fig = go.Figure(go.Bar(
+        x=[f"{h:02d}:00" for h in hour_df["Hour"]],
+        y=hour_df["Avg Views"],
+        marker_color=ACCENT_5,
+        marker=dict(line=dict(width=0))
+    ))
+    fig.update_layout(title=f"Velocity by Hour ({clock})", **PLOT_LAYOUT)
+    return update_axes(fig)
+
+
+def slot_heatmap(slot_df, metric, label, clock="MMT", min_videos=MIN_SAMPLE):
+    grid = slot_df.pivot(index="day", columns="hour", values=metric).reindex(slot_df["day"].unique())
+    info = slot_df.set_index(["day", "hour"]).loc[[(d, h) for d in grid.index for h in grid.columns]]
+    videos = info["videos"].to_numpy().reshape(grid.shape)
+    hours = [f"{h:02d}:00" for h in grid.columns]
+    fig = go.Figure(go.Heatmap(
+        x=hours, y=grid.index, z=np.where(videos > 0, grid.to_numpy(), np.nan),
+        customdata=np.dstack([videos, info["confidence"].to_numpy().reshape(grid.shape)]),
+        colorscale=[[0, "#f1f5f9"], [0.5, ACCENT_1], [1, PRIMARY]],
+        colorbar=dict(title=label, thickness=12), xgap=2, ygap=2,
+        hovertemplate="%{y} %{x}<br>" + label + " %{z:,.0f}<br>%{customdata[0]} videos · "
+                      "%{customdata[1]} confidence<extra></extra>",
+    ))
+    # Sparse cells stay visible but washed out, so a lucky one-off upload doesn't read as a trend.
+    sparse = (videos > 0) & (videos < min_videos)
+    fig.add_trace(go.Heatmap(
+        x=hours, y=grid.index, z=np.where(sparse, 1.0, np.nan), showscale=False, hoverinfo="skip",
+        colorscale=[[0, "rgba(248,250,252,0.65)"], [1, "rgba(248,250,252,0.65)"]], xgap=2, ygap=2,
+    ))
+    fig.update_layout(title=f"Upload Slots: Weekday × Hour ({clock})", height=380, **PLOT_LAYOUT)
+    fig = update_axes(fig)
+    fig.update_yaxes(autorange="reversed")
+    return fig
+
+
+# ── Categories ───────────────────────────────────────────────────────────────
+def category_reach(cat_stats):
+    fig = go.Figure(go.Bar(
+        y=cat_stats["category"],
+        x=cat_stats["avg_views"],
+        orientation="h",
+        marker_color=COLORS[:len(cat_stats)],
+        text=[f"{v/1000:.0f}K" for v in cat_stats["avg_views"]],
+        textposition="outside", textfont=dict(color=FG, size=12, weight=600),
+        marker=dict(line=dict(width=0))
+    ))
+    fig.update_layout(title="Average Reach by Vertical", height=500, **PLOT_LAYOUT)
+    fig.update_yaxes(autorange="reversed")
+    return update_axes(fig)
+
+
+def category_mix(cat_year, key_cats=KEY_CATEGORIES):
+    # Stacked bar area
+    cat_year_key = cat_year[cat_year["category"].isin(key_cats)]
+
+    fig = go.Figure()
+    for i, cat in enumerate(key_cats):
+        cat_data = cat_year_key[cat_year_key["category"] == cat].sort_values("year")
+        fig.add_trace(go.Bar(
+            x=cat_data["year"],
+            y=cat_data["pct"],
+            name=cat,
+            marker_color=COLORS[i % len(COLORS)],
+            marker=dict(line=dict(color=CARD_BG, width=1))
+        ))
+
+    fig.update_layout(
+        title="Vertical Strategy Evolution (% of timeline)",
+        barmode="stack",
+        height=500,
+        **PLOT_LAYOUT,
+        legend=dict(x=0, y=-0.25, orientation="h", font=dict(size=11)),
+    )
+    fig = update_axes(fig)
+    fig.update_xaxes(title="Year", dtick=1)
+    fig.update_yaxes(title="% of Output")
+    return fig
+
+
+# ── Cohorts ──────────────────────────────────────────────────────────────────
+def cohort_heatmap(table):
+    grid = table.pivot(index="month", columns="category", values="median_views")
+    videos = table.pivot(index="month", columns="category", values="videos").reindex_like(grid)
+    fig = go.Figure(go.Heatmap(
+        x=grid.columns, y=grid.index, z=grid.to_numpy(), customdata=videos.to_numpy(),
+        zmin=0, zmax=float(np.nanquantile(grid.to_numpy(), 0.95)) if grid.notna().any().any() else None,
+        colorscale=[[0, "#f1f5f9"], [0.5, ACCENT_1], [1, PRIMARY]],
+        colorbar=dict(title="Median views", thickness=12),
+        hovertemplate="%{y} · %{x}<br>median %{z:,.0f} views · %{customdata} videos<extra></extra>",
+        xgap=1, ygap=1,
+    ))
+    fig.update_layout(title="Median Views by Upload Month × Vertical", height=max(420, 14 * len(grid)), **PLOT_LAYOUT)
+    fig = update_axes(fig)
+    fig.update_yaxes(autorange="reversed", type="category")
+    return fig
+
+
+def age_curves(curves, key_cats=KEY_CATEGORIES):
+    fig = go.Figure()
+    shown = [c for c in key_cats if c in set(curves["category"])]
+    for i, cat in enumerate(shown):
+        data = curves[curves["category"] == cat]
+        fig.add_trace(go.Scatter(
+            x=data["age"], y=data["median_views"], name=cat, mode="lines+markers",
+            customdata=data["videos"], line=dict(color=COLORS[i % len(COLORS)], width=3),
+            hovertemplate=f"{cat} · %{{x}}<br>median %{{y:,.0f}} views · %{{customdata}} videos<extra></extra>",
+        ))
+    fig.update_layout(title="Cumulative Views by Age", **PLOT_LAYOUT,
+                      legend=dict(x=0, y=-0.25, orientation="h", font=dict(size=11)))
+    fig = update_axes(fig)
+    fig.update_xaxes(title="Age", type="category")
+    fig.update_yaxes(title="Median views (log)", type="log")
+    return fig
@@ -0,0 +1,397 @@
+"""
+TBH Labs Myanmar — Columnar Ingest
+==================================
+Parses the video CSV once into a typed Arrow cache (categoricals, datetime64,
+derived columns precomputed) that the dashboard memory-maps on cold start.
+The cache is rebuilt only when the CSV's mtime/size and content hash change.
+
+Scheduled refreshes don't touch the base cache: `--append` parses just the
+update file into a numbered delta next to it. Deltas are upserted on
+`video_id` at load time (new videos appended, counts of known videos
+overwritten) and folded into the base by `--compact`.
+
+Run: python -m tbh_analytics.ingest [path/to/videos.csv]
+     python -m tbh_analytics.ingest --append updates.csv [--snapshot]
+     python -m tbh_analytics.ingest --compact
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+CSV_PATH = "TBH_Labs_Myanmar_Videos.csv"
+CACHE_DIR = ".cache"
+# Bump whenever the derived schema below changes so stale caches are rebuilt.
+SCHEMA_VERSION = 4
+
+DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+# Columns a refresh may change for an already-known video; nothing derived depends on them.
+COUNT_COLUMNS = ["view_count", "like_count", "comment_count"]
+
+# Compact schema: low-cardinality labels as categoricals, free text as Arrow
+# strings, integers downcast to the smallest signed type that fits (never
+# below int32 for counts, so refreshes rarely have to widen a column).
+CATEGORICAL_COLUMNS = ["category", "month", "quarter"]
+STRING_DTYPE = pd.StringDtype("pyarrow")
+
+# The CSV's upload_date/upload_hour are UTC. Myanmar Time is a fixed UTC+6:30
+# (no DST), so local fields are an integer shift rather than a tz lookup.
+LOCAL_TZ = "Asia/Yangon"
+LOCAL_OFFSET_MIN = 6 * 60 + 30
+
+
+# ── Cache paths & fingerprints ───────────────────────────────────────────────
+def _cache_base(csv_path, cache_dir):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), cache_dir, stem)
+
+
+def cache_paths(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    base = _cache_base(csv_path, cache_dir)
+    return base + ".arrow", base + ".meta.json"
+
+
+def delta_path(csv_path, cache_dir, name):
+    return os.path.join(os.path.dirname(_cache_base(csv_path, cache_dir)), name)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_meta(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    try:
+        with open(cache_paths(csv_path, cache_dir)[1], encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json_atomic(path, payload):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def data_version(meta):
+    """Changes whenever the loadable data does: rebuilds/compactions bump the
+    generation, appends grow the delta list."""
+    if meta is None:
+        return None
+    return meta.get("generation", 0), len(meta.get("deltas", []))
+
+
+# ── Typed parse ──────────────────────────────────────────────────────────────
+def _period_labels(dates, freq):
+    # Factorize first so only the distinct periods are formatted as strings.
+    codes, uniques = pd.factorize(dates.dt.to_period(freq), sort=True)
+    return pd.Categorical.from_codes(codes, categories=uniques.astype(str))
+
+
+def _downcast(values, floor="int32"):
+    values = pd.to_numeric(values, downcast="integer")
+    return values.astype(floor) if values.dtype.itemsize < np.dtype(floor).itemsize else values
+
+
+def _parse_labels(labels, parse):
+    # Apply `parse` once per distinct label instead of per row; NaN → -1.
+    codes, uniques = pd.factorize(labels)
+    parsed = np.array([parse(u) for u in uniques] + [-1], dtype="int32")
+    return parsed[codes]
+
+
+def clock_minutes(label):
+    """Minutes since midnight from an "HH:MM" label."""
+    hours, minutes = label.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def duration_seconds(label):
+    """Seconds from an "MM:SS" or "H:MM:SS" label."""
+    seconds = 0
+    for part in label.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def format_clock(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def format_duration(seconds):
+    """Inverse of duration_seconds, in the CSV's "M:SS" form."""
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def derive_columns(df):
+    """Attach every derived column the dashboard uses and apply the compact schema (in place).
+
+    The raw "HH:MM" upload_hour and "MM:SS" duration strings are parsed into
+    integers here and dropped; display code formats them back on demand.
+    """
+    df["category"] = df["category"].astype("category")
+    df["day_of_week"] = pd.Categorical(df["day_of_week"], categories=DAY_ORDER, ordered=True)
+    df["year"] = df["upload_date"].dt.year.astype("int16")
+    df["month"] = _period_labels(df["upload_date"], "M")
+    df["quarter"] = _period_labels(df["upload_date"], "Q")
+    df["month_num"] = df["upload_date"].dt.month.astype("int8")
+
+    minute_of_day = _parse_labels(df.pop("upload_hour"), clock_minutes)
+    df["upload_minute_of_day"] = minute_of_day.astype("int16")
+    df["upload_hour_int"] = (minute_of_day // 60).astype("int8")
+    df["uploaded_at"] = (df["upload_date"] + pd.to_timedelta(minute_of_day, unit="min")).dt.tz_localize("UTC")
+    local = minute_of_day + LOCAL_OFFSET_MIN
+    df["upload_hour_mmt"] = (local // 60 % 24).astype("int8")
+    weekday_mmt = (df["upload_date"].dt.dayofweek.to_numpy() + local // (24 * 60)) % 7
+    df["day_of_week_mmt"] = pd.Categorical.from_codes(weekday_mmt, categories=DAY_ORDER, ordered=True)
+
+    parsed = _parse_labels(df.pop("duration"), duration_seconds)
+    df["duration_seconds"] = df["duration_seconds"].fillna(pd.Series(parsed, index=df.index))
+    for col in COUNT_COLUMNS + ["duration_seconds"]:
+        df[col] = _downcast(df[col])
+    df["duration_min"] = (df["duration_seconds"] / 60).astype("float32")
+    return df
+
+
+def parse_csv(csv_path=CSV_PATH):
+    """Read a CSV in the video schema and derive its columns."""
+    df = pd.read_csv(
+        csv_path,
+        dtype={"video_id": STRING_DTYPE, "title": STRING_DTYPE, "duration": str, "upload_hour": str},
+        parse_dates=["upload_date"],
+    )
+    return derive_columns(df)
+
+
+# ── Arrow files ──────────────────────────────────────────────────────────────
+def write_arrow(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def read_arrow(path):
+    """Memory-map the Arrow file; numeric and string columns are handed to
+    pandas without a parse (strings stay Arrow-backed)."""
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    strings = {pa.string(): STRING_DTYPE, pa.large_string(): STRING_DTYPE}
+    return table.to_pandas(split_blocks=True, types_mapper=strings.get)
+
+
+# ── Upserts ──────────────────────────────────────────────────────────────────
+def _align_categories(base, new):
+    for col in CATEGORICAL_COLUMNS:
+        cats = base[col].cat.categories.union(new[col].cat.categories)
+        if len(cats) != len(base[col].cat.categories):
+            base[col] = base[col].cat.set_categories(cats)
+        new[col] = new[col].cat.set_categories(cats)
+
+
+class RowIds:
+    """video_id → row position in a frame, kept across deltas.
+
+    The catalog's ids are hashed once, as an object Index (lookups on the
+    Arrow-backed string column rescan every row); ids appended later go in a
+    dict, so a delta's lookups and appends cost O(delta rows).
+    """
+
+    def __init__(self, ids):
+        self.base = pd.Index(np.asarray(ids, dtype=object))
+        self.appended = {}
+        self.size = len(self.base)
+
+    def positions(self, ids):
+        """Row position of each id, -1 for unseen ones."""
+        ids = np.asarray(ids, dtype=object)
+        pos = self.base.get_indexer(ids)
+        if self.appended:
+            missing = np.flatnonzero(pos < 0)
+            pos[missing] = [self.appended.get(i, -1) for i in ids[missing]]
+        return pos
+
+    def append(self, ids):
+        self.appended.update(zip(ids, range(self.size, self.size + len(ids))))
+        self.size += len(ids)
+
+
+def _take_rows(frame, pos, columns):
+    # Column by column: a 2-D iloc would slice whole consolidated blocks first.
+    return pd.DataFrame({col: frame[col].iloc[pos] for col in columns})
+
+
+def apply_delta(frame, delta, ids=None):
+    """Upsert `delta` rows into `frame` on video_id.
+
+    Known videos get their counts in new arrays, swapped into a shallow copy
+    of `frame`: the input frame is never written, since readers may still
+    hold it. Unseen videos are appended (their derived columns were computed
+    when the delta was parsed).
+    Returns (frame, removed, added): the old and new versions of every touched
+    row (known videos first, then the appended ones), so derived aggregates
+    can be patched instead of recomputed. They leave out the text columns,
+    which aggregates never read and which cost a pass over the whole Arrow
+    column to gather. `ids` is the frame's RowIds, kept by the caller across
+    deltas; it is extended with the appended videos.
+    """
+    delta = delta.drop_duplicates("video_id", keep="last")
+    ids = RowIds(frame["video_id"]) if ids is None else ids
+    pos = ids.positions(delta["video_id"])
+    known = pos >= 0
+    numeric = [col for col, dtype in frame.dtypes.items() if dtype != STRING_DTYPE]
+
+    removed = _take_rows(frame, pos[known], numeric)
+    if known.any():
+        frame = frame.copy(deep=False)
+        for col in COUNT_COLUMNS:
+            incoming = delta.loc[known, col].to_numpy()
+            dtype = frame[col].dtype
+            if incoming.max() > np.iinfo(dtype).max:
+                dtype = np.promote_types(dtype, incoming.dtype)
+            values = frame[col].to_numpy().astype(dtype)  # always a copy
+            values[pos[known]] = incoming
+            frame[col] = values
+    updated = _take_rows(frame, pos[known], numeric)
+
+    fresh = delta.loc[~known, frame.columns].copy()
+    if len(fresh):
+        _align_categories(frame, fresh)
+        frame = pd.concat([frame, fresh], ignore_index=True)
+        ids.append(fresh["video_id"])
+        fresh.index = pd.RangeIndex(len(frame) - len(fresh), len(frame))
+    fresh = fresh[numeric]
+    return frame, removed, updated if fresh.empty else fresh if updated.empty else pd.concat([updated, fresh])
+
+
+# ── Cache build / load ───────────────────────────────────────────────────────
+def _clear_deltas(csv_path, cache_dir, meta):
+    for name in (meta or {}).get("deltas", []):
+        try:
+            os.remove(delta_path(csv_path, cache_dir, name))
+        except OSError:
+            pass
+
+
+def build_cache(csv_path=CSV_PATH, cache_dir=CACHE_DIR, sha256=None):
+    cache_path, meta_path = cache_paths(csv_path, cache_dir)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    df = parse_csv(csv_path)
+    write_arrow(df, cache_path)
+    # The CSV supersedes any deltas appended against the previous base.
+    previous = read_meta(csv_path, cache_dir)
+    _clear_deltas(csv_path, cache_dir, previous)
+    stat = os.stat(csv_path)
+    _write_json_atomic(meta_path, {
+        "schema_version": SCHEMA_VERSION,
+        "source": os.path.abspath(csv_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": sha256 or file_sha256(csv_path),
+        "rows": len(df),
+        "generation": (previous or {}).get("generation", 0) + 1,
+        "deltas": [],
+    })
+    return df
+
+
+def cache_is_fresh(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Cheap mtime/size check first; fall back to the content hash on mismatch.
+
+    Returns (fresh, sha256) where sha256 is set only if it had to be computed.
+    """
+    cache_path, meta_path = cache_paths(csv_path, cache_dir)
+    meta = read_meta(csv_path, cache_dir)
+    if meta is None or meta.get("schema_version") != SCHEMA_VERSION or not os.path.exists(cache_path):
+        return False, None
+
+    stat = os.stat(csv_path)
+    if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+        return True, None
+
+    sha = file_sha256(csv_path)
+    if sha != meta.get("sha256"):
+        return False, sha
+    # Touched but unchanged (e.g. re-checkout): refresh the stamp, keep the cache.
+    meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    _write_json_atomic(meta_path, meta)
+    return True, sha
+
+
+def read_deltas(csv_path=CSV_PATH, cache_dir=CACHE_DIR, start=0):
+    """Delta frames appended since the `start`-th one, in append order."""
+    meta = read_meta(csv_path, cache_dir) or {}
+    return [read_arrow(delta_path(csv_path, cache_dir, name)) for name in meta.get("deltas", [])[start:]]
+
+
+def load_frame(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Return the typed video frame, rebuilding the Arrow cache only if the CSV changed."""
+    fresh, sha = cache_is_fresh(csv_path, cache_dir)
+    if not fresh:
+        return build_cache(csv_path, cache_dir, sha256=sha)
+    frame = read_arrow(cache_paths(csv_path, cache_dir)[0])
+    deltas = read_deltas(csv_path, cache_dir)
+    ids = RowIds(frame["video_id"]) if deltas else None
+    for delta in deltas:
+        frame, _, _ = apply_delta(frame, delta, ids)
+    return frame
+
+
+def append_updates(updates_path, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Parse only the update file and register it as the next delta; O(update rows)."""
+    if not cache_is_fresh(csv_path, cache_dir)[0]:
+        build_cache(csv_path, cache_dir)
+    meta = read_meta(csv_path, cache_dir)
+    delta = parse_csv(updates_path)
+    name = f"{os.path.basename(_cache_base(csv_path, cache_dir))}.delta-{len(meta['deltas']):06d}.arrow"
+    write_arrow(delta, delta_path(csv_path, cache_dir, name))
+    meta["deltas"].append(name)
+    _write_json_atomic(cache_paths(csv_path, cache_dir)[1], meta)
+    return delta
+
+
+def compact(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Fold all deltas into the base Arrow file."""
+    frame = load_frame(csv_path, cache_dir)
+    meta = read_meta(csv_path, cache_dir)
+    if not meta["deltas"]:
+        return frame
+    write_arrow(frame, cache_paths(csv_path, cache_dir)[0])
+    _clear_deltas(csv_path, cache_dir, meta)
+    meta.update(rows=len(frame), generation=meta.get("generation", 0) + 1, deltas=[])
+    _write_json_atomic(cache_paths(csv_path, cache_dir)[1], meta)
+    return frame
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the typed Arrow cache for the video CSV.")
+    parser.add_argument("csv", nargs="?", default=CSV_PATH)
+    parser.add_argument("--append", metavar="UPDATES_CSV", help="upsert rows from a CSV in the same schema")
+    parser.add_argument("--compact", action="store_true", help="fold appended deltas into the base cache")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="with --append, also record the refreshed counts in the snapshot store")
+    args = parser.parse_args()
+
+    if args.append:
+        rows = append_updates(args.append, args.csv)
+        print(f"Appended delta of {len(rows)} rows for {args.csv}")
+        if args.snapshot:
+            from .snapshots import record
+            print(f"Snapshot recorded: {record(load_frame(args.csv))} videos changed")
+    elif args.compact:
+        frame = compact(args.csv)
+        print(f"Compacted {len(frame)} rows → {cache_paths(args.csv)[0]}")
+    else:
+        frame = build_cache(args.csv)
+        print(f"Cached {len(frame)} rows → {cache_paths(args.csv)[0]}")
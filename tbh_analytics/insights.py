@@ -0,0 +1,198 @@
+"""
+TBH Labs Myanmar — Insights
+===========================
+Turns the section tables the dashboard already has (section_aggregates or
+cube_aggregates, plus the weekday × hour SlotGrid table) into the claims in
+the insight boxes and rec-cards, so they follow the sidebar filters instead
+of going stale. Nothing touches rows: every rule is a few vectorized ops
+over tables of at most a few hundred rows.
+
+Each claim carries its sample size and a confidence label. Groups with fewer
+than MIN_SAMPLE videos are never named best or worst.
+"""
+
+from typing import NamedTuple
+
+MIN_SAMPLE = 10
+HIGH_CONFIDENCE_SAMPLE = 30
+# A vertical averaging below UNDER_INDEX × the filtered average is a cut
+# candidate; above OVER_INDEX × on a below-median share of output, a hidden gem.
+UNDER_INDEX = 0.75
+OVER_INDEX = 1.2
+
+
+class Insight(NamedTuple):
+    title: str
+    headline: str
+    detail: str
+    n: int = 0
+    confidence: str = "insufficient"
+    tone: str = "info"  # "good", "bad" or "info"
+    subject: str = ""   # the day/bucket/category the claim is about, if any
+
+
+def confidence(n):
+    if n >= HIGH_CONFIDENCE_SAMPLE:
+        return "high"
+    return "medium" if n >= MIN_SAMPLE else "low"
+
+
+def compact_number(value):
+    """148_312 → "148K", 1_530_000 → "1.5M"."""
+    if abs(value) >= 1e6:
+        return f"{value / 1e6:.1f}M"
+    return f"{value / 1e3:.0f}K" if abs(value) >= 1e3 else f"{value:.0f}"
+
+
+def _insufficient(title, groups):
+    return Insight(title, "Not enough data.",
+                   f"No {groups} has {MIN_SAMPLE}+ videos under the current filters.")
+
+
+def baseline_views(cat_stats):
+    """Average views across the filtered videos (cat_stats covers all of them)."""
+    return cat_stats["total_views"].sum() / max(cat_stats["count"].sum(), 1)
+
+
+# ── Rules ────────────────────────────────────────────────────────────────────
+def best_duration(dur_df, baseline):
+    """Runtime bucket with the highest median reach; medians resist one-off hits."""
+    title = "Runtime Sweet Spot"
+    eligible = dur_df[dur_df["Count"] >= MIN_SAMPLE]
+    if eligible.empty:
+        return _insufficient(title, "runtime bucket")
+    best = eligible.loc[eligible["Med Views"].idxmax()]
+    n = int(best["Count"])
+    return Insight(
+        f"Adopt the {best['Bucket']} Standard",
+        f"{best['Bucket']} runtimes pull {best['Avg Views'] / baseline:.1f}× the average.",
+        f"{compact_number(best['Avg Views'])} avg and {compact_number(best['Med Views'])} median views "
+        f"across {n} videos, against the {compact_number(baseline)} average.",
+        n, confidence(n), "good", best["Bucket"],
+    )
+
+
+def best_slot(slot_df, baseline):
+    """Best weekday × hour cell by average reach, among cells with enough videos.
+
+    `slot_df` is SlotGrid.table() on the MMT clock, so the day and the hour
+    come from the same cell and n is that cell's own count.
+    """
+    from .slots import best_slot as pick
+
+    title = "Flagship Slot"
+    best = pick(slot_df, "avg_views")
+    if best is None:
+        return _insufficient(title, "weekday × hour slot")
+    n = int(best["videos"])
+    return Insight(
+        title,
+        f"{best['day']}s around {int(best['hour']):02d}:00 MMT.",
+        f"{n} {best['day']} {int(best['hour']):02d}:00 uploads average {compact_number(best['avg_views'])} views "
+        f"({compact_number(best['median_views'])} median), against the {compact_number(baseline)} average. "
+        "Reserve it for the highest-value productions.",
+        n, confidence(n), "info", best["day"],
+    )
+
+
+def _latest_share(cat_year, category):
+    latest = cat_year[cat_year["year"] == cat_year["year"].max()]
+    share = latest.loc[latest["category"] == category, "pct"]
+    return (share.iloc[0] if len(share) else 0.0), latest["year"].max()
+
+
+def category_leader(cat_stats, cat_year):
+    """The vertical carrying the most total reach."""
+    title = "Scale the Engine"
+    eligible = cat_stats[cat_stats["count"] >= MIN_SAMPLE]
+    if eligible.empty:
+        return _insufficient(title, "vertical")
+    top = eligible.loc[eligible["total_views"].idxmax()]
+    share, year = _latest_share(cat_year, top["category"])
+    n = int(top["count"])
+    return Insight(
+        title,
+        f"{top['category']} carries the channel.",
+        f"{compact_number(top['avg_views'])} avg views, {top['like_rate']:.1f}% like rate, "
+        f"{share:.0f}% of {year} output.",
+        n, confidence(n), "good", str(top["category"]),
+    )
+
+
+def weak_categories(cat_stats, baseline, limit=2):
+    """Verticals averaging well below the filtered baseline."""
+    title = "Sever the Weak Links"
+    eligible = cat_stats[cat_stats["count"] >= MIN_SAMPLE]
+    if eligible.empty:
+        return _insufficient(title, "vertical")
+    weak = eligible[eligible["avg_views"] < UNDER_INDEX * baseline].nsmallest(limit, "avg_views")
+    if weak.empty:
+        n = int(eligible["count"].sum())
+        return Insight(title, "No weak links.",
+                       f"No vertical with {MIN_SAMPLE}+ videos averages more than "
+                       f"{1 - UNDER_INDEX:.0%} below the {compact_number(baseline)} average.",
+                       n, confidence(n), "info")
+    names = " and ".join(weak["category"])
+    gaps = "; ".join(f"{row.category} {1 - row.avg_views / baseline:.0%} below ({compact_number(row.avg_views)}, "
+                     f"{row.count} videos)" for row in weak.itertuples())
+    n = int(weak["count"].min())
+    return Insight(title, f"Cut back {names}.", f"Against the {compact_number(baseline)} average: {gaps}.",
+                   n, confidence(n), "bad", names)
+
+
+def hidden_gems(cat_stats, baseline, exclude=(), limit=2):
+    """High-reach verticals producing fewer videos than the median eligible vertical."""
+    title = "Scale Hidden Gems"
+    eligible = cat_stats[cat_stats["count"] >= MIN_SAMPLE]
+    if eligible.empty:
+        return _insufficient(title, "vertical")
+    gems = eligible[(eligible["avg_views"] >= OVER_INDEX * baseline)
+                    & (eligible["count"] < eligible["count"].median())
+                    & ~eligible["category"].isin(exclude)].nlargest(limit, "avg_views")
+    if gems.empty:
+        n = int(eligible["count"].sum())
+        return Insight(title, "No hidden gems.",
+                       f"No under-produced vertical with {MIN_SAMPLE}+ videos beats the average by "
+                       f"{OVER_INDEX - 1:.0%}.",
+                       n, confidence(n), "info")
+    names = " & ".join(f"{row.category} ({compact_number(row.avg_views)})" for row in gems.itertuples())
+    n = int(gems["count"].min())
+    return Insight(title, f"{names}.",
+                   "Under-produced relative to their return: each beats the "
+                   f"{compact_number(baseline)} average on a below-median share of output.",
+                   n, confidence(n), "info", " & ".join(gems["category"]))
+
+
+def like_rate_trend(eng_q):
+    """Like rate and comment depth, first vs last quarter with enough videos."""
+    title = "Engagement Trend"
+    eligible = eng_q[eng_q["videos"] >= MIN_SAMPLE]
+    if len(eligible) < 2:
+        return _insufficient(title, "pair of quarters")
+    first, last = eligible.iloc[0], eligible.iloc[-1]
+    rising = last["like_rate"] >= first["like_rate"]
+    n = int(min(first["videos"], last["videos"]))
+    return Insight(
+        title,
+        f"Like rate {'rose' if rising else 'fell'} from {first['like_rate']:.2f}% to {last['like_rate']:.2f}%.",
+        f"{first['quarter']} → {last['quarter']}, while average comments went "
+        f"{first['avg_comments']:.0f} → {last['avg_comments']:.0f}.",
+        n, confidence(n), "good" if rising else "bad", str(last["quarter"]),
+    )
+
+
+def generate(tables):
+    """Every insight for one filter state, from its section tables plus its MMT `slot_df`."""
+    cat_stats = tables["cat_stats"]
+    if cat_stats.empty:
+        return {}
+    baseline = baseline_views(cat_stats)
+    leader = category_leader(cat_stats, tables["cat_year"])
+    return {
+        "engagement": like_rate_trend(tables["eng_q"]),
+        "duration": best_duration(tables["dur_df"], baseline),
+        "slot": best_slot(tables["slot_df"], baseline),
+        "leader": leader,
+        "weak": weak_categories(cat_stats, baseline),
+        "gems": hidden_gems(cat_stats, baseline, exclude=[leader.subject]),
+    }
@@ -0,0 +1,202 @@
+"""
+TBH Labs Myanmar — Leaderboard
+==============================
+Ranked, searchable, paginated video tables. Each ranking metric gets a
+descending sort index the first time it is asked for (once per data
+version); a page is then the filter mask gathered in that order and sliced,
+so only the visible rows are ever materialized or sent to the browser.
+
+Title search is a substring match over Burmese and English titles, served
+by a trigram index over the distinct normalized titles: a query intersects
+the postings of its trigrams and confirms the few candidates with a plain
+substring test, then maps matching titles back to rows through their codes.
+
+Run: python -m tbh_analytics.leaderboard --metric like_rate --search "AI" --page 2
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .engine import with_duration_labels
+from .search import normalize
+
+METRICS = {
+    "views": "Views",
+    "likes": "Likes",
+    "comments": "Comments",
+    "like_rate": "Like Rate %",
+    "comments_per_1k": "Comments / 1K Views",
+}
+PAGE_SIZE = 25
+NGRAM = 3
+BATCH_TITLES = 50_000
+PAGE_COLUMNS = ["rank", "title", "view_count", "like_count", "comment_count", "like_rate", "comments_per_1k",
+                "duration", "upload_date", "category"]
+
+
+def metric_values(frame):
+    """Every ranking metric as a numpy array aligned with `frame`'s rows."""
+    views = frame["view_count"].to_numpy()
+    per_view = np.divide(1.0, views, out=np.zeros(len(views)), where=views > 0)
+    return {
+        "views": views,
+        "likes": frame["like_count"].to_numpy(),
+        "comments": frame["comment_count"].to_numpy(),
+        "like_rate": frame["like_count"].to_numpy() * per_view * 100,
+        "comments_per_1k": frame["comment_count"].to_numpy() * per_view * 1000,
+    }
+
+
+# ── Title index ──────────────────────────────────────────────────────────────
+class TitleIndex:
+    """Trigram → title postings over the distinct normalized titles, in CSR form.
+
+    Trigrams are packed into one int64 (three 21-bit code points) and built
+    batch-wise with numpy from the titles' UTF-32 buffers, so construction
+    never loops per character in Python.
+    """
+
+    def __init__(self, titles, batch=BATCH_TITLES):
+        codes, distinct = pd.factorize(pd.Series(titles).fillna("").astype(str).map(normalize))
+        self.codes = codes
+        self.titles = np.asarray(distinct, dtype=str)
+        keys, ids = [], []
+        for lo in range(0, len(self.titles), batch):
+            k, i = _trigrams(self.titles[lo:lo + batch], lo)
+            keys.append(k)
+            ids.append(i)
+        keys = np.concatenate(keys) if keys else np.empty(0, "int64")
+        ids = np.concatenate(ids) if ids else np.empty(0, "int32")
+        order = np.argsort(keys, kind="stable")  # batches arrive in title order
+        self.grams, starts = np.unique(keys[order], return_index=True)
+        self.offsets = np.append(starts, len(keys))
+        self.ids = ids[order]
+
+    def postings(self, gram):
+        i = np.searchsorted(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return self.ids[:0]
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def matching_titles(self, query):
+        """Sorted ids of the distinct titles containing `query` (already normalized)."""
+        if len(query) < NGRAM:
+            # One- and two-character queries match a large share of titles anyway.
+            return np.flatnonzero(np.char.find(self.titles, query) >= 0)
+        grams, _ = _trigrams(np.array([query]), 0)
+        lists = sorted((self.postings(g) for g in np.unique(grams)), key=len)
+        ids = lists[0]
+        for other in lists[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        # Trigram hits are candidates; the substring test drops out-of-order matches.
+        return ids[np.char.find(self.titles[ids], query) >= 0]
+
+    def search(self, query):
+        """Row mask of the titles containing `query` (None for a blank query)."""
+        query = normalize(query).strip()
+        if not query:
+            return None
+        hit = np.zeros(len(self.titles), bool)
+        hit[self.matching_titles(query)] = True
+        return hit[self.codes]
+
+
+def _trigrams(titles, first_id):
+    """(packed trigram, title id) pairs of `titles`, one per distinct trigram per title."""
+    points = titles.astype(str)
+    points = points.view(np.uint32).reshape(len(points), -1).astype("int64")
+    if points.shape[1] < NGRAM:
+        return np.empty(0, "int64"), np.empty(0, "int32")
+    keys = points[:, :-2] << 42 | points[:, 1:-1] << 21 | points[:, 2:]
+    valid = points[:, 2:] != 0  # UTF-32 buffers are zero-padded to the longest title
+    ids = np.broadcast_to(np.arange(first_id, first_id + len(titles), dtype="int32")[:, None], keys.shape)
+    keys, ids = keys[valid], ids[valid]
+    order = np.lexsort((ids, keys))
+    keys, ids = keys[order], ids[order]
+    fresh = np.ones(len(keys), bool)
+    fresh[1:] = (keys[1:] != keys[:-1]) | (ids[1:] != ids[:-1])
+    return keys[fresh], ids[fresh]
+
+
+# ── Leaderboard ──────────────────────────────────────────────────────────────
+class Leaderboard:
+    """Sort indexes and a title index over one frame; build once per data version."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.values = metric_values(frame)
+        self._orders = {}
+        self._titles = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def order(self, metric):
+        """Row positions by `metric`, highest first (ties keep upload order)."""
+        if metric not in self._orders:
+            self._orders[metric] = np.argsort(-self.values[metric], kind="stable")
+        return self._orders[metric]
+
+    @property
+    def titles(self):
+        if self._titles is None:
+            self._titles = TitleIndex(self.frame["title"])
+        return self._titles
+
+    def rank(self, metric="views", spec=None, query=""):
+        """Ranked row positions of the rows `spec` keeps whose title contains `query`."""
+        order = self.order(metric)
+        keep = None if spec is None else spec.mask(self.frame).to_numpy()
+        found = self.titles.search(query) if query else None
+        if found is not None:
+            keep = found if keep is None else keep & found
+        return order if keep is None else order[keep[order]]
+
+    def page(self, metric="views", spec=None, query="", page=1, size=PAGE_SIZE):
+        """(rows of 1-based page `page`, total matching rows)."""
+        ranked = self.rank(metric, spec, query)
+        return self.rows(ranked, page, size), len(ranked)
+
+    def rows(self, ranked, page=1, size=PAGE_SIZE):
+        """Page `page` of rank() output as a display table."""
+        start = (max(page, 1) - 1) * size
+        rows = ranked[start:start + size]
+        table = self.frame.iloc[rows].assign(
+            rank=np.arange(start + 1, start + len(rows) + 1),
+            like_rate=self.values["like_rate"][rows],
+            comments_per_1k=self.values["comments_per_1k"][rows],
+        )
+        return with_duration_labels(table)[PAGE_COLUMNS].reset_index(drop=True)
+
+
+def page_count(total, size=PAGE_SIZE):
+    return max(-(-total // size), 1)
+
+
+if __name__ == "__main__":
+    from .engine import FilterSpec
+    from .ingest import CSV_PATH
+    from .store import VideoStore
+
+    parser = argparse.ArgumentParser(description="Print one page of the video leaderboard.")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--metric", choices=list(METRICS), default="views")
+    parser.add_argument("--search", default="")
+    parser.add_argument("--years", type=int, nargs="+")
+    parser.add_argument("--categories", nargs="+")
+    parser.add_argument("--min-views", type=int, default=0)
+    parser.add_argument("--since", type=int, default=2021)
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--size", type=int, default=PAGE_SIZE)
+    args = parser.parse_args()
+
+    store = VideoStore(args.csv)
+    spec = FilterSpec.of(args.years, args.categories, args.min_views)
+    rows, total = store.leaderboard(args.since).page(args.metric, spec, args.search, args.page, args.size)
+    with pd.option_context("display.width", 200, "display.max_colwidth", 60, "display.float_format", "{:,.2f}".format):
+        print(rows.to_string(index=False))
+    print(f"\npage {args.page} of {page_count(total, args.size)} · {total} videos")
@@ -0,0 +1,130 @@
+"""
+TBH Labs Myanmar — Percentile Index
+===================================
+view_count sorted once per data version. A filtered percentile is then a
+rank selection in the sorted values — a binary search for the view
+threshold, a small matrix product over per-block cell counts, and a scan of
+one block per rank — instead of a fresh partition/sort of the filtered
+column on every rerun.
+"""
+
+import numpy as np
+import pandas as pd
+
+BLOCK_ROWS = 4096
+
+
+def sorted_quantiles(values, qs):
+    """Quantiles of an ascending array, linearly interpolated like pandas' default."""
+    qs = np.asarray(qs, dtype="float64")
+    if len(values) == 0:
+        return np.full(len(qs), np.nan)
+    pos = qs * (len(values) - 1)
+    lo = np.floor(pos).astype("int64")
+    hi = np.ceil(pos).astype("int64")
+    v_lo, v_hi = values[lo].astype("float64"), values[hi].astype("float64")
+    return v_lo + (pos - lo) * (v_hi - v_lo)
+
+
+class ViewIndex:
+    """`frame`'s view_count sorted ascending, with each row's (year, category)
+    cell code permuted into the same order and per-block counts of every cell."""
+
+    def __init__(self, frame, block=BLOCK_ROWS):
+        views = frame["view_count"].to_numpy()
+        order = np.argsort(views, kind="stable")
+        self.values = views[order]
+        self.block = block
+        year_codes, self.years = pd.factorize(frame["year"])
+        self.categories = frame["category"].cat.categories
+        # Category code -1 (missing) is shifted to slot 0 of each year's block.
+        n_cells = len(self.years) * (len(self.categories) + 1)
+        cells = year_codes * (len(self.categories) + 1) + frame["category"].cat.codes.to_numpy() + 1
+        self.cells = cells.astype(np.min_scalar_type(max(n_cells - 1, 0)))[order]
+        n_blocks = -(-len(self.values) // block)
+        block_ids = np.arange(len(self.values)) // block
+        self.block_counts = np.bincount(block_ids * n_cells + self.cells, minlength=n_blocks * n_cells
+                                        ).reshape(n_blocks, n_cells).astype("int32")
+
+    def __len__(self):
+        return len(self.values)
+
+    def _table(self, spec):
+        """Lookup table: cell code → kept by `spec`'s year/category filters."""
+        year_ok = np.ones(len(self.years), bool) if spec.years is None else self.years.isin(spec.years)
+        cat_ok = np.ones(len(self.categories) + 1, bool)
+        if spec.categories is not None:
+            cat_ok[0] = False
+            cat_ok[1:] = self.categories.isin(spec.categories)
+        return np.outer(year_ok, cat_ok).ravel()
+
+    def select(self, spec=None):
+        """Ascending view counts of the rows a FilterSpec keeps (all rows if None)."""
+        if spec is None:
+            return self.values
+        start = np.searchsorted(self.values, spec.min_views, side="left")
+        return self.values[start:][self._table(spec)[self.cells[start:]]]
+
+    def quantiles(self, qs, spec=None):
+        """Quantiles of select(spec) without materializing it.
+
+        The view threshold is a binary search on the sorted values. Per-block
+        cell counts give each block's selected count, so each needed rank is
+        found by a search over block totals plus a scan of a single block.
+        """
+        if spec is None:
+            return pd.Series(sorted_quantiles(self.values, qs), index=list(qs))
+        table = self._table(spec)
+        start = int(np.searchsorted(self.values, spec.min_views, side="left"))
+        first = start // self.block
+        # Block 0 of the search is the (partial) block holding `start`.
+        bounds = [(start, min((first + 1) * self.block, len(self.values)))]
+        counts = np.concatenate([[table[self.cells[slice(*bounds[0])]].sum()],
+                                 self.block_counts[first + 1:] @ table.astype("int32")])
+        cum = np.cumsum(counts)
+        total = int(cum[-1]) if len(cum) else 0
+        qs = np.asarray(qs, dtype="float64")
+        if total == 0:
+            return pd.Series(np.full(len(qs), np.nan), index=list(qs))
+
+        def nth(rank):
+            j = int(np.searchsorted(cum, rank, side="right"))
+            lo, hi = bounds[0] if j == 0 else ((first + j) * self.block, (first + j + 1) * self.block)
+            within = rank - (int(cum[j - 1]) if j else 0)
+            return self.values[lo + np.flatnonzero(table[self.cells[lo:hi]])[within]]
+
+        pos = qs * (total - 1)
+        v_lo = np.array([nth(int(r)) for r in np.floor(pos)], dtype="float64")
+        v_hi = np.array([nth(int(r)) for r in np.ceil(pos)], dtype="float64")
+        return pd.Series(v_lo + (pos - np.floor(pos)) * (v_hi - v_lo), index=list(qs))
+
+    def category_quantiles(self, q, years=None, categories=None):
+        """q-quantile of view_count per category within `years`, as a Series.
+
+        One matrix product gives every category's per-block counts at once;
+        each needed rank then costs a search over block totals and a scan of
+        a single block, as in quantiles().
+        """
+        categories = self.categories if categories is None else pd.Index(categories)
+        if len(categories) == 0 or len(self.values) == 0:
+            return pd.Series(np.nan, index=categories, dtype="float64")
+        year_ok = np.ones(len(self.years), bool) if years is None else self.years.isin(years)
+        slots = self.categories.get_indexer(categories) + 1  # 0: unknown to the index
+        known = np.flatnonzero(slots > 0)
+        tables = np.zeros((len(self.years), len(self.categories) + 1, len(categories)), bool)
+        tables[:, slots[known], known] = year_ok[:, None]
+        tables = tables.reshape(-1, len(categories))
+        cum = np.cumsum(self.block_counts @ tables.astype("int32"), axis=0)
+
+        out = np.full(len(categories), np.nan)
+        for j in np.flatnonzero(cum[-1] > 0) if len(cum) else []:
+            def nth(rank):
+                b = int(np.searchsorted(cum[:, j], rank, side="right"))
+                lo = b * self.block
+                within = rank - (int(cum[b - 1, j]) if b else 0)
+                return self.values[lo + np.flatnonzero(tables[self.cells[lo:lo + self.block], j])[within]]
+
+            pos = q * (int(cum[-1, j]) - 1)
+            v_lo, v_hi = float(nth(int(np.floor(pos)))), float(nth(int(np.ceil(pos))))
+            out[j] = v_lo + (pos - np.floor(pos)) * (v_hi - v_lo)
+        return pd.Series(out, index=categories)
@@ -0,0 +1,89 @@
+"""
+TBH Labs Myanmar — Startup Profiling
+====================================
+Where a cold start spends its time: per-module import cost, measured in a
+fresh interpreter with `python -X importtime` (a running Streamlit server has
+already imported most of it), and a Checkpoints timer that splits one script
+run into named stages.
+
+Run: python -m tbh_analytics.profiling            # imports + headless pipeline stages
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+DASHBOARD_IMPORTS = ("streamlit", "numpy", "pandas", "plotly.graph_objects", "plotly.subplots", "tbh_analytics")
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(modules=DASHBOARD_IMPORTS, python=sys.executable):
+    """Self and cumulative import ms of each of `modules`, imported in order.
+
+    Modules pulled in by an earlier entry are charged to it, as they would be
+    on a real cold start, and show as 0.
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    stderr = subprocess.run([python, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True).stderr
+    rows = {name: {"self_ms": int(own) / 1000, "cumulative_ms": int(cum) / 1000}
+            for own, cum, indent, name in _IMPORTTIME.findall(stderr) if len(indent) == 1}
+    table = pd.DataFrame.from_dict(rows, orient="index", columns=["self_ms", "cumulative_ms"])
+    return table.reindex(list(modules), fill_value=0.0).rename_axis("module").reset_index()
+
+
+class Checkpoints:
+    """Wall time between named points of a run, relative to `start`."""
+
+    def __init__(self, start=None):
+        self.start = self.last = time.perf_counter() if start is None else start
+        self.stages = []
+
+    def __call__(self, name):
+        now = time.perf_counter()
+        self.stages.append({"stage": name, "ms": (now - self.last) * 1000, "at_ms": (now - self.start) * 1000})
+        self.last = now
+
+    def frame(self):
+        return pd.DataFrame(self.stages, columns=["stage", "ms", "at_ms"])
+
+
+def pipeline_profile(csv_path=None, since=2021):
+    """Headless equivalents of the dashboard's first-run stages."""
+    from . import engine
+    from .ingest import CSV_PATH
+    from .store import VideoStore
+
+    mark = Checkpoints()
+    store = VideoStore(csv_path or CSV_PATH)
+    mark("store load (cache + cube)")
+    frame = store.since(since)
+    spec = engine.FilterSpec.of()
+    engine.overview_stats(frame, store.view_index(since))
+    mark("KPI row (incl. view index)")
+    engine.view_percentiles(frame, spec=spec, index=store.view_index(since))
+    engine.top_videos(frame)
+    mark("overview tables")
+    engine.series(frame, spec, "M", store.cube)
+    mark("time series")
+    engine.section_tables(frame, spec, store.cube)
+    mark("section tables")
+    return mark.frame()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile dashboard cold-start costs headlessly.")
+    parser.add_argument("--csv", help="video CSV (default: the dashboard's)")
+    parser.add_argument("--modules", nargs="+", default=list(DASHBOARD_IMPORTS))
+    args = parser.parse_args()
+
+    with pd.option_context("display.width", 160, "display.float_format", "{:,.1f}".format):
+        print("── imports (fresh interpreter) " + "─" * 30)
+        print(import_profile(args.modules).to_string(index=False))
+        print("\n── pipeline " + "─" * 49)
+        print(pipeline_profile(args.csv).to_string(index=False))
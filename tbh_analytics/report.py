@@ -0,0 +1,313 @@
+"""
+TBH Labs Myanmar — Static Report Build
+======================================
+Runs the dashboard's pipeline once, offline, and writes a static bundle that
+needs neither Streamlit nor Python to view:
+
+    report/index.html          the default view, self-contained (Plotly inlined once)
+    report/report.md           the same numbers as a Markdown report
+    report/states/<name>.json  prebuilt Plotly figure JSON + tables per filter state
+    report/manifest.json       data hash, build time and the states it holds
+
+`report` is a symlink to the current build directory (report.<suffix>), so
+a rebuild is swapped in with one rename.
+
+Filter states are the default (everything since SINCE_YEAR) plus the ones
+viewers pick most often: each of the latest years on its own, and each of
+the largest categories on its own. Each state's section tables, slot table
+and insights are computed once, up front (they roll up from the cube).
+Figures then build in a process pool, one task per section covering every
+state; each worker opens its own store for the row-level pieces (the Arrow
+cache is memory-mapped, so that costs little).
+
+The bundle is rebuilt only when the content hash of the data (or
+REPORT_VERSION) differs from the one in its manifest.
+
+Run: python -m tbh_analytics.report
+     python -m tbh_analytics.report --workers 4 --force
+"""
+
+import argparse
+import html
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from . import aggregates as agg
+from . import engine, insights
+from .dataset import read_manifest
+from .engine import FilterSpec
+from .ingest import CSV_PATH, _write_json_atomic
+from .memo import content_hash
+
+REPORT_DIR = "report"
+REPORT_VERSION = 3  # bump when sections or figures change, to force a rebuild
+SINCE_YEAR = 2021
+LATEST_YEARS = 3
+TOP_CATEGORIES = 4
+SCATTER_MAX_POINTS = 10_000
+SECTIONS = ("overview", "trends", "duration", "timing", "categories", "intel")
+
+_store = None
+
+
+# ── Filter states ────────────────────────────────────────────────────────────
+def common_states(frame, latest_years=LATEST_YEARS, top_categories=TOP_CATEGORIES):
+    """name → FilterSpec for the default view and the usual single-year/category picks."""
+    states = {"default": FilterSpec.of()}
+    for year in sorted(frame["year"].unique())[-latest_years:]:
+        states[f"year-{year}"] = FilterSpec.of(years=[year])
+    counts = frame["category"].value_counts()
+    for category in counts.index[:top_categories]:
+        states[f"category-{_slug(category)}"] = FilterSpec.of(categories=[category])
+    return states
+
+
+def _slug(text):
+    return "".join(c if c.isalnum() else "-" for c in str(text).lower()).strip("-")
+
+
+def _filters(spec):
+    return {"years": spec.years, "categories": spec.categories, "min_views": spec.min_views}
+
+
+# ── Sections (run in worker processes) ───────────────────────────────────────
+def _open_store(csv_path, dataset, channels):
+    global _store
+    from .store import PartitionStore, VideoStore
+
+    _store = (PartitionStore(dataset, channels, since=SINCE_YEAR) if dataset else VideoStore(csv_path))
+
+
+def _records(frame):
+    return json.loads(frame.to_json(orient="records", date_format="iso"))
+
+
+def state_tables(store, states):
+    """name → (spec, section tables + MMT slot_df, insights) per state, or (spec, None, None) if it has no rows.
+
+    Computed once in the parent and shared by every section task.
+    """
+    frame = store.since(SINCE_YEAR)
+    prepared = {}
+    for state, spec in states.items():
+        tables = engine.section_tables(frame, spec, store.cube)
+        if tables["cat_stats"].empty:  # cat_stats covers every kept video
+            prepared[state] = (spec, None, None)
+            continue
+        tables["slot_df"] = store.slot_grid(SINCE_YEAR, "MMT").table(spec)
+        prepared[state] = (spec, tables, insights.generate(tables))
+    return prepared
+
+
+def _section(name, states):
+    """{state name: {"figures": {..}, "tables": {..}}} for one section, from state_tables() output."""
+    from . import figures as figs
+
+    frame = _store.since(SINCE_YEAR)
+    out = {}
+    for state, (spec, tables, intel) in states.items():
+        if tables is None:
+            out[state] = {"figures": {}, "tables": {}}
+            continue
+        fdf = spec.apply(frame) if name in ("overview", "duration") else None
+        if name == "overview":
+            pct = engine.view_percentiles(frame, spec=spec, index=_store.view_index(SINCE_YEAR))
+            figures = {"reach_histogram": figs.reach_histogram(agg.value_histogram(fdf["view_count"], bins=50)),
+                       "percentiles": figs.percentiles(pct)}
+            result = {"overview": engine.overview_stats(fdf),
+                      "percentiles": _records(pct.rename_axis("pct").rename("views").reset_index()),
+                      "top": _records(engine.top_videos(fdf))}
+        elif name == "trends":
+            series = engine.series(frame, spec, "M", _store.cube)
+            figures = {"momentum": figs.momentum(series, freq="M"), "uploads": figs.uploads(series, freq="M"),
+                       "engagement": figs.engagement(tables["eng_q"])}
+            result = {"eng_q": _records(tables["eng_q"])}
+        elif name == "duration":
+            reach_df = fdf[fdf["duration_min"] <= 60]
+            figures = {"duration": figs.duration(tables["dur_df"]),
+                       "reach_map": figs.reach_map(agg.sample_points(reach_df, SCATTER_MAX_POINTS),
+                                                   cat_order=tuple(map(str, reach_df["category"].unique())))}
+            result = {"dur_df": _records(tables["dur_df"])}
+        elif name == "timing":
+            best_day = intel["slot"].subject if "slot" in intel else ""
+            slot_df = tables["slot_df"]
+            figures = {"weekday": figs.weekday(tables["day_df"], highlight=best_day),
+                       "hour": figs.hour(tables["hour_df_mmt"], clock="MMT"),
+                       "slot_heatmap": figs.slot_heatmap(slot_df, "median_views", "Median views", clock="MMT")}
+            result = {"day_df": _records(tables["day_df"]), "hour_df_mmt": _records(tables["hour_df_mmt"])}
+        elif name == "categories":
+            figures = {"category_reach": figs.category_reach(tables["cat_stats"]),
+                       "category_mix": figs.category_mix(tables["cat_year"])}
+            result = {"cat_stats": _records(tables["cat_stats"])}
+        else:
+            figures = {}
+            result = {"insights": {k: i._asdict() for k, i in intel.items()}}
+        out[state] = {"figures": {k: json.loads(f.to_json()) for k, f in figures.items()}, "tables": result}
+    return name, out
+
+
+# ── Rendering ────────────────────────────────────────────────────────────────
+def markdown_table(rows, columns):
+    """GitHub Markdown table of `rows` (dicts) with `columns` as (key, header, format)."""
+    lines = ["| " + " | ".join(h for _, h, _ in columns) + " |",
+             "|" + "|".join("---:" if f and f != "{}" else "---" for _, _, f in columns) + "|"]
+    for row in rows:
+        lines.append("| " + " | ".join((f or "{}").format(row[k]).replace("|", "\\|") for k, _, f in columns) + " |")
+    return "\n".join(lines)
+
+
+def render_markdown(bundle, manifest):
+    default = bundle["default"]["tables"]
+    kpis = default["overview"]
+    lines = [
+        "# TBH Labs Myanmar — YouTube Channel Performance Report", "",
+        f"**Videos Analyzed:** {kpis['videos']:,} ({SINCE_YEAR} onward)  ",
+        f"**Total Lifetime Views:** {kpis['total_views']:,}  ",
+        f"**Report Built:** {manifest['built_at']} · data `{manifest['data_hash'][:12]}`", "",
+        "| Average Views | Median Views | Like Rate | Avg Duration |", "|---:|---:|---:|---:|",
+        f"| {kpis['avg_views']:,.0f} | {kpis['med_views']:,.0f} | {kpis['like_rate']:.2f}% | "
+        f"{int(kpis['avg_duration_s'] // 60)}:{int(kpis['avg_duration_s'] % 60):02d} |", "",
+        "## 1. View Count Distribution", "",
+        markdown_table(default["percentiles"], [("pct", "Percentile", "P{}"), ("views", "Views", "{:,.0f}")]), "",
+        "### Top 10 Videos", "",
+        markdown_table(default["top"], [("title", "Title", None), ("view_count", "Views", "{:,}"),
+                                        ("duration", "Duration", None), ("upload_date", "Date", "{:.10}"),
+                                        ("category", "Category", None)]), "",
+        "## 2. Duration", "",
+        markdown_table(default["dur_df"], [("Bucket", "Duration", None), ("Count", "Videos", "{:,}"),
+                                           ("Avg Views", "Avg Views", "{:,.0f}"),
+                                           ("Med Views", "Median Views", "{:,.0f}")]), "",
+        "## 3. Categories", "",
+        markdown_table(default["cat_stats"], [("category", "Category", None), ("count", "Videos", "{:,}"),
+                                              ("avg_views", "Avg Views", "{:,.0f}"),
+                                              ("med_views", "Median Views", "{:,.0f}"),
+                                              ("like_rate", "Like Rate %", "{:.2f}")]), "",
+        "## 4. Findings", "",
+    ]
+    for item in default["insights"].values():
+        note = (f"fewer than {insights.MIN_SAMPLE} videos per group" if item["confidence"] == "insufficient"
+                else f"n = {item['n']}, {item['confidence']} confidence")
+        lines.append(f"- **{item['title']}:** {item['headline']} {item['detail']} _({note})_")
+    return "\n".join(lines) + "\n"
+
+
+def _script_json(value):
+    """JSON safe to inline in <script>: a title containing "</script>" cannot close the tag."""
+    return json.dumps(value).replace("</", "<\\/")
+
+
+def render_html(bundle, markdown_text, manifest):
+    from plotly.offline import get_plotlyjs
+
+    from .figures import BG, FG
+
+    default = bundle["default"]["figures"]
+    divs, calls = [], []
+    for i, (name, fig) in enumerate(default.items()):
+        divs.append(f'<section><div id="fig-{i}" class="fig"></div></section>')
+        calls.append(f"Plotly.newPlot('fig-{i}', {_script_json(fig['data'])}, {_script_json(fig['layout'])}, "
+                     "{responsive: true, displaylogo: false});")
+    states = ", ".join(f'<a href="states/{s}.json">{html.escape(s)}</a>' for s in manifest["states"])
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<title>TBH Labs Myanmar — Analytics Report</title>
+<style>
+body {{ background: {BG}; color: {FG}; font-family: Inter, system-ui, sans-serif; max-width: 1200px; margin: 2rem auto; }}
+.grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(520px, 1fr)); gap: 1rem; }}
+pre {{ white-space: pre-wrap; font-family: inherit; }}
+</style>
+<script>{get_plotlyjs()}</script>
+</head><body>
+<h1>⚡ TBH Labs Analytics</h1>
+<p>Default view · built {manifest['built_at']} · data {manifest['data_hash'][:12]} · other states: {states}</p>
+<div class="grid">{''.join(divs)}</div>
+<pre>{html.escape(markdown_text)}</pre>
+<script>{''.join(calls)}</script>
+</body></html>
+"""
+
+
+# ── Build ────────────────────────────────────────────────────────────────────
+def build(out_dir=REPORT_DIR, csv_path=CSV_PATH, dataset=None, channels=None, workers=None, force=False):
+    """Write the bundle to `out_dir`. Returns (manifest, rebuilt)."""
+    _open_store(csv_path, dataset, channels)
+    frame = _store.since(SINCE_YEAR)
+    data_hash = content_hash(frame, REPORT_VERSION)
+    manifest = read_manifest(out_dir)
+    if not force and manifest and manifest.get("data_hash") == data_hash:
+        return manifest, False
+
+    states = common_states(frame)
+    prepared = state_tables(_store, states)
+    with ProcessPoolExecutor(workers, initializer=_open_store, initargs=(csv_path, dataset, channels)) as pool:
+        parts = dict(pool.map(_section, SECTIONS, [prepared] * len(SECTIONS)))
+    bundle = {state: {"figures": {}, "tables": {}} for state in states}
+    for name in SECTIONS:
+        for state, part in parts[name].items():
+            bundle[state]["figures"].update(part["figures"])
+            bundle[state]["tables"].update(part["tables"])
+
+    # Build into a fresh sibling directory, then repoint the `out_dir` symlink.
+    out_dir = out_dir.rstrip("/")
+    os.makedirs(os.path.dirname(out_dir) or ".", exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=os.path.basename(out_dir) + ".", dir=os.path.dirname(out_dir) or ".")
+    os.chmod(staging, 0o755)
+    os.makedirs(os.path.join(staging, "states"))
+    manifest = {"data_hash": data_hash, "report_version": REPORT_VERSION,
+                "built_at": pd.Timestamp.now(tz="UTC").floor("s").isoformat(), "videos": len(frame),
+                "states": {s: _filters(spec) for s, spec in states.items()}}
+    for state, content in bundle.items():
+        with open(os.path.join(staging, "states", f"{state}.json"), "w", encoding="utf-8") as fh:
+            json.dump({"state": state, "filters": manifest["states"][state], **content}, fh,
+                      ensure_ascii=False, default=str)
+    markdown_text = render_markdown(bundle, manifest)
+    with open(os.path.join(staging, "report.md"), "w", encoding="utf-8") as fh:
+        fh.write(markdown_text)
+    with open(os.path.join(staging, "index.html"), "w", encoding="utf-8") as fh:
+        fh.write(render_html(bundle, markdown_text, manifest))
+    _write_json_atomic(os.path.join(staging, "manifest.json"), manifest)
+    _swap_in(staging, out_dir)
+    return manifest, True
+
+
+def _swap_in(staging, out_dir):
+    """Point the `out_dir` symlink at `staging` with one atomic rename, then delete the old build.
+
+    Readers resolve `out_dir` either to the old complete bundle or to the new
+    one, never to a partial or missing one. A plain directory left by an
+    older build is replaced once, non-atomically.
+    """
+    previous = os.path.realpath(out_dir) if os.path.islink(out_dir) else None
+    if os.path.isdir(out_dir) and previous is None:
+        shutil.rmtree(out_dir)
+    link = out_dir + ".link"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(staging), link)  # relative, so the parent directory can move
+    os.replace(link, out_dir)
+    if previous and previous != os.path.realpath(staging):
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the static HTML/Markdown/figure-JSON report bundle.")
+    parser.add_argument("--out", default=REPORT_DIR)
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--dataset", help="read this partitioned dataset instead of --csv")
+    parser.add_argument("--channels", nargs="+", help="dataset channels to read (default: all)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the data hash is unchanged")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest, rebuilt = build(args.out, args.csv, args.dataset, args.channels, args.workers, args.force)
+    if rebuilt:
+        print(f"Built {len(manifest['states'])} states → {args.out}/ in {time.perf_counter() - start:.1f}s")
+    else:
+        print(f"Data unchanged ({manifest['data_hash'][:12]}); {args.out}/ is up to date")
@@ -0,0 +1,141 @@
+"""
+TBH Labs Myanmar — Keyword Search
+=================================
+Inverted index over video titles, which mix Myanmar script and English.
+Myanmar runs are segmented into syllables with the usual rule-based breaks
+(a new syllable starts at a consonant that is not stacked under a virama
+and not killed by an asat, or at an independent vowel, symbol or number);
+Latin runs are split into words. Everything is NFC-normalized and
+casefolded first.
+
+A query matches titles containing all of its terms; the last term also
+matches as a prefix, so results follow along while a word is being typed,
+and a multi-syllable Myanmar word must appear unbroken. Lookups are binary
+searches over the sorted vocabulary plus posting-list intersections, never
+a scan of the titles.
+
+Run: python -m tbh_analytics.search "brain rot"
+"""
+
+import argparse
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+_MYANMAR = "\u1000-\u109f\ua9e0-\ua9ff\uaa60-\uaa7f"
+_RUNS = re.compile(f"([{_MYANMAR}]+)|([^\\W{_MYANMAR}_]+)")
+# Break before a consonant that is neither stacked (preceded by virama U+1039)
+# nor killed (followed by asat U+103A or virama, possibly after a dot below),
+# before an independent vowel or symbol, and before a run of digits.
+_SYLLABLE_START = re.compile(
+    "(?=(?<!\u1039)[\u1000-\u1021](?!\u1037?[\u103a\u1039])"
+    "|[\u1023-\u1027\u1029\u102a\u103f\u104a-\u104f]"
+    "|(?<![\u1040-\u1049])[\u1040-\u1049])"
+)
+_PUNCTUATION = "\u104a\u104b"
+_LAST = "\U0010ffff"
+
+
+def normalize(text):
+    """NFC + casefold, so composed/decomposed Myanmar and any Latin case match."""
+    return unicodedata.normalize("NFC", text).casefold()
+
+
+def syllables(run):
+    """Myanmar-script run → syllables; punctuation (၊ ။) is dropped."""
+    return [s for s in _SYLLABLE_START.split(run) if s.strip(_PUNCTUATION)]
+
+
+def tokenize(text, normalized=False):
+    """Search terms of `text`: Myanmar syllables and Latin/digit words, in order."""
+    terms = []
+    for myanmar, word in _RUNS.findall(text if normalized else normalize(text)):
+        terms.extend(syllables(myanmar) if myanmar else [word])
+    return terms
+
+
+class KeywordIndex:
+    """Term → distinct-title postings (CSR), plus each row's title code."""
+
+    def __init__(self, frame):
+        self.codes, titles = pd.factorize(frame["title"].fillna("").astype(str).map(normalize))
+        self.video_ids = frame["video_id"].to_numpy()
+        postings = {}
+        for title_id, title in enumerate(titles):
+            for term in set(tokenize(title, normalized=True)):
+                postings.setdefault(term, []).append(title_id)
+        self.terms = np.array(sorted(postings), dtype=str)
+        sizes = [len(postings[t]) for t in self.terms]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes, dtype="int64")])
+        self.ids = np.fromiter((i for t in self.terms for i in postings[t]), dtype="int32", count=self.offsets[-1])
+        self.titles = np.asarray(titles, dtype=str)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _postings(self, lo, hi):
+        return self.ids[self.offsets[lo]:self.offsets[hi]]
+
+    def term_postings(self, term, prefix=False):
+        """Sorted title ids containing `term` (or any term starting with it)."""
+        lo = np.searchsorted(self.terms, term, side="left")
+        hi = np.searchsorted(self.terms, term + _LAST if prefix else term, side="right")
+        if hi - lo <= 1:
+            return self._postings(lo, hi)
+        return np.unique(self._postings(lo, hi))
+
+    def matching_titles(self, query):
+        terms = tokenize(query)
+        if not terms:
+            return None
+        *whole, last = terms
+        lists = [self.term_postings(t) for t in dict.fromkeys(whole)] + [self.term_postings(last, prefix=True)]
+        lists.sort(key=len)
+        ids = lists[0]
+        for other in lists[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        # Syllables alone would match "သ…တိ" for "သတိ": multi-syllable Myanmar
+        # runs must also appear contiguously in the (few) candidate titles.
+        for run, _ in _RUNS.findall(normalize(query)):
+            if len(ids) and len(syllables(run)) > 1:
+                ids = ids[np.char.find(self.titles[ids], run) >= 0]
+        return ids
+
+    def mask(self, query):
+        """Row mask of the titles matching `query`, or None for a query with no terms."""
+        ids = self.matching_titles(query)
+        if ids is None:
+            return None
+        hit = np.zeros(len(self.titles), bool)
+        hit[ids] = True
+        return hit[self.codes]
+
+    def lookup(self, query):
+        """Sorted video_ids whose titles match `query` (a FilterSpec.video_ids value), or None."""
+        mask = self.mask(query)
+        return None if mask is None else tuple(sorted(self.video_ids[mask]))
+
+
+if __name__ == "__main__":
+    from .ingest import CSV_PATH
+    from .store import VideoStore
+
+    parser = argparse.ArgumentParser(description="Look up titles in the keyword index.")
+    parser.add_argument("query")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--since", type=int, default=2021)
+    args = parser.parse_args()
+
+    store = VideoStore(args.csv)
+    frame = store.since(args.since)
+    index = store.keyword_index(args.since)
+    print(f"terms: {' · '.join(tokenize(args.query))}")
+    mask = index.mask(args.query)
+    hits = frame if mask is None else frame[mask]
+    for title in hits.sort_values("view_count", ascending=False)["title"]:
+        print(f"  {title}")
+    print(f"{len(hits)} of {len(frame)} videos · {len(index)} terms indexed")
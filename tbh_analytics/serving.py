@@ -0,0 +1,63 @@
+"""
+TBH Labs Myanmar — Shared Serving
+=================================
+Results shared by every session in a dashboard process. A session holds
+only its filter key; tables, filtered frames and figures for that key live
+once per process and are handed out by reference, so concurrent viewers on
+the same (or the default) filters cost no extra memory, and a miss is
+computed once even when several sessions ask at the same moment.
+
+Values are shared, not copied: callers treat them as read-only and derive
+new frames (assign, rename, copy) instead of mutating them in place.
+
+Across worker processes the base frame is already shared: the typed Arrow
+cache is memory-mapped, so its pages sit once in the OS page cache however
+many processes map it.
+"""
+
+import threading
+
+from .memo import LRUCache
+
+_MISSING = object()
+
+
+class SharedResults:
+    """Process-wide, key → value memo with single-flight computation."""
+
+    def __init__(self, max_entries):
+        self._cache = LRUCache(max_entries)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.hits = self.misses = 0
+
+    def get(self, key, compute):
+        """The value for `key`, calling compute() only if no session has yet."""
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            with self._lock:
+                key_lock = self._inflight.setdefault(key, threading.Lock())
+            with key_lock:
+                # Whoever held the lock first has computed it; the rest read it back.
+                value = self._cache.get(key, _MISSING)
+                if value is _MISSING:
+                    try:
+                        value = compute()
+                        self._cache.put(key, value)
+                    finally:
+                        with self._lock:
+                            self._inflight.pop(key, None)
+                    self.misses += 1
+                    return value
+        self.hits += 1
+        return value
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def stats(self):
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,141 @@
+"""
+TBH Labs Myanmar — Upload Slots
+===============================
+Weekday × hour performance, alone or for one category: the grid behind the
+upload-slot heatmap and, through best_slot on the MMT table, the "Flagship
+Slot" insight, which depends on the day and the hour together rather than on
+each separately.
+
+SlotGrid bins the frame once into dense year × category × weekday × hour
+arrays of video counts and view sums (one bincount each). A filter on years
+and categories is then a slice and a sum over those two axes. Medians
+cannot be summed, so rows are also sorted once by (slot, views): for any
+filter mask, the kept rows stay in slot order, and each cell's median is
+read from the middle of its run, with no groupby or re-sort.
+
+A view threshold or keyword filter cuts through the (year, category)
+cells, so it takes the row path for counts and sums too.
+
+Run: python -m tbh_analytics.slots --clock MMT --category Knowledge
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import day_codes
+from .cohorts import _codes, _interpolate
+from .ingest import DAY_ORDER
+from .insights import MIN_SAMPLE, confidence
+
+CLOCKS = {"MMT": ("day_of_week_mmt", "upload_hour_mmt"), "UTC": ("day_of_week", "upload_hour_int")}
+HOURS = 24
+SLOTS = len(DAY_ORDER) * HOURS
+
+
+class SlotGrid:
+    """Dense year × category × weekday × hour counts and view sums over one frame."""
+
+    def __init__(self, frame, clock="MMT"):
+        day_column, hour_column = CLOCKS[clock]
+        self.clock = clock
+        self.frame = frame
+        self.years = np.unique(frame["year"].to_numpy())
+        self._category, self.categories = _codes(frame["category"])
+        year = np.searchsorted(self.years, frame["year"].to_numpy())
+        self._slot = day_codes(frame[day_column], DAY_ORDER) * HOURS + frame[hour_column].to_numpy("int64")
+        self._views = frame["view_count"].to_numpy("int64")
+
+        cell = (year * len(self.categories) + self._category) * SLOTS + self._slot
+        shape = (len(self.years), len(self.categories), len(DAY_ORDER), HOURS)
+        self.videos = np.bincount(cell, minlength=int(np.prod(shape))).reshape(shape)
+        self.views = np.bincount(cell, weights=self._views.astype("float64"), minlength=int(np.prod(shape))).reshape(shape)
+        self._order = None
+
+    @property
+    def order(self):
+        """Row positions sorted by (slot, views), built on first median."""
+        if self._order is None:
+            self._order = np.lexsort((self._views, self._slot))
+        return self._order
+
+    def _mask(self, spec, category):
+        mask = None if spec is None else spec.mask(self.frame).to_numpy()
+        if category is not None:
+            mine = self._category == self.categories.get_loc(category)
+            mask = mine if mask is None else mask & mine
+        return mask
+
+    def sums(self, spec=None, category=None):
+        """(videos, views) as (7, 24) arrays for the rows `spec` keeps (in `category`, if given)."""
+        if spec is not None and spec.cuts_cells:
+            mask = self._mask(spec, category)
+            slot, views = self._slot[mask], self._views[mask].astype("float64")
+            return (np.bincount(slot, minlength=SLOTS).reshape(len(DAY_ORDER), HOURS),
+                    np.bincount(slot, weights=views, minlength=SLOTS).reshape(len(DAY_ORDER), HOURS))
+        years = np.ones(len(self.years), bool) if spec is None or spec.years is None else np.isin(self.years, spec.years)
+        cats = (np.ones(len(self.categories), bool) if spec is None or spec.categories is None
+                else self.categories.isin(spec.categories))
+        if category is not None:
+            cats &= self.categories == category
+        return (self.videos[years][:, cats].sum(axis=(0, 1)), self.views[years][:, cats].sum(axis=(0, 1)))
+
+    def medians(self, spec=None, category=None):
+        """Median views per weekday × hour as a (7, 24) array (NaN for empty cells)."""
+        mask = self._mask(spec, category)
+        order = self.order if mask is None else self.order[mask[self.order]]
+        slot = self._slot[order]
+        size = np.bincount(slot, minlength=SLOTS)
+        start = np.concatenate([[0], np.cumsum(size)[:-1]])
+        out = np.full(SLOTS, np.nan)
+        seen = size > 0
+        out[seen] = _interpolate(self._views[order].astype("float64"), start[seen], size[seen], 0.5)
+        return out.reshape(len(DAY_ORDER), HOURS)
+
+    def table(self, spec=None, category=None):
+        """One row per weekday × hour: videos, total/avg/median views and sample confidence."""
+        videos, views = self.sums(spec, category)
+        with np.errstate(invalid="ignore"):
+            avg = views / videos
+        counts = videos.ravel()
+        return pd.DataFrame({
+            "day": np.repeat(DAY_ORDER, HOURS),
+            "hour": np.tile(np.arange(HOURS), len(DAY_ORDER)),
+            "videos": counts,
+            "total_views": views.ravel(),
+            "avg_views": avg.ravel(),
+            "median_views": self.medians(spec, category).ravel(),
+            "confidence": [confidence(n) if n else "none" for n in counts],
+        })
+
+
+def best_slot(table, metric="avg_views", min_videos=MIN_SAMPLE):
+    """The row of `table` with the highest `metric` among cells of `min_videos`+, or None."""
+    sampled = table[table["videos"] >= min_videos]
+    return None if sampled.empty else sampled.loc[sampled[metric].idxmax()]
+
+
+if __name__ == "__main__":
+    from .engine import FilterSpec
+    from .ingest import CSV_PATH
+    from .store import VideoStore
+
+    parser = argparse.ArgumentParser(description="Print the weekday × hour upload-slot grid.")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--since", type=int, default=2021)
+    parser.add_argument("--clock", choices=list(CLOCKS), default="MMT")
+    parser.add_argument("--years", type=int, nargs="+")
+    parser.add_argument("--category", help="one category's slice of the grid")
+    parser.add_argument("--metric", choices=["median_views", "avg_views", "videos"], default="avg_views")
+    args = parser.parse_args()
+
+    grid = VideoStore(args.csv).slot_grid(args.since, args.clock)
+    table = grid.table(FilterSpec.of(args.years), args.category)
+    wide = table.pivot(index="day", columns="hour", values=args.metric).reindex(DAY_ORDER)
+    with pd.option_context("display.width", 250, "display.max_columns", 30):
+        print((wide / 1000).round(0).to_string() if args.metric != "videos" else wide.to_string())
+    best = best_slot(table, "avg_views" if args.metric == "videos" else args.metric)
+    if best is not None:
+        print(f"\nBest {args.clock} slot with {MIN_SAMPLE}+ videos: {best['day']} {best['hour']:02d}:00 "
+              f"({best[args.metric]:,.0f}, {best['videos']} videos)")
@@ -0,0 +1,236 @@
+"""
+TBH Labs Myanmar — Snapshot Store
+=================================
+The CSV only has lifetime counts, which mix a video's age with how well it
+did. This store records view/like/comment counts at every refresh, so
+videos can be compared at equal age (views in their first 24h, 7d, 30d).
+
+    snapshots/day=<yyyy-mm-dd>/part-<unix seconds>.parquet   append-only
+    snapshots/state.arrow       latest counts per video, and its int key
+    snapshots/milestones.arrow  counts at each MILESTONES age, per video
+    snapshots/manifest.json
+
+A snapshot part holds only the videos whose counts changed, as increments
+over the previous snapshot, sorted by key and written with Parquet's
+delta-binary-packed encoding. Nothing ever reads every part: recording
+diffs against state.arrow (one row per video), velocity reads
+milestones.arrow (at most one row per video and milestone, filled in as
+videos cross each age), and history walks back from the latest state
+through the parts of the requested window only.
+
+Milestone counts are interpolated linearly between the two snapshots that
+bracket the age; `gap_hours` is how far apart they were. A video first
+seen after a milestone has no value for it.
+
+Run: python -m tbh_analytics.snapshots record          # after each ingest --append
+     python -m tbh_analytics.snapshots velocity --top 20
+"""
+
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .dataset import read_manifest
+from .ingest import COUNT_COLUMNS, _write_json_atomic, read_arrow, write_arrow
+
+SNAPSHOT_DIR = "snapshots"
+MILESTONES = {"24h": 24, "7d": 7 * 24, "30d": 30 * 24}  # label → age in hours
+INCREMENTS = ["d_views", "d_likes", "d_comments"]
+PART_ENCODING = {"key": "DELTA_BINARY_PACKED", **{c: "DELTA_BINARY_PACKED" for c in INCREMENTS}}
+
+
+def _paths(root):
+    return {name: os.path.join(root, f"{name}.arrow") for name in ("state", "milestones")}
+
+
+def _read(path):
+    return read_arrow(path) if os.path.exists(path) else None
+
+
+def _timestamp(value):
+    stamp = pd.Timestamp(value)
+    return stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp.tz_convert("UTC")
+
+
+def _epoch_hours(stamps):
+    return ((stamps - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(hours=1)).to_numpy("float64", na_value=np.nan)
+
+
+# ── Record ───────────────────────────────────────────────────────────────────
+def record(frame, root=SNAPSHOT_DIR, captured_at=None):
+    """Append one snapshot of `frame`'s counts taken at `captured_at` (default: now).
+
+    Returns the number of videos whose counts changed.
+    """
+    captured_at = _timestamp(captured_at or pd.Timestamp.now(tz="UTC")).floor("s")
+    paths = _paths(root)
+    manifest = read_manifest(root) or {"generation": 0, "snapshots": 0, "last": None}
+    if manifest["last"] is not None and captured_at <= pd.Timestamp(manifest["last"]):
+        raise ValueError(f"snapshots are append-only: {captured_at} is not after {manifest['last']}")
+
+    current = frame[["video_id", "uploaded_at", *COUNT_COLUMNS]].drop_duplicates("video_id", keep="last")
+    state = _read(paths["state"])
+    if state is None:
+        state = pd.DataFrame({"key": pd.Series(dtype="int32"), "video_id": pd.Series(dtype=str),
+                              "uploaded_at": pd.Series(dtype="datetime64[ns, UTC]"),
+                              **{c: pd.Series(dtype="int64") for c in COUNT_COLUMNS},
+                              "captured_at": pd.Series(dtype="datetime64[ns, UTC]")})
+
+    pos = pd.Index(state["video_id"]).get_indexer(current["video_id"])
+    known = pos >= 0
+    keys = np.empty(len(current), dtype="int32")
+    keys[known] = state["key"].to_numpy()[pos[known]]
+    keys[~known] = np.arange(len(state), len(state) + (~known).sum(), dtype="int32")
+
+    now = current[COUNT_COLUMNS].to_numpy("int64")
+    before = np.zeros_like(now)
+    before[known] = state[COUNT_COLUMNS].to_numpy("int64")[pos[known]]
+    increments = now - before
+    changed = ~known | (increments != 0).any(axis=1)
+
+    # ── append the part (changed videos only, as increments) ──
+    order = np.argsort(keys[changed], kind="stable")
+    part = pa.table({"key": keys[changed][order], **{c: increments[changed][order, i] for i, c in enumerate(INCREMENTS)}})
+    part_dir = os.path.join(root, f"day={captured_at:%Y-%m-%d}")
+    os.makedirs(part_dir, exist_ok=True)
+    part_path = os.path.join(part_dir, f"part-{int(captured_at.timestamp())}.parquet")
+    pq.write_table(part, part_path + ".tmp", use_dictionary=False, column_encoding=PART_ENCODING, compression="zstd")
+    os.replace(part_path + ".tmp", part_path)
+
+    # ── milestones crossed since each video's previous snapshot ──
+    uploaded = _epoch_hours(current["uploaded_at"])
+    age = captured_at.timestamp() / 3600 - uploaded
+    prev_age = np.full(len(current), np.nan)
+    prev_age[known] = _epoch_hours(state["captured_at"])[pos[known]] - uploaded[known]
+    rows = []
+    for label, hours in MILESTONES.items():
+        crossed = np.flatnonzero(known & (prev_age < hours) & (age >= hours))
+        if not len(crossed):
+            continue
+        frac = ((hours - prev_age[crossed]) / (age[crossed] - prev_age[crossed]))[:, None]
+        values = np.rint(before[crossed] + frac * increments[crossed]).astype("int64")
+        rows.append(pd.DataFrame({"key": keys[crossed], "milestone": label,
+                                  **{c: values[:, i] for i, c in enumerate(COUNT_COLUMNS)},
+                                  "gap_hours": (age[crossed] - prev_age[crossed]).astype("float32")}))
+    if rows:
+        milestones = pd.concat([m for m in [_read(paths["milestones"])] if m is not None] + rows, ignore_index=True)
+        milestones["milestone"] = milestones["milestone"].astype(pd.CategoricalDtype(list(MILESTONES)))
+        write_arrow(milestones, paths["milestones"])
+
+    # ── new latest state ──
+    added = pd.DataFrame({"key": keys[~known], "video_id": current["video_id"].to_numpy()[~known],
+                          "uploaded_at": current["uploaded_at"].to_numpy()[~known],
+                          **{c: np.zeros((~known).sum(), dtype="int64") for c in COUNT_COLUMNS},
+                          "captured_at": pd.Series(pd.NaT, index=range((~known).sum()), dtype=state["captured_at"].dtype)})
+    if len(added):
+        state = pd.concat([state, added], ignore_index=True) if len(state) else added
+    # Keys are assigned densely in order, so a video's key is its state row.
+    for i, col in enumerate(COUNT_COLUMNS):
+        values = state[col].to_numpy("int64", na_value=0).copy()
+        values[keys] = now[:, i]
+        state[col] = values
+    seen = state["captured_at"].copy()
+    seen.iloc[keys] = captured_at
+    state["captured_at"] = seen
+    write_arrow(state, paths["state"])
+
+    manifest.update(generation=manifest["generation"] + 1, snapshots=manifest["snapshots"] + 1,
+                    last=captured_at.isoformat(), videos=len(state))
+    _write_json_atomic(os.path.join(root, "manifest.json"), manifest)
+    return int(changed.sum())
+
+
+# ── Queries ──────────────────────────────────────────────────────────────────
+def velocity(root=SNAPSHOT_DIR):
+    """Views/likes/comments at each milestone age, one row per video_id.
+
+    Columns are views_24h, likes_24h, …, views_30d, …; NaN where a video has
+    not reached (or was not tracked across) that age.
+    """
+    paths = _paths(root)
+    state, milestones = _read(paths["state"]), _read(paths["milestones"])
+    if state is None or milestones is None or milestones.empty:
+        return pd.DataFrame(index=pd.Index([], name="video_id"))
+    wide = milestones.pivot_table(index="key", columns="milestone", values=COUNT_COLUMNS, observed=False)
+    wide.columns = [f"{col.removesuffix('_count')}s_{label}" for col, label in wide.columns]
+    ordered = [f"{c.removesuffix('_count')}s_{label}" for label in MILESTONES for c in COUNT_COLUMNS]
+    wide = wide.reindex(columns=ordered)
+    wide.index = state["video_id"].to_numpy()[wide.index.to_numpy()]
+    return wide.rename_axis("video_id")
+
+
+def equal_age(frame, table, milestone="7d", by="month"):
+    """Median/mean views at `milestone` age per `by` group of `frame`'s videos.
+
+    `table` is velocity(); videos without that milestone are left out, so
+    young uploads are compared with old ones at the same age.
+    """
+    column = f"views_{milestone}"
+    views = table[column].reindex(frame["video_id"].to_numpy()).to_numpy() if column in table else np.full(len(frame), np.nan)
+    joined = pd.DataFrame({by: frame[by].to_numpy(), "views": views}).dropna(subset=["views"])
+    grouped = joined.groupby(by, observed=True)["views"]
+    return pd.DataFrame({"videos": grouped.size(), "median": grouped.median(), "mean": grouped.mean()}).reset_index()
+
+
+def history(root=SNAPSHOT_DIR, video_ids=None, since=None):
+    """Counts of `video_ids` (all if None) at every snapshot from `since` on.
+
+    Reconstructed backwards from the latest state, so only the parts inside
+    the window are read however long the store has been running.
+    """
+    state = _read(_paths(root)["state"])
+    if state is None:
+        return pd.DataFrame(columns=["captured_at", "video_id", *COUNT_COLUMNS])
+    since = None if since is None else _timestamp(since)
+    parts = sorted(glob.glob(os.path.join(root, "day=*", "part-*.parquet")),
+                   key=lambda p: int(os.path.basename(p)[5:-8]))
+    if since is not None:
+        first_day = os.path.join(root, f"day={since:%Y-%m-%d}")
+        parts = [p for p in parts if os.path.dirname(p) >= first_day]
+    keep = np.ones(len(state), bool) if video_ids is None else state["video_id"].isin(video_ids).to_numpy()
+    counts = state[COUNT_COLUMNS].to_numpy("int64", na_value=0)[keep].copy()
+    slot = np.cumsum(keep) - 1  # key → row of `counts`
+    frames = []
+    for path in reversed(parts):
+        at = pd.Timestamp(int(os.path.basename(path)[5:-8]), unit="s", tz="UTC")
+        if since is not None and at < since:
+            break
+        frames.append(pd.DataFrame({"captured_at": at, "video_id": state["video_id"].to_numpy()[keep],
+                                    **{c: counts[:, i] for i, c in enumerate(COUNT_COLUMNS)}}))
+        part = pq.read_table(path)
+        k = part["key"].to_numpy()
+        mine = keep[k]
+        counts[slot[k[mine]]] -= np.column_stack([part[c].to_numpy() for c in INCREMENTS])[mine]
+    if not frames:
+        return pd.DataFrame(columns=["captured_at", "video_id", *COUNT_COLUMNS])
+    out = pd.concat(frames[::-1], ignore_index=True)
+    # Walking back past a video's first snapshot leaves it at zero; drop those rows.
+    return out[(out[COUNT_COLUMNS] != 0).any(axis=1)].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    from .ingest import CSV_PATH, load_frame
+
+    parser = argparse.ArgumentParser(description="Record count snapshots and query view velocity.")
+    parser.add_argument("--root", default=SNAPSHOT_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="append a snapshot of the current counts")
+    rec.add_argument("--csv", default=CSV_PATH)
+    rec.add_argument("--at", help="capture time (ISO 8601, default now)")
+    vel = commands.add_parser("velocity", help="print views at 24h / 7d / 30d")
+    vel.add_argument("--top", type=int, default=20)
+    vel.add_argument("--by", choices=list(MILESTONES), default="7d")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        changed = record(load_frame(args.csv), args.root, args.at)
+        manifest = read_manifest(args.root)
+        print(f"Snapshot {manifest['snapshots']} at {manifest['last']}: {changed} videos changed")
+    else:
+        table = velocity(args.root)
+        print(table.nlargest(args.top, f"views_{args.by}").to_string() if len(table) else "No milestones yet.")
@@ -0,0 +1,189 @@
+"""
+TBH Labs Myanmar — Video Store
+==============================
+Process-level holder for the typed video frame and its aggregate cube. A
+refresh applies only the deltas appended by `python -m tbh_analytics.ingest --append`
+since the last refresh: the delta's rows are located through a kept id map,
+the cube's touched cells are patched, and only the memoized entries the
+delta reaches are replaced or dropped. A rebuilt or compacted base cache
+triggers a full reload.
+
+Memoized values are shared with every session, so a refresh never writes
+into them: new counts go into new column arrays on a shallow copy of the
+frame. That copy, and the rebuild of any dropped index that reads counts
+(ViewIndex, Leaderboard, SlotGrid, cohort scores: each a full sort on next
+use), still scale with the catalog; only the lookups and the cube patch
+scale with the delta.
+
+PartitionStore is the same interface over a slice of the partitioned
+multi-channel dataset (see dataset.py); only the selected partitions are
+read, and a changed manifest triggers a reload.
+"""
+
+import threading
+
+import numpy as np
+
+from . import cohorts
+from .cube import build_cube
+from .dataset import DATASET_DIR, load_partitions, read_manifest
+from .ingest import (CACHE_DIR, COUNT_COLUMNS, CSV_PATH, RowIds, apply_delta, cache_is_fresh, data_version,
+                     load_frame, read_deltas, read_meta)
+from .leaderboard import Leaderboard
+from .percentiles import ViewIndex
+from .search import KeywordIndex
+from .slots import SlotGrid
+
+# Memoized entries (by key kind) that read view/like/comment counts. Keyword
+# indexes read only titles, so a delta of count updates leaves them valid.
+COUNT_DEPENDENT = {"view_index", "leaderboard", "cohort_scores", "slot_grid"}
+
+
+class VideoStore:
+    def __init__(self, csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._reload()
+
+    def _reload(self):
+        self.frame = load_frame(self.csv_path, self.cache_dir)
+        self.cube = build_cube(self.frame)
+        self._memo = {}
+        self._ids = None  # RowIds over frame, built by the first refresh that has deltas
+        self.generation, self.applied = data_version(read_meta(self.csv_path, self.cache_dir))
+
+    @property
+    def version(self):
+        """Hashable token that changes whenever frame/cube contents do; use it in cache keys."""
+        return self.generation, self.applied
+
+    def since(self, year):
+        """Rows uploaded in `year` or later, computed once per data version.
+
+        Callers only read the result, so it shares column buffers with
+        `frame` where pandas can rather than copying them per rerun.
+        """
+        with self._lock:
+            return self._memoized(("since", year), lambda: self.frame[self.frame["year"] >= year])
+
+    def view_index(self, year):
+        """ViewIndex over `since(year)`, sorted once per data version."""
+        frame = self.since(year)
+        with self._lock:
+            return self._memoized(("view_index", year), lambda: ViewIndex(frame))
+
+    def leaderboard(self, year):
+        """Leaderboard over `since(year)`; its sort and title indexes build on first use."""
+        frame = self.since(year)
+        with self._lock:
+            return self._memoized(("leaderboard", year), lambda: Leaderboard(frame))
+
+    def keyword_index(self, year):
+        """KeywordIndex over `since(year)`'s titles, built once per data version."""
+        frame = self.since(year)
+        with self._lock:
+            return self._memoized(("keyword_index", year), lambda: KeywordIndex(frame))
+
+    def cohort_scores(self, year):
+        """cohorts.scores over `since(year)`: every video against its upload month × category."""
+        frame = self.since(year)
+        with self._lock:
+            return self._memoized(("cohort_scores", year), lambda: cohorts.scores(frame))
+
+    def slot_grid(self, year, clock="MMT"):
+        """SlotGrid over `since(year)` on the `clock` weekday/hour, binned once per data version."""
+        frame = self.since(year)
+        with self._lock:
+            return self._memoized(("slot_grid", year, clock), lambda: SlotGrid(frame, clock))
+
+    def _memoized(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def refresh(self):
+        """Bring the frame and cube up to date. Returns True if anything changed."""
+        with self._lock:
+            fresh, _ = cache_is_fresh(self.csv_path, self.cache_dir)
+            version = data_version(read_meta(self.csv_path, self.cache_dir))
+            if not fresh or version is None or version[0] != self.generation:
+                self._reload()
+                return True
+            if version[1] == self.applied:
+                return False
+            for delta in read_deltas(self.csv_path, self.cache_dir, start=self.applied):
+                if self._ids is None:
+                    self._ids = RowIds(self.frame["video_id"])
+                self.frame, removed, added = apply_delta(self.frame, delta, self._ids)
+                self.cube = self.cube.update(removed, added, self.frame)
+                self._invalidate(added.iloc[:len(removed)], added.iloc[len(removed):])
+            self.applied = version[1]
+            return True
+
+    def _invalidate(self, updated, fresh):
+        """Replace or drop only the memoized entries that a delta reaches.
+
+        `updated` are known videos with new counts, `fresh` the appended ones.
+        An entry for since(year) is reached by rows uploaded in `year` or
+        later. A reached since() frame is swapped for a copy carrying the new
+        counts, or recomputed if new videos join it; entries derived from it
+        are dropped (and rebuilt on next use) if they read counts, or if new
+        videos join.
+        """
+        counts_from = updated["year"].max() if len(updated) else -1
+        rows_from = fresh["year"].max() if len(fresh) else -1
+        for key in list(self._memo):
+            kind, year = key[:2]
+            joined, recounted = rows_from >= year, counts_from >= year
+            if joined or (recounted and kind in COUNT_DEPENDENT):
+                del self._memo[key]
+            elif kind == "since" and recounted:
+                self._memo[key] = _with_counts(self._memo[key], updated[updated["year"] >= year])
+
+
+def _with_counts(frame, rows):
+    """A shallow copy of `frame` with `rows`' counts (matched on index label) in new arrays."""
+    pos = np.searchsorted(frame.index.to_numpy(), rows.index.to_numpy())
+    frame = frame.copy(deep=False)
+    for col in COUNT_COLUMNS:
+        values = frame[col].to_numpy().astype(rows[col].dtype)  # wide enough: the store frame's dtype
+        values[pos] = rows[col].to_numpy()
+        frame[col] = values
+    return frame
+
+
+class PartitionStore:
+    def __init__(self, root=DATASET_DIR, channels=None, years=None, categories=None, since=None):
+        self.root = root
+        canonical = lambda values: None if values is None else tuple(sorted(values))
+        self.selection = dict(channels=canonical(channels), years=canonical(years),
+                              categories=canonical(categories), since=since)
+        self._lock = threading.Lock()
+        self._reload()
+
+    def _reload(self):
+        self.generation = (read_manifest(self.root) or {}).get("generation", 0)
+        self.frame = load_partitions(self.root, **self.selection)
+        self.cube = build_cube(self.frame)
+        self._memo = {}
+
+    @property
+    def version(self):
+        """Includes the selection, so caches shared between stores never collide."""
+        return self.generation, tuple(self.selection.items())
+
+    since = VideoStore.since
+    view_index = VideoStore.view_index
+    leaderboard = VideoStore.leaderboard
+    keyword_index = VideoStore.keyword_index
+    cohort_scores = VideoStore.cohort_scores
+    slot_grid = VideoStore.slot_grid
+    _memoized = VideoStore._memoized
+
+    def refresh(self):
+        with self._lock:
+            if (read_manifest(self.root) or {}).get("generation", 0) == self.generation:
+                return False
+            self._reload()
+            return True
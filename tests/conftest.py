@@ -0,0 +1,28 @@
+"""Shared fixtures: the shipped CSV parsed once, and a spread of filter states over it."""
+
+import numpy as np
+import pytest
+
+from tbh_analytics.engine import FilterSpec
+from tbh_analytics.ingest import parse_csv
+
+
+@pytest.fixture(scope="session")
+def frame():
+    return parse_csv()
+
+
+@pytest.fixture(scope="session")
+def specs(frame):
+    """FilterSpecs from seeded random year/category subsets and view thresholds, plus the edge cases."""
+    rng = np.random.default_rng(7)
+    years = np.unique(frame["year"])
+    categories = np.asarray(frame["category"].cat.categories)
+    out = [FilterSpec(), FilterSpec.of(min_views=int(frame["view_count"].median()))]
+    for _ in range(12):
+        out.append(FilterSpec.of(
+            rng.choice(years, rng.integers(1, len(years) + 1), replace=False) if rng.random() < 0.7 else None,
+            rng.choice(categories, rng.integers(1, len(categories) + 1), replace=False) if rng.random() < 0.7 else None,
+            int(np.quantile(frame["view_count"], rng.choice([0, 0, 0.3, 0.8]))),
+        ))
+    return out
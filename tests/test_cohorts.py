@@ -0,0 +1,35 @@
+"""cohorts.scores (one lexsort) against groupby transforms over month × category cohorts."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tbh_analytics import cohorts
+
+
+def grouped_scores(frame, min_size=cohorts.MIN_COHORT):
+    views = frame["view_count"].astype("float64")
+    cohort = views.groupby([frame["month"], frame["category"]], observed=True)
+    size = cohort.transform("size")
+    median = cohort.transform("median")
+    spread = np.log1p(cohort.transform(lambda v: v.quantile(0.75))) - np.log1p(cohort.transform(lambda v: v.quantile(0.25)))
+    score = (np.log1p(views) - np.log1p(median)) / spread
+    score[(size < min_size) | ~(spread > 0)] = np.nan
+    return pd.DataFrame({
+        "cohort_size": size,
+        "cohort_median": median,
+        "perf_index": views / median,
+        "cohort_pct": cohort.rank(method="max") / size,
+        "outlier_score": score,
+    })
+
+
+@pytest.mark.parametrize("years", [None, (2024, 2025, 2026)])
+def test_scores_match_groupby(frame, years):
+    rows = frame if years is None else frame[frame["year"].isin(years)]
+    pd.testing.assert_frame_equal(cohorts.scores(rows), grouped_scores(rows), check_dtype=False)
+
+
+def test_tied_views_share_the_top_rank(frame):
+    rows = frame.assign(view_count=frame["view_count"] // 50_000 * 50_000)  # many ties within each cohort
+    pd.testing.assert_frame_equal(cohorts.scores(rows), grouped_scores(rows), check_dtype=False)
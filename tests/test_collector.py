@@ -0,0 +1,87 @@
+"""Collector retries against a local stub of the YouTube Data API."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tbh_analytics.collector import ApiError, HttpTransport, YouTubeCollector
+
+ITEM = {
+    "id": "abc123",
+    "snippet": {"title": "Stub video", "publishedAt": "2025-03-07T12:30:00Z"},
+    "contentDetails": {"duration": "PT12M5S"},
+    "statistics": {"viewCount": "1500", "likeCount": "60", "commentCount": "4"},
+}
+
+
+def stub_server(responses):
+    """Serve `responses` in order: (status, body bytes), or None to drop the connection."""
+    script = iter(responses)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            response = next(script)
+            if response is None:
+                self.close_connection = True  # no status line: the client sees RemoteDisconnected
+                return
+            status, body = response
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def collect(responses, max_retries=3):
+    server = stub_server(responses)
+    collector = YouTubeCollector("key", HttpTransport(timeout=5), base_url=f"http://127.0.0.1:{server.server_port}",
+                                 max_retries=max_retries, backoff=0.001)
+    try:
+        return asyncio.run(collector.collect(video_ids=["abc123"]))
+    finally:
+        collector.close()
+        server.shutdown()
+
+
+OK = (200, json.dumps({"items": [ITEM]}).encode())
+
+
+def test_html_error_page_is_retried():
+    frame = collect([(502, b"<html><body>Bad Gateway</body></html>"), OK])
+    assert frame["view_count"].tolist() == [1500]
+
+
+def test_dropped_connection_is_retried():
+    frame = collect([None, OK])
+    assert frame[["video_id", "duration", "upload_hour"]].values.tolist() == [["abc123", "12:05", "12:30"]]
+
+
+def test_non_json_success_is_retried():
+    frame = collect([(200, b"not json"), OK])
+    assert len(frame) == 1
+
+
+def test_quota_error_is_retried():
+    quota = json.dumps({"error": {"message": "Quota", "errors": [{"reason": "quotaExceeded"}]}}).encode()
+    assert len(collect([(403, quota), OK])) == 1
+
+
+def test_client_error_is_not_retried():
+    with pytest.raises(ApiError) as exc:
+        collect([(404, b"<html>Not Found</html>"), OK])
+    assert exc.value.status == 404 and not exc.value.retryable
+
+
+def test_gives_up_after_max_retries():
+    with pytest.raises(ApiError) as exc:
+        collect([(503, b"<html>Unavailable</html>")] * 3, max_retries=2)
+    assert exc.value.status == 503
@@ -0,0 +1,85 @@
+"""The cube path of engine.section_tables/series against the plain row path."""
+
+import pandas as pd
+import pytest
+
+from tbh_analytics.cube import build_cube
+from tbh_analytics.engine import FilterSpec, section_tables, series
+
+
+@pytest.fixture(scope="module")
+def cube(frame):
+    return build_cube(frame)
+
+
+def plain(table):
+    """`table` with categorical columns as strings and a fresh index (the cube yields plain labels)."""
+    table = table.reset_index(drop=True)
+    return table.astype({c: str for c in table.columns if isinstance(table[c].dtype, pd.CategoricalDtype)})
+
+
+def assert_same_tables(cube_tables, row_tables):
+    assert cube_tables.keys() == row_tables.keys()
+    for name in row_tables:
+        pd.testing.assert_frame_equal(plain(cube_tables[name]), plain(row_tables[name]),
+                                      check_dtype=False, check_index_type=False, obj=name)
+
+
+EMPTY = [
+    FilterSpec.of([2021], ["Shorts"]),  # both exist, never together
+    FilterSpec.of([1999]),
+    FilterSpec.of(categories=[]),
+    FilterSpec.of(categories=["No such category"]),
+]
+
+
+@pytest.mark.parametrize("spec", EMPTY, ids=str)
+def test_empty_selection_matches_row_path(frame, cube, spec):
+    assert spec.apply(frame).empty
+    assert_same_tables(section_tables(frame, spec, cube), section_tables(frame, spec))
+    pd.testing.assert_frame_equal(plain(series(frame, spec, "M", cube)), plain(series(frame, spec, "M")),
+                                  check_dtype=False)
+
+
+def test_cube_matches_row_path(frame, cube, specs):
+    for spec in specs:
+        spec = spec._replace(min_views=0)  # a threshold cuts through cells and takes the row path anyway
+        assert_same_tables(section_tables(frame, spec, cube), section_tables(frame, spec))
+        for freq in ("M", "Q"):
+            pd.testing.assert_frame_equal(plain(series(frame, spec, freq, cube)), plain(series(frame, spec, freq)),
+                                          check_dtype=False)
+
+
+def test_medians_match_groupby(frame, cube, specs):
+    for spec in specs:
+        spec = spec.resolve(frame)
+        rows = spec._replace(min_views=0).apply(frame)
+        expected = rows.groupby("category", observed=True)["view_count"].median()
+        medians = cube.medians(spec.years, expected.index.astype(str))
+        assert medians.to_numpy() == pytest.approx(expected.to_numpy())
+
+
+def test_update_matches_rebuild(frame, cube):
+    from tbh_analytics.ingest import apply_delta
+
+    updated = frame.iloc[::7].copy()
+    updated["view_count"] = updated["view_count"] * 2 + 1
+    updated["like_count"] = updated["like_count"] // 2
+    new = frame.iloc[:25].copy()
+    new["video_id"] = new["video_id"] + "_new"
+    new["category"] = "BrandNew"
+    delta = pd.concat([updated, new], ignore_index=True).astype({"category": "category"})
+    patched_frame, removed, added = apply_delta(frame, delta)
+
+    patched = cube.update(removed, added, patched_frame)
+    rebuilt = build_cube(patched_frame)
+    for name, cells in rebuilt.sections.items():
+        pd.testing.assert_frame_equal(patched.sections[name].sort_index(), cells.sort_index(), check_dtype=False,
+                                      check_index_type=False, obj=name)
+
+
+def test_both_paths_return_the_section_tables(frame, cube):
+    from tbh_analytics.engine import SECTION_TABLES
+
+    assert sorted(section_tables(frame, FilterSpec(), cube)) == sorted(SECTION_TABLES)
+    assert tuple(section_tables(frame, FilterSpec())) == SECTION_TABLES
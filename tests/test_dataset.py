@@ -0,0 +1,36 @@
+"""PartitionStore over a one-channel dataset against filtering the parsed CSV."""
+
+import pandas as pd
+import pytest
+
+from tbh_analytics.dataset import add_channel, channel_categories, channel_years, read_manifest
+from tbh_analytics.ingest import CSV_PATH
+from tbh_analytics.store import PartitionStore
+
+
+@pytest.fixture(scope="module")
+def root(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("dataset"))
+    add_channel(CSV_PATH, "tbh-labs", root)
+    return root
+
+
+def test_manifest_lists_the_selectors(frame, root):
+    manifest = read_manifest(root)
+    assert channel_years(manifest, ["tbh-labs"]) == sorted(frame["year"].unique())
+    assert channel_categories(manifest) == sorted(frame["category"].unique())
+
+
+@pytest.mark.parametrize("years, categories", [(None, None), ((2024, 2025), None), (None, ("Knowledge",)),
+                                               ((2025,), ("Knowledge", "Review"))])
+def test_selection_is_pushed_into_the_scan(frame, root, years, categories):
+    store = PartitionStore(root, ["tbh-labs"], years, categories, since=2021)
+    expected = frame[frame["year"] >= 2021]
+    if years is not None:
+        expected = expected[expected["year"].isin(years)]
+    if categories is not None:
+        expected = expected[expected["category"].isin(categories)]
+    got = store.since(2021).sort_values("video_id", ignore_index=True)
+    expected = expected.sort_values("video_id", ignore_index=True)
+    pd.testing.assert_frame_equal(got[expected.columns], expected, check_dtype=False, check_categorical=False)
+    assert not store.refresh()
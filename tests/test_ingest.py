@@ -0,0 +1,57 @@
+"""apply_delta against a plain pandas upsert on video_id."""
+
+import pandas as pd
+
+from tbh_analytics.ingest import COUNT_COLUMNS, RowIds, apply_delta
+
+
+def upsert(frame, delta):
+    """Reference: last delta row per video wins; known videos take only its counts."""
+    delta = delta.drop_duplicates("video_id", keep="last").set_index("video_id")
+    merged = frame.set_index("video_id").astype({col: "int64" for col in COUNT_COLUMNS})
+    known = delta.index.isin(merged.index)
+    merged.loc[delta.index[known], COUNT_COLUMNS] = delta.loc[known, COUNT_COLUMNS].to_numpy()
+    return pd.concat([merged, delta[~known]]).reset_index()[frame.columns]
+
+
+def make_delta(frame, step, new_ids, seed):
+    updated = frame.iloc[seed::step].copy()
+    updated["view_count"] = updated["view_count"] * 3 + seed
+    updated["comment_count"] = updated["comment_count"] + seed
+    new = frame.iloc[:len(new_ids)].copy()
+    new["video_id"] = pd.array(new_ids, dtype=frame["video_id"].dtype)
+    again = updated.iloc[:3].assign(like_count=lambda d: d["like_count"] + 1000)  # repeated ids: the last row wins
+    return pd.concat([updated, new, again], ignore_index=True)
+
+
+def assert_same(got, expected):
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_apply_delta_matches_upsert(frame):
+    delta = make_delta(frame, 5, ["new-a", "new-b"], seed=1)
+    before = frame.copy()
+    patched, removed, added = apply_delta(frame, delta)
+
+    assert_same(patched, upsert(frame, delta))
+    pd.testing.assert_frame_equal(frame, before)  # the input frame is never written
+    ids = delta.drop_duplicates("video_id", keep="last")["video_id"]
+    known = ids[ids.isin(frame["video_id"])]
+    assert removed["view_count"].tolist() == frame.set_index("video_id").loc[known, "view_count"].tolist()
+    assert (patched.loc[added.index, added.columns].to_numpy() == added.to_numpy()).all()
+    assert len(added) == len(removed) + 2
+
+
+def test_ids_carry_across_deltas(frame):
+    ids = RowIds(frame["video_id"])
+    first = make_delta(frame, 9, ["new-a", "new-b"], seed=2)
+    patched, _, _ = apply_delta(frame, first, ids)
+    second = make_delta(patched, 11, ["new-c"], seed=3)
+    second = pd.concat([second, patched.iloc[-2:].assign(view_count=7)], ignore_index=True)  # update appended videos
+    patched, removed, _ = apply_delta(patched, second, ids)
+
+    assert_same(patched, upsert(upsert(frame, first), second))
+    assert patched["video_id"].is_unique and ids.size == len(patched)
+    assert (ids.positions(patched["video_id"]) == range(len(patched))).all()
+    assert "new-a" in set(removed.index.map(patched["video_id"].get))
@@ -0,0 +1,32 @@
+"""Insight rules on hand-built section tables: sample sizes and the insufficient state."""
+
+import pandas as pd
+
+from tbh_analytics import insights
+
+
+def cat_stats(rows):
+    table = pd.DataFrame(rows, columns=["category", "count", "avg_views"])
+    return table.assign(total_views=table["count"] * table["avg_views"], med_views=table["avg_views"], like_rate=4.0)
+
+
+EVEN = cat_stats([("Knowledge", 120, 100_000), ("Review", 80, 95_000), ("Story", 60, 105_000)])
+THIN = cat_stats([("Knowledge", 4, 100_000), ("Review", 3, 10_000)])
+
+
+def test_no_gems_reports_the_eligible_sample():
+    item = insights.hidden_gems(EVEN, insights.baseline_views(EVEN))
+    assert item.headline == "No hidden gems."
+    assert (item.n, item.confidence) == (260, "high")
+
+
+def test_no_weak_links_reports_the_eligible_sample():
+    item = insights.weak_categories(EVEN, insights.baseline_views(EVEN))
+    assert item.headline == "No weak links." and (item.n, item.confidence) == (260, "high")
+
+
+def test_thin_verticals_are_insufficient():
+    baseline = insights.baseline_views(THIN)
+    for rule in (insights.hidden_gems, insights.weak_categories):
+        item = rule(THIN, baseline)
+        assert item.confidence == "insufficient" and item.headline == "Not enough data."
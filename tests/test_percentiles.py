@@ -0,0 +1,40 @@
+"""ViewIndex selections and quantiles against pandas over the filtered rows."""
+
+import numpy as np
+import pytest
+
+from tbh_analytics.percentiles import ViewIndex
+
+QS = [0, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1]
+
+
+@pytest.fixture(scope="module", params=[64, 4096], ids=["small-blocks", "one-block"])
+def index(frame, request):
+    return ViewIndex(frame, block=request.param)
+
+
+def test_select_matches_sorted_filter(frame, index, specs):
+    for spec in specs:
+        expected = np.sort(spec.apply(frame)["view_count"].to_numpy())
+        assert np.array_equal(index.select(spec), expected)
+
+
+def test_quantiles_match_pandas(frame, index, specs):
+    for spec in specs:
+        views = spec.apply(frame)["view_count"]
+        expected = views.quantile(QS).to_numpy() if len(views) else np.full(len(QS), np.nan)
+        assert index.quantiles(QS, spec).to_numpy() == pytest.approx(expected, nan_ok=True)
+
+
+def test_category_quantiles_match_groupby(frame, index, specs):
+    for spec in specs:
+        rows = spec._replace(min_views=0).apply(frame)
+        for q in (0.25, 0.5, 0.9):
+            expected = rows.groupby("category", observed=True)["view_count"].quantile(q)
+            got = index.category_quantiles(q, spec.years, expected.index.astype(str))
+            assert got.to_numpy() == pytest.approx(expected.to_numpy())
+
+
+def test_category_quantiles_of_nothing(index):
+    assert index.category_quantiles(0.5, [1999], ["Knowledge"]).isna().all()
+    assert index.category_quantiles(0.5, None, []).empty
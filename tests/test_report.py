@@ -0,0 +1,30 @@
+"""Report bundle swap: the output path always resolves to one complete build."""
+
+import os
+
+from tbh_analytics.report import _script_json, _swap_in
+
+
+def build_dir(parent, name, marker):
+    path = parent / name
+    path.mkdir()
+    (path / "manifest.json").write_text(marker)
+    return str(path)
+
+
+def test_swap_replaces_a_plain_directory_then_repoints(tmp_path):
+    out = str(tmp_path / "report")
+    build_dir(tmp_path, "report", "legacy")
+    first = build_dir(tmp_path, "report.a", "first")
+    _swap_in(first, out)
+    assert os.path.islink(out) and open(os.path.join(out, "manifest.json")).read() == "first"
+
+    second = build_dir(tmp_path, "report.b", "second")
+    _swap_in(second, out)
+    assert open(os.path.join(out, "manifest.json")).read() == "second"
+    assert not os.path.exists(first)
+    assert sorted(os.listdir(tmp_path)) == ["report", "report.b"]
+
+
+def test_script_json_cannot_close_the_tag():
+    assert "</" not in _script_json({"title": "a </script><script>alert(1)</script>"})
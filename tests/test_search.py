@@ -0,0 +1,56 @@
+"""KeywordIndex lookups against a scan of every title."""
+
+import re
+
+import numpy as np
+import pytest
+
+from tbh_analytics.search import KeywordIndex, normalize, syllables, tokenize
+
+MYANMAR_RUN = re.compile("[က-႟ꧠ-꧿ꩠ-ꩿ]+")
+
+
+@pytest.fixture(scope="module")
+def index(frame):
+    return KeywordIndex(frame)
+
+
+def scan(frame, query):
+    """Titles holding every query term, the last as a prefix, with multi-syllable Myanmar runs unbroken."""
+    *whole, last = tokenize(query)
+    runs = [run for run in MYANMAR_RUN.findall(normalize(query)) if len(syllables(run)) > 1]
+    hits = []
+    for video_id, title in zip(frame["video_id"], frame["title"].fillna("")):
+        title = normalize(title)
+        terms = set(tokenize(title, normalized=True))
+        if (all(t in terms for t in whole) and any(t.startswith(last) for t in terms)
+                and all(run in title for run in runs)):
+            hits.append(video_id)
+    return tuple(sorted(hits))
+
+
+def queries(frame, n=40):
+    """Whole terms, term pairs, typed-so-far prefixes and unbroken Myanmar runs drawn from real titles."""
+    rng = np.random.default_rng(11)
+    out = ["AI", "brain rot", "သတိ", "zzzz-no-such-word"]
+    for title in rng.choice(frame["title"].dropna().to_numpy(), n):
+        terms = tokenize(title)
+        if not terms:
+            continue
+        i = int(rng.integers(len(terms)))
+        out.append(terms[i])
+        out.append(" ".join(terms[i:i + 2]))
+        out.append(terms[i][:max(1, len(terms[i]) // 2)])
+        runs = MYANMAR_RUN.findall(normalize(title))
+        if runs:
+            out.append(max(runs, key=len)[:6])
+    return out
+
+
+def test_lookup_matches_scan(frame, index):
+    for query in queries(frame):
+        assert index.lookup(query) == scan(frame, query), query
+
+
+def test_query_without_terms(index):
+    assert index.lookup("  ") is None and index.mask("။") is None
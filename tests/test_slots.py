@@ -0,0 +1,41 @@
+"""SlotGrid tables against a weekday × hour groupby of the filtered rows."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tbh_analytics.ingest import DAY_ORDER
+from tbh_analytics.slots import CLOCKS, HOURS, SlotGrid
+
+
+@pytest.fixture(scope="module", params=sorted(CLOCKS))
+def grid(frame, request):
+    return SlotGrid(frame, request.param)
+
+
+def grouped(rows, clock):
+    """The slot table's measures by groupby, on the full 7 × 24 grid."""
+    day, hour = CLOCKS[clock]
+    stats = rows.groupby([rows[day].astype(str), rows[hour].astype("int64")])["view_count"].agg(
+        ["size", "sum", "mean", "median"])
+    full = pd.MultiIndex.from_product([DAY_ORDER, range(HOURS)])
+    return stats.reindex(full).fillna({"size": 0, "sum": 0})
+
+
+def assert_matches(table, rows, clock):
+    expected = grouped(rows, clock)
+    assert table["videos"].to_numpy() == pytest.approx(expected["size"].to_numpy())
+    assert table["total_views"].to_numpy() == pytest.approx(expected["sum"].to_numpy())
+    assert table["avg_views"].to_numpy() == pytest.approx(expected["mean"].to_numpy(), nan_ok=True)
+    assert table["median_views"].to_numpy() == pytest.approx(expected["median"].to_numpy(), nan_ok=True)
+
+
+def test_table_matches_groupby(frame, grid, specs):
+    for spec in specs:
+        assert_matches(grid.table(spec), spec.apply(frame), grid.clock)
+
+
+def test_category_slice_matches_groupby(frame, grid, specs):
+    for spec, category in zip(specs, np.resize(frame["category"].cat.categories, len(specs))):
+        rows = spec.apply(frame)
+        assert_matches(grid.table(spec, category), rows[rows["category"] == category], grid.clock)
@@ -0,0 +1,80 @@
+"""VideoStore.refresh against a store loaded from scratch, and what it leaves shared frames."""
+
+import shutil
+
+import pandas as pd
+import pytest
+
+from tbh_analytics.engine import FilterSpec, section_tables, series
+from tbh_analytics.ingest import CSV_PATH, append_updates
+from tbh_analytics.store import VideoStore
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """(csv path, cache dir, raw rows) for a private copy of the shipped CSV."""
+    csv_path = tmp_path / "videos.csv"
+    shutil.copy(CSV_PATH, csv_path)
+    return str(csv_path), str(tmp_path / "cache"), pd.read_csv(csv_path)
+
+
+def append(catalog, rows, name):
+    csv_path, cache_dir, _ = catalog
+    path = f"{cache_dir}-{name}.csv"
+    rows.to_csv(path, index=False)
+    append_updates(path, csv_path, cache_dir)
+
+
+def test_refresh_matches_a_fresh_load(catalog):
+    csv_path, cache_dir, raw = catalog
+    store = VideoStore(csv_path, cache_dir)
+    for build in (store.view_index, store.keyword_index, store.cohort_scores, store.slot_grid):
+        build(2021)
+    updated = raw.head(30).assign(view_count=lambda d: d["view_count"] + 12345)
+    new = raw.head(5).assign(video_id=lambda d: d["video_id"] + "_new", category="BrandNew")
+    append(catalog, pd.concat([updated, new]), "updates")
+    assert store.refresh()
+
+    fresh = VideoStore(csv_path, cache_dir)
+    pd.testing.assert_frame_equal(store.since(2021).reset_index(drop=True), fresh.since(2021).reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+    for spec in (FilterSpec(), FilterSpec.of([2025, 2026], ["Knowledge", "BrandNew"])):
+        ours, theirs = section_tables(store.since(2021), spec, store.cube), section_tables(fresh.since(2021), spec, fresh.cube)
+        for name in theirs:
+            pd.testing.assert_frame_equal(ours[name].reset_index(drop=True), theirs[name].reset_index(drop=True),
+                                          check_dtype=False, check_categorical=False, obj=name)
+        pd.testing.assert_frame_equal(series(store.since(2021), spec, "M", store.cube),
+                                      series(fresh.since(2021), spec, "M", fresh.cube), check_dtype=False)
+    assert (store.view_index(2021).values == fresh.view_index(2021).values).all()
+    pd.testing.assert_frame_equal(store.cohort_scores(2021).reset_index(drop=True),
+                                  fresh.cohort_scores(2021).reset_index(drop=True))
+    pd.testing.assert_frame_equal(store.slot_grid(2021).table(), fresh.slot_grid(2021).table())
+    query = new["title"].iloc[0].split()[0]
+    assert store.keyword_index(2021).lookup(query) == fresh.keyword_index(2021).lookup(query)
+
+
+def test_refresh_never_writes_into_frames_a_session_holds(catalog):
+    csv_path, cache_dir, raw = catalog
+    store = VideoStore(csv_path, cache_dir)
+    append(catalog, raw.head(3), "warmup")  # first delta: the store's columns stop being memory-mapped
+    store.refresh()
+    held_frame, held_since = store.frame, store.since(2021)
+    before_frame, before_since = held_frame.copy(), held_since.copy()
+
+    recent = raw[raw["upload_date"] >= "2024"].head(20)
+    append(catalog, recent.assign(view_count=recent["view_count"] * 3, like_count=recent["like_count"] + 1), "counts")
+    assert store.refresh()
+    pd.testing.assert_frame_equal(held_frame, before_frame)
+    pd.testing.assert_frame_equal(held_since, before_since)
+    assert store.since(2021) is not held_since
+    assert store.since(2021)["view_count"].sum() > held_since["view_count"].sum()
+
+
+def test_old_delta_leaves_recent_entries_alone(catalog):
+    csv_path, cache_dir, raw = catalog
+    store = VideoStore(csv_path, cache_dir)
+    entries = [store.since(2021), store.view_index(2021), store.keyword_index(2021), store.slot_grid(2021)]
+    old = raw[raw["upload_date"] < "2020"].head(5)
+    append(catalog, old.assign(view_count=old["view_count"] + 7), "old")
+    assert store.refresh()
+    assert [store.since(2021), store.view_index(2021), store.keyword_index(2021), store.slot_grid(2021)] == entries